@@ -0,0 +1,120 @@
+"""
+Offline model benchmark over a saved resume corpus.
+
+Replays records saved with SAVE_RESUME_CORPUS=<file.jsonl> through
+llm_utils._call_llm (no verdict cache) against whatever backend the .env
+configures (OPENAI_BASE_URL / LLM_ENDPOINTS / LLM_MODEL, MAX_TOKENS,
+REASONING_EFFORT), and reports throughput, latency percentiles, tokens per
+candidate, parse failures and agreement with the records' `expected` verdicts.
+
+    python bench.py corpus.jsonl -n 4 --limit 50 --model qwen2.5-vl-7b
+"""
+import argparse, asyncio, json, os, time
+
+import llm_utils, usage_utils, image_utils
+from log_utils import logger
+
+
+def load_corpus(path: str, limit: int = 0) -> list[dict]:
+    records = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                records.append(json.loads(line))
+                if limit and len(records) >= limit:
+                    break
+    return records
+
+
+def percentile(values: list[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * q), len(ordered) - 1)]
+
+
+async def run(records: list[dict], concurrency: int, model: str | None, max_tokens: int | None) -> dict:
+    pool = llm_utils.create_pool(os.getenv('OPENAI_API_KEY'), os.getenv('OPENAI_BASE_URL'), timeout=120.0)
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, outcomes = [], []
+
+    async def evaluate(record):
+        user_text, candidate_text = llm_utils._build_user_text(record['cv_requirements'], record.get('overview_text', ''))
+        async with semaphore:
+            start = time.perf_counter()
+            result = await llm_utils._call_llm(
+                pool, record.get('canvas_b64'), user_text, model=model, max_tokens=max_tokens,
+                candidate_text=candidate_text,
+            )
+            latencies.append(time.perf_counter() - start)
+        outcomes.append((record.get('expected'), result))
+
+    start = time.perf_counter()
+    try:
+        await asyncio.gather(*(evaluate(r) for r in records))
+    finally:
+        await pool.close()
+        image_utils.shutdown()
+    wall = time.perf_counter() - start
+
+    failed = sum(1 for _, result in outcomes if result is None)
+    labelled = [(exp, res) for exp, res in outcomes if exp is not None and res is not None]
+    agree = sum(1 for exp, res in labelled if exp['is_qualified'] == res.is_qualified)
+    agree_category = sum(
+        1 for exp, res in labelled
+        if exp['is_qualified'] == res.is_qualified and exp.get('reason_category', '') == res.reason_category
+    )
+    totals = usage_utils.run_totals
+    return {
+        'model': model or llm_utils.LLM_MODEL,
+        'records': len(records),
+        'concurrency': concurrency,
+        'wall_seconds': wall,
+        'throughput_per_min': len(records) / wall * 60 if wall else 0.0,
+        'latency_p50': percentile(latencies, 0.50),
+        'latency_p95': percentile(latencies, 0.95),
+        'latency_p99': percentile(latencies, 0.99),
+        'failed_calls': failed,
+        'parse_failures': llm_utils.parse_stats['failures'],
+        'parse_failure_rate': llm_utils.parse_stats['failures'] / len(records) if records else 0.0,
+        'input_tokens_per_candidate': totals['input'] / len(records) if records else 0.0,
+        'output_tokens_per_candidate': totals['output'] / len(records) if records else 0.0,
+        'cost': totals['cost'],
+        'labelled': len(labelled),
+        'agreement': agree / len(labelled) if labelled else None,
+        'category_agreement': agree_category / len(labelled) if labelled else None,
+    }
+
+
+def report(stats: dict):
+    logger.llm(f"模型 {stats['model']}：{stats['records']} 份简历，并发 {stats['concurrency']}，"
+               f"耗时 {stats['wall_seconds']:.1f}s（{stats['throughput_per_min']:.1f} 份/分钟）")
+    logger.llm(f"延迟 p50 {stats['latency_p50']:.1f}s / p95 {stats['latency_p95']:.1f}s / p99 {stats['latency_p99']:.1f}s")
+    logger.llm(f"每份 tokens：输入 {stats['input_tokens_per_candidate']:.0f}，输出 {stats['output_tokens_per_candidate']:.0f}，"
+               f"总费用 ${stats['cost']:.4f}")
+    logger.llm(f"调用失败 {stats['failed_calls']}，解析失败 {stats['parse_failures']}（{stats['parse_failure_rate'] * 100:.1f}%）")
+    if stats['agreement'] is not None:
+        logger.llm(f"与标注一致率：{stats['agreement'] * 100:.1f}%（含原因分类 {stats['category_agreement'] * 100:.1f}%），"
+                   f"共 {stats['labelled']} 份")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='用保存的简历样本对 LLM 模型进行离线基准测试')
+    parser.add_argument('corpus', help='SAVE_RESUME_CORPUS 生成的 JSONL 文件')
+    parser.add_argument('-n', '--concurrency', type=int, default=1)
+    parser.add_argument('--limit', type=int, default=0, help='只使用前 N 条记录')
+    parser.add_argument('--model', help='覆盖 LLM_MODEL（各后端的默认模型）')
+    parser.add_argument('--max-tokens', type=int, help='覆盖 MAX_TOKENS')
+    parser.add_argument('--json', dest='json_out', help='将结果写入 JSON 文件')
+    args = parser.parse_args()
+
+    records = load_corpus(args.corpus, args.limit)
+    stats = asyncio.run(run(records, max(args.concurrency, 1), args.model, args.max_tokens))
+    report(stats)
+    if args.json_out:
+        with open(args.json_out, 'w', encoding='utf-8') as f:
+            json.dump(stats, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,191 @@
+"""
+End-to-end throughput benchmark against the local simulator (sim/).
+
+Starts the simulated recruiter site and the mock LLM in-process, points
+BOSS_BASE_URL / OPENAI_BASE_URL at them, then runs the same phases as
+main.main() (login, 新招呼, 推荐牛人 per job) in a fresh browser profile and
+reports candidates per hour alongside the simulator's own counters.
+
+    python bench_e2e.py --greetings 10 --max-idx 60 --llm-latency 2 --headless
+
+--js-round-trips N first times N element lookups through the preinstalled
+in-page helper (driver_utils._bh) against shipping the whole lookup program
+per call, and tab.find() against the helper's text locator.
+
+Run once plain and once with --lean to compare page-load timing and memory
+(page_metrics in the JSON output) with and without the lean browser profile.
+"""
+import argparse, asyncio, json, os, sys, tempfile, threading, time
+
+from sim import boss_site, mock_llm
+
+
+# How driver_utils located a recommendFrame element before the helper library:
+# the whole program is sent and compiled on every call.
+_LEGACY_FRAME_POINT_JS = """
+    (function() {
+        var frame = document.querySelector('iframe[name="recommendFrame"]');
+        if (!frame) return null;
+        var frameRect = frame.getBoundingClientRect();
+        var doc = frame.contentDocument;
+        if (!doc) return null;
+        var res = doc.evaluate(%r, doc, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null);
+        var el = res.singleNodeValue;
+        if (!el) return null;
+        var r = el.getBoundingClientRect();
+        return JSON.stringify({
+            x: frameRect.left + r.left + r.width / 2,
+            y: frameRect.top + r.top + r.height / 2
+        });
+    })()
+"""
+
+
+async def js_round_trips(du, tab, n):
+    """Mean milliseconds per lookup: legacy program vs __bh, tab.find vs __bh text locator."""
+    await du.goto_recommend(tab)
+    xpath = du.xpath_resume_card.format(i=1)
+
+    async def timed(call):
+        await call()  # warm-up (installs the helper, compiles the XPath)
+        start = time.perf_counter()
+        for _ in range(n):
+            await call()
+        return (time.perf_counter() - start) / n * 1000
+
+    return {
+        'frame_xpath_legacy_ms': await timed(lambda: tab.evaluate(_LEGACY_FRAME_POINT_JS % xpath)),
+        'frame_xpath_helper_ms': await timed(lambda: du._bh(tab, 'point', 'frame', {'xpath': xpath})),
+        'text_tab_find_ms': await timed(lambda: tab.find('推荐牛人')),
+        'text_helper_ms': await timed(lambda: du._bh(tab, 'point', 'main', {'text': '推荐牛人'})),
+    }
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='在本地模拟站点上测量端到端吞吐量')
+    parser.add_argument('--jobs', nargs='+', default=['礼品福利销售经理'])
+    parser.add_argument('--keywords', nargs='*', default=['礼品', '福利', '节日', '工会'])
+    parser.add_argument('--max-idx', type=int, default=60, help='每个职位扫描的推荐卡片数')
+    parser.add_argument('--greetings', type=int, default=10, help='新招呼未读人数')
+    parser.add_argument('--resume-delay', type=float, default=0.5, help='简历 canvas 渲染延迟（秒）')
+    parser.add_argument('--greet-limit', type=int, default=0)
+    parser.add_argument('--captcha-after', type=int, default=0)
+    parser.add_argument('--llm-latency', type=float, default=1.0, help='模拟 LLM 预填充延迟（秒）')
+    parser.add_argument('--llm-chars-per-second', type=float, default=200.0)
+    parser.add_argument('--llm-concurrency', type=int, default=1, help='模拟 LLM 并发槽位（0 为不限）')
+    parser.add_argument('--qualified-rate', type=float, default=0.3)
+    parser.add_argument('--site-port', type=int, default=8800)
+    parser.add_argument('--llm-port', type=int, default=8900)
+    parser.add_argument('--headless', action='store_true')
+    parser.add_argument('--lean', action='store_true', help='启用精简浏览器配置（LEAN_PROFILE）')
+    parser.add_argument('--js-round-trips', type=int, default=0,
+                        help='登录后对比页内辅助库与整段 JS 的往返耗时（次数，0 为跳过）')
+    parser.add_argument('--json', dest='json_out', help='将结果写入 JSON 文件')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    jobs = [{'title': t, 'keywords': args.keywords} for t in args.jobs]
+    site = boss_site.SiteState(jobs, candidates_per_job=max(args.max_idx * 2, 30), greetings=args.greetings,
+                               resume_delay=args.resume_delay, greet_limit=args.greet_limit,
+                               captcha_after=args.captcha_after)
+    llm = mock_llm.MockLLM(args.llm_latency, chars_per_second=args.llm_chars_per_second,
+                           qualified_rate=args.qualified_rate, max_concurrency=args.llm_concurrency)
+    site_server = boss_site.make_server(site, port=args.site_port)
+    llm_server = mock_llm.make_server(llm, port=args.llm_port)
+    for server in (site_server, llm_server):
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    # Configure the app before importing it: modules read their settings at import time
+    base_url = f'http://127.0.0.1:{args.site_port}'
+    os.environ.update(
+        BOSS_BASE_URL=base_url,
+        OPENAI_BASE_URL=f'http://127.0.0.1:{args.llm_port}/v1',
+        OPENAI_API_KEY='sim',
+        LLM_MODEL='mock',
+        DISABLE_LLM_CACHE='true',
+        LEAN_PROFILE='true' if args.lean else os.environ.get('LEAN_PROFILE', 'false'),
+        LLM_USAGE_PATH=os.path.join(tempfile.gettempdir(), 'bench_e2e_usage.json'),
+    )
+    sys.argv = sys.argv[:1]
+    import main as app
+    import zendriver as zd
+    from log_utils import logger
+
+    job_configs = [{
+        'job_title': job['title'],
+        'max_idx': args.max_idx,
+        'url': base_url + '/',
+        'job_requirements': {
+            'age_lower_bound': 22,
+            'age_upper_bound': 40,
+            'education': 0,
+            'cv_required_keywords': args.keywords,
+            'cv_requirements': f"该职位需要面试者有一年或以上{job['title']}相关经历。",
+        },
+    } for job in jobs]
+
+    page_metrics = {}
+    round_trips = {}
+
+    async def run():
+        with tempfile.TemporaryDirectory(prefix='bench_e2e_profile_') as profile:
+            lean = app.browser_utils.launch_options()
+            browser = await zd.start(
+                headless=args.headless or lean['headless'],
+                user_data_dir=profile,
+                browser_args=['--disable-dev-shm-usage', '--window-size=1920,1080', *lean['browser_args']],
+            )
+            tab = browser.main_tab
+            try:
+                await app.browser_utils.apply(tab)
+                await tab.get(base_url + '/')
+                start = time.perf_counter()
+                await app.driver_utils.log_in(tab)
+                await app.driver_utils.close_popover(tab)
+                page_metrics['login'] = await app.browser_utils.report_page_metrics(tab, '登录后', profile)
+                if args.js_round_trips:
+                    round_trips.update(await js_round_trips(app.driver_utils, tab, args.js_round_trips))
+                    logger.llm('页内辅助库往返（平均）：recommendFrame 定位 整段 JS {frame_xpath_legacy_ms:.1f}ms → '
+                               '__bh {frame_xpath_helper_ms:.1f}ms；文本定位 tab.find {text_tab_find_ms:.1f}ms → '
+                               '__bh {text_helper_ms:.1f}ms'.format(**round_trips))
+                    start = time.perf_counter()
+                await app.run_jobs(tab, job_configs)
+                return time.perf_counter() - start
+            finally:
+                app.log_final_stats()
+                page_metrics['exit'] = await app.browser_utils.report_page_metrics(tab, '退出前', profile)
+                await app.client.close()
+                app.image_utils.shutdown()
+                await browser.stop()
+
+    try:
+        elapsed = asyncio.run(run())
+    finally:
+        site_server.shutdown()
+        llm_server.shutdown()
+
+    site_stats = site.snapshot()
+    handled = site_stats['resume_opens']
+    result = {
+        'elapsed_seconds': elapsed,
+        'lean_profile': app.browser_utils.LEAN_PROFILE,
+        'page_metrics': page_metrics,
+        'js_round_trips': round_trips,
+        'resumes_opened': handled,
+        'candidates_per_hour': handled / elapsed * 3600 if elapsed else 0.0,
+        'site': site_stats,
+        'llm': llm.stats,
+        'job_stats': app.job_stats,
+    }
+    logger.llm(f"端到端：{elapsed:.0f}s 内打开简历 {handled} 份（{result['candidates_per_hour']:.0f} 份/小时），"
+               f"打招呼 {site_stats['greets']}，求简历 {site_stats['requests']}，标记不合适 {site_stats['unsuitable']}，"
+               f"LLM 请求 {llm.stats['requests']}（占用 {llm.stats['busy_seconds']:.0f}s）")
+    if args.json_out:
+        with open(args.json_out, 'w', encoding='utf-8') as f:
+            json.dump(result, f, ensure_ascii=False, indent=2, default=str)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,335 @@
+"""
+Lean browser profile for unattended runs.
+
+With LEAN_PROFILE=true the session blocks analytics, ads and media through
+Network.setBlockedURLs, launches Chrome with the background-throttling switches
+off, and emulates focus so page timers keep running when the window is hidden.
+BROWSER_HEADLESS=true additionally uses Chrome's new headless mode.  Only
+third-party hosts and media files may be blocked: a pattern that could match a
+first-party URL (BOSS_BASE_URL, zhipin.com, bosszhipin.com, where the resume
+page, its data API and images live) or a RESUME_IMAGE_PATTERNS host is dropped,
+so blocking never affects capture.
+
+report_page_metrics() logs page-load timing and memory so runs with and without
+the lean profile can be compared.
+
+Profiles: every BOSS account has its own Chrome user-data dir.  A process that
+owns its browser (main.py, or daemon.py for a long-lived browser) holds
+lock_profile() on it, and each main.py run also holds the profile's RUN_LOCK,
+so two runs never drive one browser.  daemon.py publishes the browser's
+remote-debugging endpoint in the profile (write_endpoint), and main.py attaches
+to it (read_endpoint, attach) instead of launching Chrome and logging in again.
+"""
+import asyncio
+import fcntl
+import glob
+import json
+import os
+import re
+import subprocess
+import urllib.request
+from urllib.parse import urlsplit
+from fnmatch import fnmatchcase
+from random import gauss
+from dotenv import load_dotenv
+import asyncio_atexit
+import zendriver as zd
+from zendriver import cdp
+from zendriver.core import util
+from zendriver.core.connection import ProtocolException
+import driver_utils
+from log_utils import logger
+load_dotenv()
+
+# Default Chrome profile; each BOSS account needs its own (main.py --profile, see orchestrator.py)
+DEFAULT_PROFILE_DIR = os.getenv("CHROME_PROFILE_DIR", "/tmp/chrome_user_data")
+ENDPOINT_FILE = "boss_hire.endpoint"  # inside the profile, written by daemon.py
+PROFILE_LOCK = "boss_hire.lock"       # held by the process that owns the profile's Chrome
+RUN_LOCK = "boss_hire.run.lock"       # held by the main.py run driving it (launched or attached)
+
+LEAN_PROFILE = os.getenv("LEAN_PROFILE", "false").lower() == "true"
+BROWSER_HEADLESS = os.getenv("BROWSER_HEADLESS", "false").lower() == "true"
+
+_DEFAULT_BLOCKED = [
+    # analytics / ads beacons
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*", "*hm.baidu.com*",
+    "*cnzz.com*", "*sensorsdata.cn*", "*growingio.com*",
+    # media
+    "*.mp4", "*.mp4?*", "*.webm", "*.webm?*", "*.m3u8*", "*.mp3",
+]
+BLOCK_URL_PATTERNS = [
+    p.strip() for p in os.getenv("BLOCK_URL_PATTERNS", ",".join(_DEFAULT_BLOCKED)).split(",") if p.strip()
+]
+
+# Switches that keep timers and rendering at full speed in unfocused/occluded windows.
+_ANTI_THROTTLING_ARGS = [
+    "--disable-background-timer-throttling",
+    "--disable-backgrounding-occluded-windows",
+    "--disable-renderer-backgrounding",
+    "--disable-features=CalculateNativeWinOcclusion",
+]
+
+# The resume data API's path is not known, so no first-party URL may be blocked at all.
+_FIRST_PARTY_DOMAINS = ("zhipin.com", "bosszhipin.com", urlsplit(driver_utils.BOSS_BASE_URL).hostname or "")
+_MEDIA_EXTENSIONS = {"mp4", "webm", "m3u8", "mp3", "m4a", "aac", "ogg", "wav", "flv", "mov"}
+_DOMAIN = re.compile(r"[a-z0-9-]+\.[a-z]{2,}")
+_MEDIA_PATTERN = re.compile(r"\*\.([a-z0-9]+)(\?\*|\*)?")
+
+
+def _pattern_host(pattern: str) -> str:
+    """The host part of a URL pattern: what precedes its first path '/' (after any scheme)."""
+    rest = pattern.lower().lstrip("*")
+    if "://" in rest:
+        rest = rest.split("://", 1)[1]
+    return rest.split("/", 1)[0]
+
+
+def _protects_resume(pattern: str) -> bool:
+    """Whether pattern could match a first-party or resume image URL.
+
+    Only patterns naming a third-party domain in their host part (e.g.
+    "*doubleclick.net*") or matching a media file ("*.mp4") are safe; a path-only
+    pattern such as "*/wapi/zpgeek/*" matches on every host, the site's included.
+    """
+    lowered = pattern.lower()
+    if any(domain and domain in lowered for domain in _FIRST_PARTY_DOMAINS):
+        return True
+    # An image host pattern overlapping a block pattern, e.g. "*.zhipin.com/*" vs "*zhipin*"
+    if any(fnmatchcase(p.strip("*"), pattern) or fnmatchcase(pattern.strip("*"), p)
+           for p in driver_utils.RESUME_IMAGE_PATTERNS):
+        return True
+    media = _MEDIA_PATTERN.fullmatch(lowered)
+    if media and media.group(1) in _MEDIA_EXTENSIONS:
+        return False
+    return not _DOMAIN.search(_pattern_host(pattern))
+
+
+def blocked_patterns() -> list[str]:
+    """BLOCK_URL_PATTERNS minus anything that could match a first-party or resume asset URL."""
+    kept = []
+    for pattern in BLOCK_URL_PATTERNS:
+        if _protects_resume(pattern):
+            logger.warning(f"屏蔽规则可能匹配站内或简历资源，已忽略：{pattern}")
+        else:
+            kept.append(pattern)
+    return kept
+
+
+def launch_options() -> dict:
+    """Extra keyword arguments for zd.start(): headless flag and browser args."""
+    args = list(_ANTI_THROTTLING_ARGS) if LEAN_PROFILE else []
+    if LEAN_PROFILE:
+        args += ["--mute-audio", "--disable-gpu"]
+    return {"headless": BROWSER_HEADLESS, "browser_args": args}
+
+
+async def apply(tab):
+    """Per-tab part of the lean profile: URL blocking and focus emulation."""
+    if not LEAN_PROFILE:
+        return
+    patterns = blocked_patterns()
+    if patterns:
+        driver_utils.keep_network_enabled(tab)
+        await tab.send(cdp.network.enable())
+        await tab.send(cdp.network.set_blocked_ur_ls(urls=patterns))
+    try:
+        await tab.send(cdp.emulation.set_focus_emulation_enabled(enabled=True))
+    except ProtocolException as e:
+        logger.warning(f"无法启用焦点模拟：{e}")
+    logger.info(f"精简浏览器配置已启用：屏蔽 {len(patterns)} 条 URL 规则，焦点模拟，"
+                f"{'无头模式' if BROWSER_HEADLESS else '有界面模式'}")
+
+
+def _process_rss_mb(user_data_dir: str | None) -> float | None:
+    """Total RSS of the Chrome processes using user_data_dir (Linux /proc only)."""
+    if not user_data_dir or not os.path.isdir("/proc"):
+        return None
+    marker = f"--user-data-dir={user_data_dir}".encode()
+    total = 0
+    for pid in filter(str.isdigit, os.listdir("/proc")):
+        try:
+            with open(f"/proc/{pid}/cmdline", "rb") as f:
+                if marker not in f.read():
+                    continue
+            with open(f"/proc/{pid}/statm") as f:
+                total += int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        except (OSError, ValueError, IndexError):
+            continue
+    return total / 1048576 if total else None
+
+
+async def page_metrics(tab, user_data_dir: str | None = None) -> dict:
+    """Navigation timing of the current document plus JS heap, DOM size and browser RSS."""
+    metrics = {}
+    try:
+        await tab.send(cdp.performance.enable())
+        for m in await tab.send(cdp.performance.get_metrics()):
+            if m.name in ("JSHeapUsedSize", "JSHeapTotalSize", "Nodes", "Documents", "Frames"):
+                metrics[m.name] = m.value
+    except ProtocolException:
+        pass
+    timing = await tab.evaluate("""
+        (function() {
+            var n = performance.getEntriesByType('navigation')[0];
+            if (!n) return null;
+            return JSON.stringify({dom: n.domContentLoadedEventEnd, load: n.loadEventEnd,
+                                   resources: performance.getEntriesByType('resource').length});
+        })()
+    """)
+    if timing:
+        metrics.update(json.loads(timing))
+    rss = _process_rss_mb(user_data_dir)
+    if rss is not None:
+        metrics["rss_mb"] = rss
+    return metrics
+
+
+async def report_page_metrics(tab, label: str, user_data_dir: str | None = None) -> dict:
+    """Log page_metrics() under label (e.g. after login / at exit) and return them."""
+    m = await page_metrics(tab, user_data_dir)
+    profile = "精简" if LEAN_PROFILE else "标准"
+    parts = [f"页面指标[{label}，{profile}配置]："]
+    if "load" in m:
+        parts.append(f"DOMContentLoaded {m['dom']:.0f}ms，load {m['load']:.0f}ms，资源 {m['resources']} 个")
+    if "JSHeapUsedSize" in m:
+        parts.append(f"JS 堆 {m['JSHeapUsedSize'] / 1048576:.0f}/{m['JSHeapTotalSize'] / 1048576:.0f}MB，"
+                     f"DOM 节点 {m.get('Nodes', 0):.0f}")
+    if "rss_mb" in m:
+        parts.append(f"浏览器内存 {m['rss_mb']:.0f}MB")
+    logger.llm(" ".join(parts))
+    return m
+
+
+def lock_profile(profile: str, lock_name: str = PROFILE_LOCK):
+    """Take an exclusive lock on profile for this process; None if another process holds it.
+
+    The lock lives as long as the returned file object stays open; the file
+    holds the owner's pid.
+    """
+    os.makedirs(profile, exist_ok=True)
+    lock_file = open(os.path.join(profile, lock_name), "a+")  # no truncation before the lock is ours
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        lock_file.close()
+        return None
+    lock_file.truncate(0)
+    lock_file.write(str(os.getpid()))
+    lock_file.flush()
+    return lock_file
+
+
+def _lock_holder(profile: str, lock_name: str = PROFILE_LOCK) -> int | None:
+    """pid of the process holding lock_name on profile, or None when nobody holds it."""
+    try:
+        lock_file = open(os.path.join(profile, lock_name))
+    except OSError:
+        return None
+    with lock_file:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_SH | fcntl.LOCK_NB)
+        except BlockingIOError:
+            try:
+                return int(lock_file.read().strip())
+            except ValueError:
+                return 0  # held, owner not written yet
+        return None
+
+
+def clear_chrome_locks(profile: str):
+    """Kill a Chrome left over from a previous run on profile and remove its lock files.
+
+    Only processes started with exactly this --user-data-dir are matched, so
+    browsers of other accounts on the same host are left alone.
+    """
+    pattern = "--user-data-dir=" + re.sub(r"([.^$*+?()\[\]{}|\\])", r"\\\1", profile) + "( |$)"
+    subprocess.run(["pkill", "-9", "-f", "--", pattern], capture_output=True)
+    patterns = [
+        os.path.join(glob.escape(profile), "Singleton*"),
+        os.path.join(glob.escape(profile), "Default", "Lock"),
+        os.path.join(glob.escape(profile), "Default", "LOCK"),
+    ]
+    for pattern in patterns:
+        for f in glob.glob(pattern):
+            try:
+                os.remove(f)
+            except FileNotFoundError:
+                pass
+
+
+async def launch_browser(url: str, profile: str = DEFAULT_PROFILE_DIR):
+    """Cold-start Chrome on profile and open url; returns (browser, tab)."""
+    clear_chrome_locks(profile)
+    await asyncio.sleep(max(1 + gauss(0, 0.25), 0.3))
+    lean = launch_options()
+    browser = await zd.start(
+        headless=lean["headless"],
+        user_data_dir=profile,
+        browser_args=[
+            "--disable-dev-shm-usage",
+            "--disable-notifications",
+            "--window-size=1920,1080",
+            *lean["browser_args"],
+        ],
+        browser_connection_timeout=1.0,
+        browser_connection_max_tries=15,
+    )
+    # Block URLs / emulate focus on the blank start tab, before the first real page load
+    tab = browser.main_tab
+    await apply(tab)
+    await tab.get(url)
+    await asyncio.sleep(max(2 + gauss(0, 0.5), 0.6))
+    return browser, tab
+
+
+def write_endpoint(profile: str, browser):
+    """Publish browser's remote-debugging endpoint for attach()."""
+    with open(os.path.join(profile, ENDPOINT_FILE), "w") as f:
+        json.dump({"host": browser.config.host, "port": browser.config.port, "pid": os.getpid()}, f)
+
+
+def remove_endpoint(profile: str):
+    try:
+        os.remove(os.path.join(profile, ENDPOINT_FILE))
+    except FileNotFoundError:
+        pass
+
+
+def read_endpoint(profile: str) -> dict | None:
+    """The endpoint a daemon published for profile, or None if there is none or it is not live.
+
+    Live means the daemon that wrote it still holds the profile lock, and the
+    port answers.  A file left by a killed daemon is ignored even if another
+    browser has since taken that port.
+    """
+    try:
+        with open(os.path.join(profile, ENDPOINT_FILE)) as f:
+            endpoint = json.load(f)
+        if _lock_holder(profile) != endpoint["pid"]:
+            return None
+        with urllib.request.urlopen(f"http://{endpoint['host']}:{endpoint['port']}/json/version", timeout=1):
+            return endpoint
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+async def attach(endpoint: dict):
+    """Connect to the daemon's browser; returns (browser, tab) with tab the daemon's logged-in page."""
+    browser = await zd.start(host=endpoint["host"], port=endpoint["port"])
+    tab = browser.main_tab
+    await apply(tab)
+    return browser, tab
+
+
+async def detach(browser):
+    """Drop the connections to an attached browser without closing it.
+
+    browser.stop() would send Browser.close and end the daemon's session, and
+    zendriver also stops registered browsers at exit, so neither is used here.
+    """
+    asyncio_atexit.unregister(browser._atexit_cleanup)
+    util.get_registered_instances().discard(browser)
+    for target in browser.targets:
+        await target.aclose()
+    if browser.connection:
+        await browser.connection.aclose()
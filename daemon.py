@@ -0,0 +1,63 @@
+"""
+Keep one logged-in browser alive between runs of main.py.
+
+    python daemon.py [--profile /tmp/chrome_user_data]
+
+Launches Chrome on the profile (holding its lock), logs in once, then publishes
+the remote-debugging endpoint in the profile (browser_utils.write_endpoint).
+main.py runs with the same --profile attach to this browser instead of starting
+their own: no Chrome cold start, no login page, no popovers.  Every
+--check-interval seconds the daemon verifies the session is still logged in and
+warns when it is not (re-login needs a QR scan in the daemon's window).  Stop it
+with Ctrl-C or SIGTERM; the endpoint file is removed and the browser closed.
+"""
+import argparse, asyncio, signal, time
+
+import browser_utils, driver_utils
+from log_utils import logger
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='常驻浏览器：登录一次，供 main.py 连接复用')
+    parser.add_argument('--profile', default=browser_utils.DEFAULT_PROFILE_DIR, help='Chrome 用户数据目录')
+    parser.add_argument('--url', default=f'{driver_utils.BOSS_BASE_URL}/', help='启动后打开的页面')
+    parser.add_argument('--check-interval', type=float, default=600.0, help='登录状态检查间隔（秒）')
+    return parser.parse_args()
+
+
+async def run(args):
+    profile_lock = browser_utils.lock_profile(args.profile)
+    if profile_lock is None:
+        logger.error(f"浏览器配置目录 {args.profile} 正被另一个进程使用，退出。")
+        return
+    asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+    start = time.monotonic()
+    browser, tab = await browser_utils.launch_browser(args.url, args.profile)
+    try:
+        await driver_utils.log_in(tab)
+        await driver_utils.close_popover(tab)
+        browser_utils.write_endpoint(args.profile, browser)
+        logger.info(f"常驻浏览器已就绪（{time.monotonic() - start:.0f}s），"
+                    f"调试端口 {browser.config.host}:{browser.config.port}，配置目录 {args.profile}")
+        while True:
+            await asyncio.sleep(args.check_interval)
+            if browser.connection is None or browser.connection.closed:
+                logger.error("浏览器已关闭，常驻进程退出。")
+                return
+            if not await driver_utils.is_logged_in(tab):
+                logger.warning("常驻浏览器会话已失效，请在浏览器窗口中重新扫码登录。")
+    except driver_utils.CaptchaRequired:
+        logger.error("登录时遇到滑块验证，请在浏览器中完成验证后重新启动常驻进程。")
+    except asyncio.CancelledError:
+        pass
+    finally:
+        browser_utils.remove_endpoint(args.profile)
+        await browser.stop()
+        profile_lock.close()
+
+
+if __name__ == '__main__':
+    try:
+        asyncio.run(run(parse_args()))
+    except KeyboardInterrupt:
+        pass
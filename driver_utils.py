@@ -1,11 +1,20 @@
 import asyncio
 import base64
 import json
+import os
+import resume_utils
 from log_utils import logger
 import re
+import time
+import weakref
 from random import gauss
+from dotenv import load_dotenv
 from zendriver import cdp
 from zendriver.core.connection import ProtocolException
+load_dotenv()
+
+# Site root; point it at the local simulator (sim/boss_site.py) for offline benchmarks.
+BOSS_BASE_URL = os.getenv('BOSS_BASE_URL', 'https://www.zhipin.com').rstrip('/')
 
 
 class DailyGreetingLimitReached(Exception):
@@ -37,34 +46,125 @@ def _url_is_captcha(url: str | None) -> bool:
     return any(marker in path for marker in CAPTCHA_URL_MARKERS)
 
 
+# Our isolated world: page scripts share the DOM with it but none of its globals
+# (canvas reads, the __bh helpers), so nothing we define is visible to the site.
+WORLD_NAME = 'boss_hire'
+
+
+class FrameRegistry:
+    """Per-tab view of the frame tree, kept current from Page frame events.
+
+    Frame lookups (c-resume frames, CAPTCHA state) are plain dict reads with no
+    CDP traffic; the isolated world (WORLD_NAME) of each frame is looked up once
+    and reused until the frame navigates or detaches.  A frame navigating to a CAPTCHA page sets
+    `captcha`, so waiters can race it instead of polling.
+    """
+
+    def __init__(self, tab):
+        self.tab = tab
+        self.urls = {}      # frame_id -> url, in attach order (newest last)
+        self.parents = {}   # frame_id -> parent frame_id
+        self.worlds = {}    # frame_id -> isolated-world execution context id
+        self.main = None    # the top frame's id (stable across its navigations)
+        self.captcha = asyncio.Event()
+
+    async def start(self):
+        self.tab.add_handler(cdp.page.FrameAttached, self._on_attached)
+        self.tab.add_handler(cdp.page.FrameNavigated, self._on_navigated)
+        self.tab.add_handler(cdp.page.FrameDetached, self._on_detached)
+        await self.tab.send(cdp.page.enable())
+        # Seed with the frames that exist already; events that raced ahead win
+        tree = await self.tab.send(cdp.page.get_frame_tree())
+        def walk(node, parent):
+            self.urls.setdefault(node.frame.id_, node.frame.url or '')
+            if parent:
+                self.parents.setdefault(node.frame.id_, parent)
+            for child in (node.child_frames or []):
+                walk(child, node.frame.id_)
+        walk(tree, None)
+        self.main = tree.frame.id_
+        self._update_captcha()
+
+    def _update_captcha(self):
+        if any(_url_is_captcha(url) for url in self.urls.values()):
+            self.captcha.set()
+        else:
+            self.captcha.clear()
+
+    async def _on_attached(self, evt: cdp.page.FrameAttached):
+        self.urls.setdefault(evt.frame_id, '')
+        self.parents[evt.frame_id] = evt.parent_frame_id
+
+    async def _on_navigated(self, evt: cdp.page.FrameNavigated):
+        frame = evt.frame
+        self.urls[frame.id_] = frame.url or ''
+        if frame.parent_id:
+            self.parents[frame.id_] = frame.parent_id
+        self.worlds.pop(frame.id_, None)  # the new document has no world yet
+        self._update_captcha()
+
+    async def _on_detached(self, evt: cdp.page.FrameDetached):
+        gone = {evt.frame_id}
+        for fid in list(self.urls):
+            parent = self.parents.get(fid)
+            while parent is not None and parent not in gone:
+                parent = self.parents.get(parent)
+            if parent is not None:
+                gone.add(fid)
+        for fid in gone:
+            self.urls.pop(fid, None)
+            self.parents.pop(fid, None)
+            self.worlds.pop(fid, None)
+        self._update_captcha()
+
+    def has_captcha(self) -> bool:
+        return self.captcha.is_set()
+
+    def check_captcha(self, what: str):
+        if self.captcha.is_set():
+            raise CaptchaRequired(f"CAPTCHA detected while {what}")
+
+    def c_resume_ids(self) -> list:
+        """All c-resume frame IDs, oldest first."""
+        return [fid for fid, url in self.urls.items() if 'c-resume' in url]
+
+    async def world(self, frame_id) -> int:
+        """Isolated-world context for frame_id, created on first use (or found, if _HELPER_JS made it)."""
+        ctx_id = self.worlds.get(frame_id)
+        if ctx_id is None:
+            ctx_id = await self.tab.send(cdp.page.create_isolated_world(
+                frame_id=frame_id, world_name=WORLD_NAME
+            ))
+            self.worlds[frame_id] = ctx_id
+        return ctx_id
+
+    def forget_world(self, frame_id):
+        self.worlds.pop(frame_id, None)
+
+
+_registries = {}  # id(tab) -> FrameRegistry
+
+
+async def frame_registry(tab) -> FrameRegistry:
+    """The tab's FrameRegistry, started on first use."""
+    registry = _registries.get(id(tab))
+    if registry is None or registry.tab is not tab:
+        registry = FrameRegistry(tab)
+        _registries[id(tab)] = registry
+        await registry.start()
+    return registry
+
+
 async def _any_frame_has_captcha(tab) -> bool:
     """Return True if the main tab or any child frame is showing the CAPTCHA page."""
     if _url_is_captcha(tab.url):
         return True
     try:
-        frame_tree = await tab.send(cdp.page.get_frame_tree())
-        def _walk(node):
-            if _url_is_captcha(node.frame.url):
-                return True
-            return any(_walk(child) for child in (node.child_frames or []))
-        return _walk(frame_tree)
+        return (await frame_registry(tab)).has_captcha()
     except Exception:
         return False
 
 
-async def _find_or_captcha(tab, text: str):
-    """Wrap tab.find(text), raising CaptchaRequired instead of a bare timeout
-    when the platform redirected to the CAPTCHA page instead of showing the
-    expected element (tab.find has no captcha awareness of its own).
-    """
-    try:
-        return await tab.find(text)
-    except TimeoutError:
-        if await _any_frame_has_captcha(tab):
-            raise CaptchaRequired(f"CAPTCHA detected while waiting for '{text}'")
-        raise
-
-
 def jitter(mu: float, sigma: float | None = None) -> float:
     """Return a normally-distributed sleep duration centered on mu (sigma defaults to 25% of mu).
 
@@ -76,11 +176,70 @@ def jitter(mu: float, sigma: float | None = None) -> float:
     return max(mu + gauss(0, sigma), floor)
 
 
+# Minimum spacing (seconds, jittered) between page actions (clicks, navigations,
+# scrolls) across all tabs once shared pacing is enabled (multi-tab mode, see
+# main.run_jobs_concurrent).
+ACTION_MIN_INTERVAL = float(os.getenv('ACTION_MIN_INTERVAL', '1.5'))
+
+pacing_stats = {'actions': 0, 'delayed': 0, 'seconds': 0.0}
+
 
-xpath_age = '//*[@id="recommend-list"]/div/ul/li[{i}]/div/div[1]/div[2]/div[2]/div'
-xpath_resume_card_is_viewed = '//*[@id="recommend-list"]/div/ul/li[{i}]'
+class _Pacer:
+    """One action budget shared by every tab: actions are serialized and spaced by jitter(interval)."""
+
+    def __init__(self):
+        self.interval = 0.0  # 0 = pacing off (single tab: the per-step jitter sleeps already pace it)
+        self.last = 0.0
+        self.lock = asyncio.Lock()
+
+    async def wait(self):
+        pacing_stats['actions'] += 1
+        if not self.interval:
+            return
+        async with self.lock:
+            delay = self.last + jitter(self.interval) - time.monotonic()
+            if delay > 0:
+                pacing_stats['delayed'] += 1
+                pacing_stats['seconds'] += delay
+                await asyncio.sleep(delay)
+            self.last = time.monotonic()
+
+
+_pacer = _Pacer()
+
+
+def enable_shared_pacing(interval: float = ACTION_MIN_INTERVAL):
+    """Space clicks, navigations and scrolls from all tabs at least ~interval seconds apart."""
+    _pacer.interval = interval
+
+
+async def navigate(tab, url: str):
+    """Load url in tab, after the shared pacer allows it."""
+    await _pacer.wait()
+    await tab.get(url)
+
+
+async def _click(tab, x: float, y: float):
+    """Real mouse click at viewport (x, y), after the shared pacer allows it."""
+    await _pacer.wait()
+    await tab.mouse_click(x, y)
+
+
+async def _click_element(tab, element) -> bool:
+    """Real mouse click (through _click) at the centre of a zendriver element; False if it has no box."""
+    await element.scroll_into_view()
+    pos = await element.get_position()
+    if pos is None:
+        logger.warning("_click_element: element has no position: %s", element)
+        return False
+    await _click(tab, *pos.center)
+    return True
+
+
+xpath_card_age = './div/div[1]/div[2]/div[2]/div'  # relative to the card <li>
 xpath_resume_card = '//*[@id="recommend-list"]/div/ul/li[{i}]/div/div[1]'
 xpath_say_hi = '//button[contains(@class, "btn-sure-v2") and contains(@class, "btn-greet")]'
+xpath_card_say_hi = '//*[@id="recommend-list"]/div/ul/li[{i}]//button[contains(@class, "btn-greet")]'
 xpath_i_know_after_say_hi = '//button[contains(text(),"知道了")]'
 css_resume_close = '.close-btn'
 
@@ -104,6 +263,286 @@ async def _in_frame(tab, js_body: str):
     """)
 
 
+# In-page helper library, registered once per tab with Page.addScriptToEvaluateOnNewDocument
+# in our isolated world (WORLD_NAME), so the page never sees window.__bh; a document that
+# predates the registration gets it on first use.  Python calls it through _bh()
+# with a one-line expression, so the locators are parsed once per document instead of
+# on every click; XPath expressions are compiled once per document and cached.
+#   point(where, loc, opts) - viewport centre {x, y} of an element, recommendFrame offset
+#                             included for where='frame'; loc is {xpath}, {css},
+#                             {css, text} (exact innerText), {css, prefix} (textContent
+#                             prefix) or {text[, exact]} (visible element whose own text
+#                             contains/equals text, shortest textContent wins as in
+#                             tab.find); opts {scroll, visible}
+#   texts(where, css)       - trimmed innerText of every match
+#   text(where, css)        - trimmed innerText of the first match, '' if none
+#   shown(where, css)       - whether the first match has a non-empty box
+#   cards(ageXpath)         - the recommend list snapshot (see snapshot_cards)
+#   scroll(dy)              - scroll the recommendFrame by dy, or to its end for 'bottom'
+#   type(css, text)         - set a contenteditable's text and fire input
+_HELPER_JS = """
+(function() {
+    if (window.__bh) return;
+    var compiled = new WeakMap();
+    function xpath(doc, expr, ctx) {
+        var cache = compiled.get(doc);
+        if (!cache) { cache = new Map(); compiled.set(doc, cache); }
+        var e = cache.get(expr);
+        if (!e) { e = doc.createExpression(expr, null); cache.set(expr, e); }
+        return e.evaluate(ctx || doc, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+    }
+    function frame() {
+        var f = document.querySelector('iframe[name="recommendFrame"]');
+        if (!f || !f.contentDocument) return null;
+        return {el: f, doc: f.contentDocument, win: f.contentWindow};
+    }
+    function scope(where) {
+        if (where !== 'frame') return {doc: document, win: window, dx: 0, dy: 0};
+        var f = frame();
+        if (!f) return null;
+        var r = f.el.getBoundingClientRect();
+        return {doc: f.doc, win: f.win, dx: r.left, dy: r.top};
+    }
+    function boxed(el) {
+        var r = el.getBoundingClientRect();
+        return r.width > 0 || r.height > 0;
+    }
+    function byText(doc, text, exact) {
+        var best = null, bestLen = Infinity;
+        var walker = doc.createTreeWalker(doc.body || doc, NodeFilter.SHOW_TEXT);
+        for (var n = walker.nextNode(); n; n = walker.nextNode()) {
+            if (exact ? n.data.trim() !== text : n.data.indexOf(text) < 0) continue;
+            var el = n.parentElement;
+            if (!el || !boxed(el)) continue;
+            var len = el.textContent.length;
+            if (len < bestLen) { best = el; bestLen = len; }
+        }
+        return best;
+    }
+    function find(s, loc) {
+        if (loc.xpath) return xpath(s.doc, loc.xpath);
+        if (!loc.css) return byText(s.doc, loc.text, loc.exact);
+        if (loc.text == null && loc.prefix == null) return s.doc.querySelector(loc.css);
+        var els = s.doc.querySelectorAll(loc.css);
+        for (var i = 0; i < els.length; i++) {
+            if (loc.text != null ? els[i].innerText.trim() === loc.text
+                                 : els[i].textContent.trim().startsWith(loc.prefix)) return els[i];
+        }
+        return null;
+    }
+    function cardId(li) {
+        var attrs = ['data-geekid', 'data-geek', 'data-expect', 'data-uid', 'data-id'];
+        var nodes = [li].concat(Array.from(li.querySelectorAll('*')));
+        for (var n of nodes) {
+            for (var a of attrs) {
+                var v = n.getAttribute(a);
+                if (v) return a + ':' + v;
+            }
+        }
+        return '';
+    }
+    var api = {
+        point: function(where, loc, opts) {
+            opts = opts || {};
+            var s = scope(where);
+            var el = s && find(s, loc);
+            if (!el) return null;
+            if (opts.scroll) el.scrollIntoView({block: opts.scroll, behavior: 'instant'});
+            var r = el.getBoundingClientRect();
+            if (opts.visible && r.width === 0 && r.height === 0) return null;
+            return {x: s.dx + r.left + r.width / 2, y: s.dy + r.top + r.height / 2};
+        },
+        texts: function(where, css) {
+            var s = scope(where);
+            return s ? Array.from(s.doc.querySelectorAll(css), function(e) { return e.innerText.trim(); }) : [];
+        },
+        text: function(where, css) {
+            var s = scope(where), el = s && s.doc.querySelector(css);
+            return el ? el.innerText.trim() : '';
+        },
+        shown: function(where, css) {
+            var s = scope(where), el = s && s.doc.querySelector(css);
+            return !!el && boxed(el);
+        },
+        cards: function(ageXpath) {
+            var f = frame();
+            if (!f) return null;
+            var items = f.doc.querySelectorAll('#recommend-list > div > ul > li');
+            return Array.from(items, function(li) {
+                var card = li.querySelector(':scope > div > div');
+                var inner = li.querySelector("div[class*='card-inner']");
+                var age = xpath(f.doc, ageXpath, li);
+                return {
+                    id: cardId(li),
+                    text: card ? card.textContent : li.textContent,
+                    viewed: !!inner && inner.className.indexOf('has-viewed') >= 0,
+                    age: age ? age.textContent : ''
+                };
+            });
+        },
+        scroll: function(dy) {
+            var f = frame();
+            if (!f) return;
+            f.win.scrollTo(0, dy === 'bottom' ? f.doc.body.scrollHeight : f.win.scrollY + dy);
+        },
+        type: function(css, text) {
+            var ed = document.querySelector(css);
+            if (!ed) return false;
+            ed.focus();
+            ed.innerText = text;
+            ed.dispatchEvent(new Event('input', {bubbles: true}));
+            return true;
+        }
+    };
+    Object.defineProperty(window, '__bh', {value: api, enumerable: false, configurable: true});
+})();
+"""
+_HELPER_MISSING = '__bh:missing'
+_helper_tabs = weakref.WeakSet()  # tabs with _HELPER_JS registered for new documents
+
+
+async def _helper_world(tab) -> tuple:
+    """(registry, context id) of the main frame's isolated world, where __bh lives.
+
+    The first call registers _HELPER_JS for every new document of tab, in that
+    world only, so window.__bh is never visible to the page's own scripts.
+    """
+    registry = await frame_registry(tab)
+    if tab not in _helper_tabs:
+        await tab.send(cdp.page.add_script_to_evaluate_on_new_document(source=_HELPER_JS, world_name=WORLD_NAME))
+        _helper_tabs.add(tab)
+    return registry, await registry.world(registry.main)
+
+
+async def _bh(tab, method: str, *args):
+    """Call __bh.<method>(*args) in the helper world and return its value (None on error)."""
+    expression = (f"window.__bh ? __bh.{method}({json.dumps(args, ensure_ascii=False)[1:-1]})"
+                  f" : '{_HELPER_MISSING}'")
+    for _ in range(3):  # room for one lost context and one late install
+        registry, ctx_id = await _helper_world(tab)
+        try:
+            result, exc = await tab.send(cdp.runtime.evaluate(
+                expression=expression, context_id=ctx_id, return_by_value=True
+            ))
+        except ProtocolException as e:
+            # Context gone (the page navigated between events); the retry looks the world up again
+            logger.debug("__bh.%s failed: %s", method, e)
+            registry.forget_world(registry.main)
+            continue
+        if exc:
+            logger.debug("__bh.%s raised: %s", method, exc.text)
+            return None
+        if result.value != _HELPER_MISSING:
+            return result.value
+        # A document that predates the registration
+        await tab.send(cdp.runtime.evaluate(expression=_HELPER_JS, context_id=ctx_id))
+    return None
+
+
+async def _locate_text(tab, text: str, timeout: float = 10) -> dict:
+    """Centre of the visible main-page element showing text (the match tab.find would pick).
+
+    Waits up to timeout for it to appear.  Raises CaptchaRequired when a frame was
+    redirected to the CAPTCHA page instead, TimeoutError otherwise.
+    """
+    loc = json.dumps({'text': text}, ensure_ascii=False)
+    pos = await _wait_until(tab, f"return __bh.point('main', {loc}, {{scroll: 'nearest'}});", timeout,
+                            helpers=True)
+    if pos:
+        return pos
+    if await _any_frame_has_captcha(tab):
+        raise CaptchaRequired(f"CAPTCHA detected while waiting for '{text}'")
+    raise TimeoutError(f"element with text '{text}' not found")
+
+
+async def _click_text(tab, text: str, timeout: float = 10):
+    """Real mouse click on the element _locate_text finds."""
+    pos = await _locate_text(tab, text, timeout)
+    await _click(tab, pos['x'], pos['y'])
+
+
+# Resolves once the predicate (a JS function body) returns a truthy value, or with
+# null after timeoutMs.  A MutationObserver re-checks on every DOM change in the
+# document and in every same-origin iframe (re-attached when a frame navigates);
+# the interval catches what mutations do not signal (layout, canvas drawing).
+_WAIT_JS = """
+new Promise(function(resolve) {
+    var opts = {childList: true, subtree: true, attributes: true, characterData: true};
+    var docs = new WeakSet(), frames = new WeakSet(), done = false, observer, timer, poll;
+    function check() { try { return (function() { %(predicate)s })(); } catch (e) { return null; } }
+    function fire() {
+        if (done) return;
+        var v = check();
+        if (v) finish(v);
+    }
+    function finish(v) {
+        done = true;
+        observer.disconnect();
+        clearTimeout(timer);
+        clearInterval(poll);
+        resolve(v);
+    }
+    function attach(doc) {
+        if (!doc || docs.has(doc)) return;
+        docs.add(doc);
+        observer.observe(doc, opts);
+        doc.querySelectorAll('iframe').forEach(watchFrame);
+    }
+    function watchFrame(f) {
+        if (frames.has(f)) return;
+        frames.add(f);
+        f.addEventListener('load', function() { try { attach(f.contentDocument); } catch (e) {} fire(); });
+        try { attach(f.contentDocument); } catch (e) {}
+    }
+    observer = new MutationObserver(function(records) {
+        records.forEach(function(r) {
+            r.addedNodes.forEach(function(n) {
+                if (n.tagName === 'IFRAME') watchFrame(n);
+                else if (n.querySelectorAll) n.querySelectorAll('iframe').forEach(watchFrame);
+            });
+        });
+        fire();
+    });
+    var first = check();
+    if (first) return resolve(first);
+    attach(document);
+    poll = setInterval(fire, %(poll_ms)d);
+    timer = setTimeout(function() { if (!done) finish(null); }, %(timeout_ms)d);
+})
+"""
+
+
+async def _wait_until(tab, predicate_js: str, timeout: float, poll_ms: int = 500, helpers: bool = False):
+    """Wait in the page until predicate_js (a JS function body) returns a truthy value.
+
+    The check runs inside the page on DOM mutations (see _WAIT_JS), so the caller
+    resumes the moment the element appears instead of after the next poll, with a
+    single CDP round trip.  With helpers=True it runs in the helper world and may
+    use __bh.  Returns the predicate's value, or None on timeout or when the page
+    navigates away mid-wait.
+    """
+    expression = _WAIT_JS % {'predicate': predicate_js, 'poll_ms': poll_ms, 'timeout_ms': int(timeout * 1000)}
+    ctx_id = None
+    if helpers:
+        registry, ctx_id = await _helper_world(tab)
+        expression = f"{_HELPER_JS};\n{expression}"  # installs __bh if this document predates it
+    try:
+        result, exc = await asyncio.wait_for(
+            tab.send(cdp.runtime.evaluate(expression=expression, context_id=ctx_id, await_promise=True,
+                                          return_by_value=True)),
+            timeout + 2,
+        )
+    except ProtocolException:
+        if helpers:
+            registry.forget_world(registry.main)
+        return None
+    except TimeoutError:
+        return None
+    if exc or not result:
+        return None
+    return result.value
+
+
 async def _frame_xpath_click(tab, xpath):
     """Click the first element matching xpath inside the recommendFrame."""
     await _in_frame(tab, f"""
@@ -117,21 +556,12 @@ async def _frame_xpath_click(tab, xpath):
 async def _mouse_click_css(tab, selector: str, warn: bool = True) -> bool:
     """Click a main-page element by CSS selector using a real CDP mouse event (isTrusted=true).
     Returns True if element was found and clicked."""
-    pos = await tab.evaluate(f"""
-        (function() {{
-            var el = document.querySelector({repr(selector)});
-            if (!el) return null;
-            var r = el.getBoundingClientRect();
-            if (r.width === 0 && r.height === 0) return null;
-            return JSON.stringify({{x: r.left + r.width / 2, y: r.top + r.height / 2}});
-        }})()
-    """)
+    pos = await _bh(tab, 'point', 'main', {'css': selector}, {'visible': True})
     if not pos:
         if warn:
             logger.warning("_mouse_click_css: element not found: %s", selector)
         return False
-    coords = json.loads(pos)
-    await tab.mouse_click(coords['x'], coords['y'])
+    await _click(tab, pos['x'], pos['y'])
     return True
 
 
@@ -139,30 +569,12 @@ async def _frame_mouse_click_xpath(tab, xpath: str, warn: bool = True) -> bool:
     """Click a recommendFrame element by XPath using a real CDP mouse event (isTrusted=true).
     Scrolls the element into view first so getBoundingClientRect() returns in-viewport coords.
     Returns True if element was found and clicked."""
-    pos = await tab.evaluate(f"""
-        (function() {{
-            var frame = document.querySelector('iframe[name="recommendFrame"]');
-            if (!frame) return null;
-            var frameRect = frame.getBoundingClientRect();
-            var doc = frame.contentDocument;
-            if (!doc) return null;
-            var res = doc.evaluate({repr(xpath)}, doc, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null);
-            var el = res.singleNodeValue;
-            if (!el) return null;
-            el.scrollIntoView({{block: 'center', behavior: 'instant'}});
-            var r = el.getBoundingClientRect();
-            return JSON.stringify({{
-                x: frameRect.left + r.left + r.width / 2,
-                y: frameRect.top + r.top + r.height / 2
-            }});
-        }})()
-    """)
+    pos = await _bh(tab, 'point', 'frame', {'xpath': xpath}, {'scroll': 'center'})
     if not pos:
         if warn:
             logger.warning("_frame_mouse_click_xpath: element not found: %s", xpath)
         return False
-    coords = json.loads(pos)
-    await tab.mouse_click(coords['x'], coords['y'])
+    await _click(tab, pos['x'], pos['y'])
     return True
 
 
@@ -170,38 +582,49 @@ async def _frame_mouse_click_css(tab, selector: str) -> bool:
     """Click a recommendFrame element by CSS selector using a real CDP mouse event (isTrusted=true).
     Scrolls the element into view first so getBoundingClientRect() returns in-viewport coords.
     Returns True if element was found and clicked."""
-    pos = await tab.evaluate(f"""
-        (function() {{
-            var frame = document.querySelector('iframe[name="recommendFrame"]');
-            if (!frame) return null;
-            var frameRect = frame.getBoundingClientRect();
-            var doc = frame.contentDocument;
-            if (!doc) return null;
-            var el = doc.querySelector({repr(selector)});
-            if (!el) return null;
-            el.scrollIntoView({{block: 'center', behavior: 'instant'}});
-            var r = el.getBoundingClientRect();
-            return JSON.stringify({{
-                x: frameRect.left + r.left + r.width / 2,
-                y: frameRect.top + r.top + r.height / 2
-            }});
-        }})()
-    """)
+    pos = await _bh(tab, 'point', 'frame', {'css': selector}, {'scroll': 'center'})
     if not pos:
         logger.warning("_frame_mouse_click_css: element not found: %s", selector)
         return False
-    coords = json.loads(pos)
-    await tab.mouse_click(coords['x'], coords['y'])
+    await _click(tab, pos['x'], pos['y'])
     return True
 
 
+# Cookie that is only present while the recruiter session is logged in (see is_logged_in)
+LOGIN_COOKIE = os.getenv('LOGIN_COOKIE', 'wt2')
+
+# Process start -> session ready (launched or attached) -> first resume captured
+timing_stats = {'started': time.monotonic(), 'ready': None, 'first_resume': None}
+
+
+async def is_logged_in(tab) -> bool:
+    """Cheap login check for an attached session, without navigating.
+
+    True when the site's LOGIN_COOKIE is set and the tab is on neither the login
+    page nor a CAPTCHA page.
+    """
+    try:
+        cookies = await tab.send(cdp.network.get_cookies(urls=[BOSS_BASE_URL + '/']))
+    except ProtocolException:
+        return False
+    if not any(c.name == LOGIN_COOKIE and c.value for c in cookies):
+        return False
+    url = tab.url or ''
+    return not _url_is_captcha(url) and '/web/user' not in url
+
+
+def _mark_first_resume():
+    if timing_stats['first_resume'] is None:
+        timing_stats['first_resume'] = time.monotonic()
+
+
 async def log_in(tab):
-    await tab.get('https://www.zhipin.com/web/user/?intent=1')
+    await navigate(tab, f'{BOSS_BASE_URL}/web/user/?intent=1')
     await asyncio.sleep(jitter(3))
     results = await tab.xpath('//*[@id="wrap"]/div/div[2]/div[2]/div[1]')
     if results:
-        await results[0].click()
-        target_url = 'https://www.zhipin.com/web/chat/index'
+        await _click_element(tab, results[0])
+        target_url = f'{BOSS_BASE_URL}/web/chat/index'
         for _ in range(60):  # 30s timeout
             await asyncio.sleep(0.5)
             if tab.url == target_url:
@@ -243,63 +666,46 @@ async def ensure_list_view(tab):
     """)
     if pos:
         coords = json.loads(pos)
-        await tab.mouse_click(coords['x'], coords['y'])
+        await _click(tab, coords['x'], coords['y'])
 
 
 async def goto_recommend(tab):
-    link = await _find_or_captcha(tab, "推荐牛人")
-    await link.click()
+    await _click_text(tab, "推荐牛人")
     # Wait for the recommendFrame iframe to appear
-    for _ in range(20):
-        found = await tab.evaluate(
-            '!!document.querySelector(\'iframe[name="recommendFrame"]\')'
-        )
-        if found:
-            break
-        await asyncio.sleep(0.5)
+    await _wait_until(tab, "return !!document.querySelector('iframe[name=\"recommendFrame\"]');", 10)
     await asyncio.sleep(jitter(2))
 
 
-async def get_resume_card_text(tab, idx) -> str:
-    """Return textContent of resume card at position idx."""
-    result = await _in_frame(tab, f"""
-        var res = doc.evaluate({repr(xpath_resume_card.format(i=idx))}, doc, null,
-            XPathResult.FIRST_ORDERED_NODE_TYPE, null);
-        var card = res.singleNodeValue;
-        return card ? card.textContent : null;
-    """)
-    return result or ''
-
+async def snapshot_cards(tab) -> list[dict]:
+    """Read every loaded recommend card in a single evaluate.
 
-async def is_viewed(tab, idx) -> bool:
-    result = await _in_frame(tab, f"""
-        var res = doc.evaluate({repr(xpath_resume_card_is_viewed.format(i=idx))}, doc, null,
-            XPathResult.FIRST_ORDERED_NODE_TYPE, null);
-        var card = res.singleNodeValue;
-        if (!card) return null;
-        var inner = card.querySelector("div[class*='card-inner']");
-        return inner ? inner.className : '';
-    """)
-    if result is None:
-        logger.warning(f"#{idx} 加载失败。")
-        await scroll_down(tab)
-        await asyncio.sleep(jitter(3))
-        return False
-    return 'has-viewed' in str(result)
-
-
-async def get_age(tab, idx) -> int:
-    result = await _in_frame(tab, f"""
-        var res = doc.evaluate({repr(xpath_age.format(i=idx))}, doc, null,
-            XPathResult.FIRST_ORDERED_NODE_TYPE, null);
-        var elem = res.singleNodeValue;
-        return elem ? elem.textContent : null;
-    """)
+    Returns one dict per `#recommend-list li`, in list order:
+    {'idx' (1-based, as in the xpath_* templates), 'identity' (the candidate id attribute,
+    '' when the card has none: its text includes activity badges and is not stable),
+    'viewed', 'age' (99 when unreadable), 'text' (card textContent)}.
+    """
+    result = await _bh(tab, 'cards', xpath_card_age)
     if not result:
-        logger.warning('载入更多简历')
-        return 99
-    matches = re.findall(r'\d+', result)
-    return int(matches[0]) if matches else 99
+        return []
+    cards = []
+    for idx, c in enumerate(result, start=1):
+        ages = re.findall(r'\d+', c['age'] or '')
+        cards.append({
+            'idx': idx,
+            'identity': c['id'],
+            'viewed': c['viewed'],
+            'age': int(ages[0]) if ages else 99,
+            'text': c['text'] or '',
+        })
+    return cards
+
+
+async def scroll_to_bottom(tab):
+    """Scroll the recommend list to its end so the platform loads the next page of cards."""
+    await asyncio.sleep(jitter(1))
+    await _pacer.wait()
+    await _bh(tab, 'scroll', 'bottom')
+    await asyncio.sleep(jitter(2))
 
 
 RESUME_LOAD_TIMEOUT = 10  # seconds to wait for resume canvas to appear
@@ -326,51 +732,167 @@ _CROSSORIGIN_INJECT = """<script>
 
 async def _get_c_resume_frame_ids(tab) -> list:
     """Return all c-resume frame IDs in tree order (oldest first)."""
-    frame_tree = await tab.send(cdp.page.get_frame_tree())
-    result = []
-    def walk(node):
-        if 'c-resume' in (node.frame.url or ''):
-            result.append(node.frame.id_)
-        for child in (node.child_frames or []):
-            walk(child)
-    walk(frame_tree)
-    return result
+    return (await frame_registry(tab)).c_resume_ids()
+
+
+# Encodes canvas#resume inside the frame (optionally downscaled) and keeps the
+# base64 in window.__resumeCapture when it is larger than one chunk.
+_CANVAS_ENCODE_JS = """
+(async function(type, quality, maxWidth, dprScale, chunk, baseline) {
+    var c = document.querySelector('canvas#resume');
+    if (!c || !c.width || !c.height) return null;
+    var t0 = performance.now();
+    var scale = 1;
+    if (dprScale && window.devicePixelRatio > 1) scale = 1 / window.devicePixelRatio;
+    if (maxWidth && c.width * scale > maxWidth) scale = maxWidth / c.width;
+    var src = c;
+    if (scale < 1) {
+        var w = Math.max(1, Math.round(c.width * scale)), h = Math.max(1, Math.round(c.height * scale));
+        if (typeof OffscreenCanvas !== 'undefined') {
+            src = new OffscreenCanvas(w, h);
+        } else {
+            src = document.createElement('canvas');
+            src.width = w;
+            src.height = h;
+        }
+        src.getContext('2d').drawImage(c, 0, 0, w, h);
+    }
+    var blob;
+    try {
+        blob = src.convertToBlob ? await src.convertToBlob({type: type, quality: quality})
+                                 : await new Promise(function(r) { src.toBlob(r, type, quality); });
+    } catch (e) { return null; }  // tainted canvas
+    if (!blob) return null;
+    var data = await new Promise(function(resolve, reject) {
+        var fr = new FileReader();
+        fr.onload = function() { resolve(fr.result); };
+        fr.onerror = reject;
+        fr.readAsDataURL(blob);
+    });
+    data = data.substring(data.indexOf(',') + 1);
+    var out = {length: data.length, ms: performance.now() - t0};
+    if (baseline) {
+        var t1 = performance.now();
+        try { out.baseline_length = c.toDataURL('image/png').length - 22; } catch (e) {}
+        out.baseline_ms = performance.now() - t1;
+    }
+    if (data.length <= chunk) out.data = data;
+    else window.__resumeCapture = data;
+    return out;
+})(%s)
+"""
 
 
 async def _read_canvas_b64(tab, frame_id) -> str | None:
-    """Try canvas.toDataURL() inside frame_id. Returns None if canvas absent or tainted."""
-    ctx_id = await tab.send(cdp.page.create_isolated_world(
-        frame_id=frame_id, world_name='canvas_read'
-    ))
-    result, exc = await tab.send(cdp.runtime.evaluate(
-        expression="""
-            (function() {
-                var c = document.querySelector('canvas#resume');
-                if (!c) return null;
-                try { return c.toDataURL('image/png').substring(22); }
-                catch(e) { return null; }
-            })()
-        """,
-        context_id=ctx_id,
-        return_by_value=True,
-    ))
+    """Encode canvas#resume inside frame_id and return its base64. None if canvas absent or tainted.
+
+    Format, quality and downscaling follow resume_utils.CAPTURE_*; encodings larger
+    than CAPTURE_CHUNK_CHARS are fetched in several Runtime.evaluate calls.
+    """
+    registry = await frame_registry(tab)
+    ctx_id = await registry.world(frame_id)
+    start = time.perf_counter()
+    args = json.dumps([resume_utils.CAPTURE_MIME, resume_utils.CAPTURE_QUALITY, resume_utils.CAPTURE_MAX_WIDTH,
+                       resume_utils.CAPTURE_DPR_SCALE, resume_utils.CAPTURE_CHUNK_CHARS,
+                       resume_utils.CAPTURE_MEASURE_BASELINE])[1:-1]
+    try:
+        result, exc = await tab.send(cdp.runtime.evaluate(
+            expression=_CANVAS_ENCODE_JS % args,
+            context_id=ctx_id,
+            await_promise=True,
+            return_by_value=True,
+        ))
+    except ProtocolException:
+        # Context gone (frame reloaded between events); a fresh world is made next time
+        registry.forget_world(frame_id)
+        return None
     if exc or not result or not result.value:
         return None
-    return result.value
+    info = result.value
+    chunks = 1
+    data = info.get('data')
+    if data is None:
+        parts = []
+        for offset in range(0, info['length'], resume_utils.CAPTURE_CHUNK_CHARS):
+            part, exc = await tab.send(cdp.runtime.evaluate(
+                expression=f"window.__resumeCapture.substring({offset}, "
+                           f"{offset + resume_utils.CAPTURE_CHUNK_CHARS})",
+                context_id=ctx_id,
+                return_by_value=True,
+            ))
+            if exc or not part or not part.value:
+                return None
+            parts.append(part.value)
+        await tab.send(cdp.runtime.evaluate(expression="delete window.__resumeCapture", context_id=ctx_id))
+        data, chunks = ''.join(parts), len(parts)
+
+    cs = resume_utils.canvas_stats
+    cs['captures'] += 1
+    cs['bytes'] += len(data) * 3 // 4
+    # The optional baseline encode is measurement overhead, not part of the capture
+    cs['seconds'] += time.perf_counter() - start - info.get('baseline_ms', 0) / 1000
+    cs['encode_ms'] += info['ms']
+    cs['chunks'] += chunks
+    if 'baseline_length' in info:
+        cs['baselines'] += 1
+        cs['baseline_bytes'] += info['baseline_length'] * 3 // 4
+        cs['baseline_ms'] += info['baseline_ms']
+    return data
+
+
+# Fetch URL patterns for the hosts serving images drawn onto the resume canvas.
+# They are only paused while a resume capture is open (see _resume_images), and
+# only those requested by a c-resume frame get the CORS header; outside a
+# capture only the c-resume document itself is intercepted.
+RESUME_IMAGE_PATTERNS = [
+    p.strip() for p in os.getenv('RESUME_IMAGE_PATTERNS', '*.zhipin.com/*,*.bosszhipin.com/*').split(',')
+    if p.strip()
+]
+
+# handler_seconds is time spent inside the handler, not how long a response stays paused
+intercept_stats = {'documents': 0, 'images': 0, 'passed': 0, 'bytes': 0, 'handler_seconds': 0.0}
+# Tabs themselves, not id(tab): a new tab may reuse a closed worker tab's id
+_intercepted_tabs = weakref.WeakSet()  # tabs with the session-long Fetch interception installed
+_image_tabs = weakref.WeakSet()  # tabs whose RESUME_IMAGE_PATTERNS are currently paused
+
+
+def _fetch_patterns(images: bool) -> list:
+    """Fetch.enable patterns: the c-resume document, plus resume images while capturing."""
+    patterns = [cdp.fetch.RequestPattern(
+        url_pattern='*c-resume*',
+        resource_type=cdp.network.ResourceType.DOCUMENT,
+        request_stage=cdp.fetch.RequestStage.RESPONSE,
+    )]
+    if images:
+        patterns += [cdp.fetch.RequestPattern(
+            url_pattern=pattern,
+            resource_type=cdp.network.ResourceType.IMAGE,
+            request_stage=cdp.fetch.RequestStage.RESPONSE,
+        ) for pattern in RESUME_IMAGE_PATTERNS]
+    return patterns
 
 
 async def _enable_cors_intercept(tab):
-    """Enable Fetch interception to un-taint the resume canvas.
+    """Install the Fetch interception that un-taints the resume canvas (once per tab).
 
     Intercepts:
     - c-resume HTML responses: injects a <script> that sets crossOrigin='anonymous'
       on all <img> elements before their src is assigned.
-    - Image responses: adds Access-Control-Allow-Origin: * so the browser accepts
-      the CORS response and does not taint the canvas.
+    - Image responses from RESUME_IMAGE_PATTERNS requested by a c-resume frame,
+      while _resume_images is on: adds Access-Control-Allow-Origin: * via
+      Fetch.continueResponse (headers only, the body is never fetched) so the
+      browser does not taint the canvas.
+    Everything else matching the patterns is continued unchanged.
     """
+    if tab in _intercepted_tabs:
+        return
+    registry = await frame_registry(tab)
+
     async def _handle_paused(evt: cdp.fetch.RequestPaused):
         req_id = evt.request_id
         status_code = evt.response_status_code
+        start = time.perf_counter()
+        kind = 'passed'
 
         try:
             if status_code is None:
@@ -384,59 +906,235 @@ async def _enable_cors_intercept(tab):
                 if b64_enc:
                     body = base64.b64decode(body).decode('utf-8', errors='replace')
                 body = body.replace('<head>', '<head>' + _CROSSORIGIN_INJECT, 1)
+                encoded = base64.b64encode(body.encode('utf-8')).decode()
                 await tab.send(cdp.fetch.fulfill_request(
                     request_id=req_id,
                     response_code=status_code,
                     response_headers=evt.response_headers,
-                    body=base64.b64encode(body.encode('utf-8')).decode(),
+                    body=encoded,
                 ))
+                kind = 'documents'
+                intercept_stats['bytes'] += len(body)
 
-            elif resource_type == cdp.network.ResourceType.IMAGE:
-                body, b64_enc = await tab.send(cdp.fetch.get_response_body(request_id=req_id))
-                if not b64_enc:
-                    body = base64.b64encode(body.encode()).decode()
+            elif resource_type == cdp.network.ResourceType.IMAGE \
+                    and 'c-resume' in registry.urls.get(evt.frame_id, ''):
                 headers = [
                     h for h in (evt.response_headers or [])
                     if h.name.lower() != 'access-control-allow-origin'
                 ]
                 headers.append(cdp.fetch.HeaderEntry(name='Access-Control-Allow-Origin', value='*'))
-                await tab.send(cdp.fetch.fulfill_request(
+                await tab.send(cdp.fetch.continue_response(
                     request_id=req_id,
                     response_code=status_code,
                     response_headers=headers,
-                    body=body,
                 ))
+                kind = 'images'
 
             else:
-                await tab.send(cdp.fetch.continue_response(
-                    request_id=req_id,
-                    response_code=status_code,
-                    response_headers=evt.response_headers,
-                ))
+                await tab.send(cdp.fetch.continue_response(request_id=req_id))
         except ProtocolException:
             return
+        finally:
+            intercept_stats[kind] += 1
+            intercept_stats['handler_seconds'] += time.perf_counter() - start
 
     tab.add_handler(cdp.fetch.RequestPaused, _handle_paused)
-    await tab.send(cdp.fetch.enable(patterns=[
-        cdp.fetch.RequestPattern(
-            url_pattern='*c-resume*',
-            resource_type=cdp.network.ResourceType.DOCUMENT,
-            request_stage=cdp.fetch.RequestStage.RESPONSE,
-        ),
-        cdp.fetch.RequestPattern(
-            url_pattern='*',
-            resource_type=cdp.network.ResourceType.IMAGE,
-            request_stage=cdp.fetch.RequestStage.RESPONSE,
-        ),
-    ]))
+    await tab.send(cdp.fetch.enable(patterns=_fetch_patterns(images=False)))
+    _intercepted_tabs.add(tab)
+
+
+async def _resume_images(tab, active: bool):
+    """Pause RESUME_IMAGE_PATTERNS on tab only while a resume capture is open."""
+    if active == (tab in _image_tabs):
+        return
+    await _enable_cors_intercept(tab)
+    try:
+        await tab.send(cdp.fetch.enable(patterns=_fetch_patterns(images=active)))
+    except ProtocolException as e:
+        logger.warning(f"切换简历图片拦截失败：{e}")
+        return
+    if active:
+        _image_tabs.add(tab)
+    else:
+        _image_tabs.discard(tab)
+
+
+def log_stats():
+    """Log session start-up timing and what the Fetch interception and the shared action pacer cost."""
+    ts = timing_stats
+    if ts['ready'] is not None:
+        line = f"启动：会话就绪 {ts['ready'] - ts['started']:.1f}s"
+        if ts['first_resume'] is not None:
+            line += f"，首位候选人简历 {ts['first_resume'] - ts['started']:.1f}s"
+        logger.llm(line)
+    st = intercept_stats
+    paused = st['documents'] + st['images'] + st['passed']
+    if paused:
+        logger.llm(
+            f"Fetch 拦截：暂停 {paused} 个响应（简历文档 {st['documents']}，简历图片 {st['images']}，"
+            f"原样放行 {st['passed']}），改写 {st['bytes'] / 1024:.0f}KB，"
+            f"处理耗时平均 {st['handler_seconds'] / paused * 1000:.1f}ms"
+        )
+    ps = pacing_stats
+    if _pacer.interval and ps['actions']:
+        logger.llm(f"操作节奏（多标签页共享，间隔 ~{_pacer.interval:g}s）：{ps['actions']} 次点击/导航/滚动，"
+                   f"{ps['delayed']} 次被推迟，共等待 {ps['seconds']:.0f}s")
+
+
+_network_pinned = weakref.WeakSet()  # tabs whose Network domain must stay enabled (URL blocking)
+
+
+def keep_network_enabled(tab):
+    """Stop payload captures from disabling Network on tab (it carries setBlockedURLs)."""
+    _network_pinned.add(tab)
+
+
+class _ResumePayloadCapture:
+    """Record the JSON bodies of XHR/fetch responses issued by c-resume frames.
+
+    Uses the CDP Network domain; requests are attributed to the frame through
+    requestWillBeSent.documentURL, so the resume API's path need not be known.
+    """
+
+    def __init__(self, tab):
+        self.tab = tab
+        self.pending = set()
+        self.payloads = []
+        self.arrived = asyncio.Event()
+
+    async def start(self):
+        self.tab.add_handler(cdp.network.RequestWillBeSent, self._on_request)
+        self.tab.add_handler(cdp.network.LoadingFinished, self._on_finished)
+        self.tab.add_handler(cdp.network.LoadingFailed, self._on_failed)
+        await self.tab.send(cdp.network.enable())
+
+    async def stop(self):
+        self.tab.remove_handlers(cdp.network.RequestWillBeSent, self._on_request)
+        self.tab.remove_handlers(cdp.network.LoadingFinished, self._on_finished)
+        self.tab.remove_handlers(cdp.network.LoadingFailed, self._on_failed)
+        if self.tab in _network_pinned:
+            return
+        try:
+            await self.tab.send(cdp.network.disable())
+        except ProtocolException:
+            pass
+
+    async def _on_request(self, evt: cdp.network.RequestWillBeSent):
+        if evt.type_ in (cdp.network.ResourceType.XHR, cdp.network.ResourceType.FETCH) \
+                and 'c-resume' in (evt.document_url or ''):
+            self.pending.add(evt.request_id)
 
+    async def _on_failed(self, evt: cdp.network.LoadingFailed):
+        self.pending.discard(evt.request_id)
 
-async def _disable_cors_intercept(tab):
-    tab.remove_handlers(cdp.fetch.RequestPaused)
-    await tab.send(cdp.fetch.disable())
+    async def _on_finished(self, evt: cdp.network.LoadingFinished):
+        if evt.request_id not in self.pending:
+            return
+        try:
+            body, b64_enc = await self.tab.send(cdp.network.get_response_body(request_id=evt.request_id))
+            if b64_enc:
+                body = base64.b64decode(body).decode('utf-8', errors='replace')
+            self.payloads.append(json.loads(body))
+            resume_utils.stats['payloads'] += 1
+        except (ProtocolException, ValueError):
+            pass
+        finally:
+            self.pending.discard(evt.request_id)
+            self.arrived.set()
+
+    async def wait(self, timeout: float):
+        try:
+            await asyncio.wait_for(self.arrived.wait(), timeout)
+        except TimeoutError:
+            pass
+        self.arrived.clear()
 
 
-async def get_resume(tab, idx) -> tuple[str | None, str]:
+async def _start_payload_capture(tab) -> _ResumePayloadCapture | None:
+    if resume_utils.RESUME_CAPTURE != 'network':
+        return None
+    capture = _ResumePayloadCapture(tab)
+    await capture.start()
+    return capture
+
+
+RESUME_WAIT_SLICE = 1.0  # seconds per in-page wait before re-checking the frames
+
+# True once the newest c-resume iframe, beyond the first %d already known, has drawn canvas#resume.
+_RESUME_CANVAS_READY = """
+    var found = [];
+    (function walk(doc) {
+        doc.querySelectorAll('iframe').forEach(function(f) {
+            var d;
+            try { d = f.contentDocument; } catch (e) { return; }
+            if ((f.src || '').indexOf('c-resume') >= 0) found.push(d);
+            if (d) walk(d);
+        });
+    })(document);
+    var last = found.length > %d ? found[found.length - 1] : null;
+    return !!(last && last.querySelector('canvas#resume'));
+"""
+
+
+async def _wait_for_resume(tab, pick_frame, capture: _ResumePayloadCapture | None,
+                           known_frames: int = 0) -> tuple[str | None, str]:
+    """Wait until the resume is readable; returns (canvas_b64, '') or (None, resume_text).
+
+    With a network capture the JSON payload wins as soon as it parses into usable
+    text; the canvas is the fallback.  Between attempts the wait runs in the page
+    (_wait_until) and wakes as soon as a c-resume frame beyond the first
+    known_frames draws its canvas, a payload arrives or a frame navigates to the
+    CAPTCHA page (FrameRegistry.captcha).  Timeout enforced by asyncio.wait_for()
+    in caller.
+    """
+    registry = await frame_registry(tab)
+    ready = None
+    while True:
+        registry.check_captcha("loading resume")
+        if capture is not None and (text := resume_utils.best_text(capture.payloads)):
+            resume_utils.stats['network'] += 1
+            return None, text
+        fid = await pick_frame()
+        if fid:
+            canvas_base64 = await _read_canvas_b64(tab, fid)
+            if canvas_base64 is not None:
+                if capture is not None and capture.pending:
+                    # The canvas is drawn from the payload; its body may still be in transit
+                    await capture.wait(0.5)
+                    if text := resume_utils.best_text(capture.payloads):
+                        resume_utils.stats['network'] += 1
+                        return None, text
+                if capture is not None:
+                    resume_utils.stats['canvas'] += 1
+                    resume_utils.stats['rejected'] += bool(capture.payloads)
+                return canvas_base64, ''
+            if ready:
+                # Canvas present but not readable yet (still tainted); don't spin
+                await asyncio.sleep(0.25)
+
+        waiters = [asyncio.ensure_future(_wait_until(
+            tab, _RESUME_CANVAS_READY % known_frames, RESUME_WAIT_SLICE, poll_ms=250
+        ))]
+        waiters.append(asyncio.ensure_future(registry.captcha.wait()))
+        if capture is not None:
+            waiters.append(asyncio.ensure_future(capture.arrived.wait()))
+        try:
+            done, _ = await asyncio.wait(waiters, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for w in waiters:
+                w.cancel()
+        ready = waiters[0] in done and not waiters[0].cancelled() and waiters[0].result()
+        if capture is not None:
+            capture.arrived.clear()
+
+
+async def get_resume(tab, idx) -> tuple[str | None, str, str]:
+    """Open resume card idx; returns (canvas_b64, overview_text, resume_text).
+
+    With RESUME_CAPTURE=network, resume_text holds the resume read from the
+    c-resume frame's data request and canvas_b64 is None; otherwise (or when the
+    payload is unusable) canvas_b64 is the screenshot and resume_text is ''.
+    """
     await asyncio.sleep(jitter(2))
 
     # Snapshot existing c-resume frames before clicking so we can identify the new one.
@@ -444,33 +1142,27 @@ async def get_resume(tab, idx) -> tuple[str | None, str]:
     # currently visible resume is always the newest frame, not the first one.
     existing_fids = set(await _get_c_resume_frame_ids(tab))
 
-    await _enable_cors_intercept(tab)
+    async def newest_frame():
+        all_fids = await _get_c_resume_frame_ids(tab)
+        new_fids = [f for f in all_fids if f not in existing_fids]
+        # Prefer the newly created frame; fall back to the last known one
+        return new_fids[-1] if new_fids else (all_fids[-1] if all_fids else None)
+
+    capture = await _start_payload_capture(tab)
+    await _resume_images(tab, True)
     try:
         await _frame_mouse_click_xpath(tab, xpath_resume_card.format(i=idx))
-
-        # Poll until canvas is ready; timeout enforced by asyncio.wait_for() in caller
-        while True:
-            if await _any_frame_has_captcha(tab):
-                raise CaptchaRequired("CAPTCHA detected while loading resume")
-            all_fids = await _get_c_resume_frame_ids(tab)
-            new_fids = [f for f in all_fids if f not in existing_fids]
-            # Prefer the newly created frame; fall back to the last known one
-            fid = new_fids[-1] if new_fids else (all_fids[-1] if all_fids else None)
-            if fid:
-                canvas_base64 = await _read_canvas_b64(tab, fid)
-                if canvas_base64 is not None:
-                    break
-            await asyncio.sleep(1)
+        canvas_base64, resume_text = await _wait_for_resume(tab, newest_frame, capture, len(existing_fids))
     finally:
-        await _disable_cors_intercept(tab)
+        await _resume_images(tab, False)
+        if capture is not None:
+            await capture.stop()
 
     # Extract the "经历概览" sidebar text from the recommendFrame DOM
-    overview_text = await _in_frame(tab, """
-        var summary = doc.querySelector('.resume-summary');
-        return summary ? summary.innerText.trim() : '';
-    """) or ''
+    overview_text = await _bh(tab, 'text', 'frame', '.resume-summary') or ''
 
-    return canvas_base64, overview_text
+    _mark_first_resume()
+    return canvas_base64, overview_text, resume_text
 
 
 async def say_hi(tab):
@@ -478,32 +1170,32 @@ async def say_hi(tab):
     # Use real mouse click (isTrusted=true) to avoid bot detection.
     # The greet button is inside the recommendFrame iframe, so we combine
     # the iframe's page offset with the button's offset within the iframe.
-    pos = await tab.evaluate("""
-        (function() {
-            var frame = document.querySelector('iframe[name="recommendFrame"]');
-            if (!frame) return null;
-            var frameRect = frame.getBoundingClientRect();
-            var doc = frame.contentDocument;
-            if (!doc) return null;
-            var res = doc.evaluate(
-                '//button[contains(@class, "btn-sure-v2") and contains(@class, "btn-greet")]',
-                doc, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null
-            );
-            var btn = res.singleNodeValue;
-            if (!btn) return null;
-            var btnRect = btn.getBoundingClientRect();
-            return JSON.stringify({
-                x: frameRect.left + btnRect.left + btnRect.width / 2,
-                y: frameRect.top + btnRect.top + btnRect.height / 2
-            });
-        })()
-    """)
+    pos = await _bh(tab, 'point', 'frame', {'xpath': xpath_say_hi})
     if pos:
-        coords = json.loads(pos)
-        await tab.mouse_click(coords['x'], coords['y'])
+        await _click(tab, pos['x'], pos['y'])
     else:
         # Fallback if iframe/button not found
         await _frame_mouse_click_xpath(tab, xpath_say_hi)
+    await _after_greet_click(tab)
+
+
+async def say_hi_on_card(tab, idx) -> bool:
+    """Greet the idx-th recommend card via its own 打招呼 button, without opening the resume.
+
+    Used by the pipelined recommend loop, which greets candidates after their
+    evaluation finishes and the browser has already moved on to later cards.
+    Returns False if the card has no greet button (e.g. already contacted).
+    """
+    await asyncio.sleep(jitter(1))
+    if not await _frame_mouse_click_xpath(tab, xpath_card_say_hi.format(i=idx), warn=False):
+        logger.warning(f"#{idx} 未找到卡片上的打招呼按钮。")
+        return False
+    await _after_greet_click(tab)
+    return True
+
+
+async def _after_greet_click(tab):
+    """Handle the dialogs that follow a greet click (quota dialog or the 知道了 prompt)."""
     await asyncio.sleep(jitter(1))
 
     # Check if the daily limit dialog appeared instead of the normal "知道了" prompt.
@@ -538,34 +1230,18 @@ async def close_resume(tab):
 
 async def scroll_down(tab):
     await asyncio.sleep(jitter(0.5))
-    await _in_frame(tab, "win.scrollTo(0, win.scrollY + 180);")
+    await _pacer.wait()
+    await _bh(tab, 'scroll', 180)
 
 
 async def select_job_position(tab, job_title):
     await _frame_mouse_click_css(tab, '.ui-dropmenu-label')
     await asyncio.sleep(jitter(1))
 
-    pos = await tab.evaluate(f"""
-        (function() {{
-            var frame = document.querySelector('iframe[name="recommendFrame"]');
-            if (!frame) return null;
-            var frameRect = frame.getBoundingClientRect();
-            var doc = frame.contentDocument;
-            if (!doc) return null;
-            var options = Array.from(doc.querySelectorAll('ul.job-list li.job-item'));
-            for (var opt of options) {{
-                if (opt.textContent.trim().startsWith({repr(job_title)})) {{
-                    opt.scrollIntoView({{block: 'nearest'}});
-                    var r = opt.getBoundingClientRect();
-                    return JSON.stringify({{x: frameRect.left + r.left + r.width / 2, y: frameRect.top + r.top + r.height / 2}});
-                }}
-            }}
-            return null;
-        }})()
-    """)
+    pos = await _bh(tab, 'point', 'frame', {'css': 'ul.job-list li.job-item', 'prefix': job_title},
+                    {'scroll': 'nearest'})
     if pos:
-        coords = json.loads(pos)
-        await tab.mouse_click(coords['x'], coords['y'])
+        await _click(tab, pos['x'], pos['y'])
         logger.info(f"Selected job: {job_title}")
         await asyncio.sleep(jitter(5))
         await ensure_list_view(tab)
@@ -588,10 +1264,10 @@ async def goto_new_greetings(tab) -> int:
     Returns the unread count parsed from the tab label (e.g. '新招呼（3）' -> 3),
     or 0 if no badge is shown.
     """
-    await tab.get('https://www.zhipin.com/web/chat/index')
+    await navigate(tab, f'{BOSS_BASE_URL}/web/chat/index')
     await asyncio.sleep(jitter(2))
     await dismiss_hover_panels(tab)
-    link = await _find_or_captcha(tab, "新招呼")
+    link = await _locate_text(tab, "新招呼")
     # The count lives in <em class="num"> inside the same <span class="content">,
     # so link.text (direct text node only) won't include it — query the DOM directly.
     count = await tab.evaluate(r"""
@@ -611,11 +1287,10 @@ async def goto_new_greetings(tab) -> int:
             return 0;
         })()
     """) or 0
-    await link.click()
+    await _click(tab, link['x'], link['y'])
     await asyncio.sleep(jitter(2))
     # Click 未读 to show only unread candidates
-    unread_tab = await _find_or_captcha(tab, "未读")
-    await unread_tab.click()
+    await _click_text(tab, "未读")
     await asyncio.sleep(jitter(1))
     return count
 
@@ -648,7 +1323,7 @@ async def open_greeting_at(tab, idx):
     """Click the idx-th candidate to open the chat panel."""
     items = await tab.xpath(xpath_greeting_items)
     if idx <= len(items):
-        await items[idx - 1].click()
+        await _click_element(tab, items[idx - 1])
     await asyncio.sleep(jitter(1.5))
 
 
@@ -658,65 +1333,66 @@ CHAT_PANEL_LOAD_TIMEOUT = 10  # seconds to wait for chat panel .position-name to
 async def get_current_chat_job_title(tab) -> str:
     """Read the job title from the active chat panel (.position-name inside .conversation-box).
 
-    Polls until .position-name appears, to handle async panel loading after both explicit
+    Waits until .position-name appears, to handle async panel loading after both explicit
     open_greeting_at() clicks and platform auto-navigation after mark_unsuitable().
     Returns '' on timeout.
     """
-    for _ in range(CHAT_PANEL_LOAD_TIMEOUT * 2):
-        result = await tab.evaluate("""
-            (function() {
-                var el = document.querySelector('.conversation-box .position-name');
-                return el ? el.innerText.trim() : null;
-            })()
-        """)
-        if result:
-            return result
-        await asyncio.sleep(0.5)
-    return ''
+    result = await _wait_until(tab, """
+        var el = document.querySelector('.conversation-box .position-name');
+        return el ? el.innerText.trim() : null;
+    """, CHAT_PANEL_LOAD_TIMEOUT)
+    return result or ''
+
+
+# Network captures started by open_online_resume_greeting, keyed by id(tab).
+_greeting_captures = {}
 
 
 async def open_online_resume_greeting(tab):
     """Click 在线简历 button in the chat panel header.
 
-    Enables Fetch CORS intercept before clicking so the c-resume iframe loads
-    with untainted canvas from the start. Caller must ensure get_online_resume_greeting()
-    is called afterwards (it disables the intercept on exit).
+    Makes sure the Fetch CORS intercept is installed before clicking so the
+    c-resume iframe loads with untainted canvas from the start, and starts the
+    RESUME_CAPTURE=network payload capture. Caller must ensure
+    get_online_resume_greeting() is called afterwards (it stops the capture and
+    the resume image interception).
     """
     # The 在线简历 button sits at ~(1438, 139) which falls inside the interview
     # hover-panel's z-index:100 overlay (1093-1553, 50-205).  Move the mouse
     # to a safe area first so the panel collapses before we try to click.
     await dismiss_hover_panels(tab)
-    await _enable_cors_intercept(tab)
-    btn = await _find_or_captcha(tab, "在线简历")
-    await btn.click()
+    stale = _greeting_captures.pop(id(tab), None)
+    if stale is not None:
+        await stale.stop()
+    capture = await _start_payload_capture(tab)
+    if capture is not None:
+        _greeting_captures[id(tab)] = capture
+    await _resume_images(tab, True)
+    await _click_text(tab, "在线简历")
     await asyncio.sleep(jitter(2))
 
 
-async def get_online_resume_greeting(tab) -> tuple[str | None, str]:
-    """Wait for canvas resume and return (base64_png, overview_text).
+async def get_online_resume_greeting(tab) -> tuple[str | None, str, str]:
+    """Wait for the resume and return (base64_png, overview_text, resume_text) as get_resume does.
 
-    Disables the Fetch CORS intercept (set up by open_online_resume_greeting) on exit.
+    Stops the network capture and image interception started by
+    open_online_resume_greeting on exit.
     """
+    async def last_frame():
+        fids = await _get_c_resume_frame_ids(tab)
+        return fids[-1] if fids else None
+
+    capture = _greeting_captures.pop(id(tab), None)
     try:
-        while True:
-            if await _any_frame_has_captcha(tab):
-                raise CaptchaRequired("CAPTCHA detected while loading resume")
-            fids = await _get_c_resume_frame_ids(tab)
-            if fids:
-                canvas_b64 = await _read_canvas_b64(tab, fids[-1])
-                if canvas_b64 is not None:
-                    break
-            await asyncio.sleep(1)
+        canvas_b64, resume_text = await _wait_for_resume(tab, last_frame, capture)
     finally:
-        await _disable_cors_intercept(tab)
+        await _resume_images(tab, False)
+        if capture is not None:
+            await capture.stop()
 
-    overview_text = await tab.evaluate("""
-        (function() {
-            var s = document.querySelector('.resume-summary');
-            return s ? s.innerText.trim() : '';
-        })()
-    """) or ''
-    return canvas_b64, overview_text
+    overview_text = await _bh(tab, 'text', 'main', '.resume-summary') or ''
+    _mark_first_resume()
+    return canvas_b64, overview_text, resume_text
 
 
 async def close_online_resume_greeting(tab):
@@ -724,16 +1400,10 @@ async def close_online_resume_greeting(tab):
     await asyncio.sleep(jitter(2))
     await _mouse_click_css(tab, '.resume-common-dialog .close-btn')
     # Wait until modal is fully gone before returning.
-    for _ in range(20):
-        still_open = await tab.evaluate("""
-            (function() {
-                var el = document.querySelector('.resume-common-dialog .close-btn');
-                return el !== null && el.offsetParent !== null;
-            })()
-        """)
-        if not still_open:
-            break
-        await asyncio.sleep(0.3)
+    await _wait_until(tab, """
+        var el = document.querySelector('.resume-common-dialog .close-btn');
+        return !(el !== null && el.offsetParent !== null);
+    """, 6)
     await asyncio.sleep(0.3)  # brief buffer after modal disappears
 
 
@@ -742,19 +1412,9 @@ GREETING_QUALIFIED_MSG = "您好，感谢您的主动联系！您的背景很符
 async def send_chat_message(tab, text: str):
     """Type text into the chat input and click send."""
     # Set content on the contenteditable div and fire input event
-    escaped = text.replace("\\", "\\\\").replace("`", "\\`").replace("${", "\\${")
-    await tab.evaluate(f"""
-        (function() {{
-            var ed = document.querySelector('.boss-chat-editor-input');
-            if (!ed) return;
-            ed.focus();
-            ed.innerText = `{escaped}`;
-            ed.dispatchEvent(new Event('input', {{bubbles: true}}));
-        }})()
-    """)
+    await _bh(tab, 'type', '.boss-chat-editor-input', text)
     await asyncio.sleep(jitter(0.5))
-    send_btn = await _find_or_captcha(tab, "发送")
-    await send_btn.click()
+    await _click_text(tab, "发送")
     await asyncio.sleep(jitter(1))
 
 
@@ -767,90 +1427,32 @@ async def mark_unsuitable(tab, reason_category: str):
     """Click 不合适 button, then click the matching preset reason in the dialog."""
     # If the panel is already open (platform kept it open after auto-navigating to this candidate),
     # skip the button click — clicking it again would submit the panel instead of keeping it open.
-    panel_open = await tab.evaluate("""
-        (function() {
-            // Vue preloads .reason-item elements inside a display:none container,
-            // so presence in DOM is not enough — check that items are actually visible.
-            var items = document.querySelectorAll('.reason-item');
-            if (items.length === 0) return false;
-            var r = items[0].getBoundingClientRect();
-            return r.width > 0 && r.height > 0;
-        })()
-    """)
+    # Vue preloads .reason-item elements inside a display:none container, so presence
+    # in DOM is not enough — check that the items are actually visible.
+    panel_open = await _bh(tab, 'shown', 'main', '.reason-item')
     if not panel_open:
         # Get coordinates and use tab.mouse_click — JS .click() and element.click() don't trigger Vue handlers
-        pos = await tab.evaluate("""
-            (function() {
-                var spans = document.querySelectorAll('.operate-btn');
-                for (var s of spans) {
-                    if (s.innerText.trim() === '不合适') {
-                        var r = s.getBoundingClientRect();
-                        return JSON.stringify({x: r.left + r.width / 2, y: r.top + r.height / 2});
-                    }
-                }
-                return null;
-            })()
-        """)
+        pos = await _bh(tab, 'point', 'main', {'css': '.operate-btn', 'text': '不合适'})
         if not pos:
             raise RuntimeError("Could not find 不合适 button")
-        coords = json.loads(pos)
-        await tab.mouse_click(coords['x'], coords['y'])
+        await _click(tab, pos['x'], pos['y'])
         await asyncio.sleep(jitter(2))
 
-    # Wait until the specific reason item we need is in the DOM (items may load in batches)
-    escaped = reason_category.replace("'", "\\'")
-    for _ in range(20):
-        found = await tab.evaluate(f"""
-            (function() {{
-                var items = document.querySelectorAll('.reason-item');
-                for (var item of items) {{
-                    if (item.innerText.trim() === '{escaped}') return true;
-                }}
-                return false;
-            }})()
-        """)
-        if found:
-            break
-        await asyncio.sleep(0.3)
-
-    # Click reason item — get coords by text match, then use real mouse click
-    reason_pos = await tab.evaluate(f"""
-        (function() {{
-            var items = document.querySelectorAll('.reason-item');
-            for (var item of items) {{
-                if (item.innerText.trim() === '{escaped}') {{
-                    var r = item.getBoundingClientRect();
-                    return JSON.stringify({{x: r.left + r.width / 2, y: r.top + r.height / 2, found: item.outerHTML.substring(0, 100)}});
-                }}
-            }}
-            var available = Array.from(items).map(i => i.innerText.trim()).join(', ');
-            return JSON.stringify({{found: null, available: available}});
-        }})()
-    """)
-    reason_data = json.loads(reason_pos) if reason_pos else {}
-    if not reason_data.get('found'):
-        available = reason_data.get('available', '(empty)')
+    # Wait until the specific reason item we need is in the DOM (items may load in batches),
+    # then click it with a real mouse click
+    reason = {'css': '.reason-item', 'text': reason_category}
+    reason_pos = await _wait_until(
+        tab, f"return __bh.point('main', {json.dumps(reason, ensure_ascii=False)});", 6, helpers=True)
+    if not reason_pos:
+        available = ', '.join(await _bh(tab, 'texts', 'main', '.reason-item') or []) or '(empty)'
         raise RuntimeError(f"Could not find reason button: {reason_category!r}, available: {available}")
-    await tab.mouse_click(reason_data['x'], reason_data['y'])
+    await _click(tab, reason_pos['x'], reason_pos['y'])
     await asyncio.sleep(jitter(1))
 
     # Confirm if a confirm button appears — get coords then real mouse click
-    confirm_pos = await tab.evaluate("""
-        (function() {
-            var all = document.querySelectorAll('*');
-            for (var el of all) {
-                if (el.children.length === 0 && el.innerText && el.innerText.trim() === '确定') {
-                    var r = el.getBoundingClientRect();
-                    if (r.width === 0 && r.height === 0) continue;
-                    return JSON.stringify({x: r.left + r.width / 2, y: r.top + r.height / 2});
-                }
-            }
-            return null;
-        })()
-    """)
+    confirm_pos = await _bh(tab, 'point', 'main', {'text': '确定', 'exact': True}, {'visible': True})
     if confirm_pos:
-        coords = json.loads(confirm_pos)
-        await tab.mouse_click(coords['x'], coords['y'])
+        await _click(tab, confirm_pos['x'], confirm_pos['y'])
     await asyncio.sleep(jitter(1))
 
 
@@ -0,0 +1,154 @@
+"""
+On-disk queue for the harvest-then-batch recommend mode.
+
+In harvest mode the recommend loop only captures resumes that pass the card
+filters and stores them here, one JSON file per candidate identity.  The queue
+is then evaluated in bulk (concurrently or through an OpenAI Batch job) and a
+second browser pass greets the qualified candidates by identity.
+
+Record layout (HARVEST_DIR/<identity hash>.json):
+    identity, card_text, overview_text, canvas_b64, harvested_at,
+    jobs:     job titles the candidate was harvested for,
+    verdicts: {job_title: interviewer dict},
+    greeted:  job titles already greeted.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import time
+from dotenv import load_dotenv
+import llm_utils
+from log_utils import logger
+load_dotenv()
+
+HARVEST_DIR = os.getenv("HARVEST_DIR", "harvest")
+LLM_BATCH_MODE = os.getenv("LLM_BATCH_MODE", "concurrent").lower()  # concurrent | batch
+LLM_BATCH_CONCURRENCY = int(os.getenv("LLM_BATCH_CONCURRENCY", "4"))
+
+
+def _record_path(identity: str) -> str:
+    name = hashlib.sha1(identity.encode("utf-8")).hexdigest()
+    return os.path.join(HARVEST_DIR, f"{name}.json")
+
+
+def load_record(identity: str) -> dict | None:
+    try:
+        with open(_record_path(identity), encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def save_record(record: dict):
+    os.makedirs(HARVEST_DIR, exist_ok=True)
+    path = _record_path(record["identity"])
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(record, f, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+def load_records() -> list[dict]:
+    if not os.path.isdir(HARVEST_DIR):
+        return []
+    records = []
+    for name in sorted(os.listdir(HARVEST_DIR)):
+        if not name.endswith(".json"):
+            continue
+        try:
+            with open(os.path.join(HARVEST_DIR, name), encoding="utf-8") as f:
+                records.append(json.load(f))
+        except (OSError, ValueError) as e:
+            logger.warning(f"跳过损坏的候选人记录 {name}：{e}")
+    return records
+
+
+def add_capture(job_title: str, identity: str, canvas_b64: str, overview_text: str, card_text: str) -> bool:
+    """Queue a captured resume for job_title. Returns False if it was already queued for that job."""
+    record = load_record(identity) or {
+        "identity": identity,
+        "jobs": [],
+        "verdicts": {},
+        "greeted": [],
+    }
+    if job_title in record["jobs"]:
+        return False
+    record["jobs"].append(job_title)
+    record.update(
+        card_text=card_text,
+        overview_text=overview_text,
+        canvas_b64=canvas_b64,
+        harvested_at=time.time(),
+    )
+    save_record(record)
+    return True
+
+
+def is_harvested(job_title: str, identity: str) -> bool:
+    record = load_record(identity)
+    return record is not None and job_title in record["jobs"]
+
+
+async def evaluate_pending(client, requirements_by_job: dict[str, str]) -> int:
+    """Evaluate every queued candidate that still lacks a verdict for one of its jobs.
+
+    A candidate harvested for several jobs is judged against all of them in one
+    multi-job call.  Returns the number of candidates evaluated.
+    """
+    todo = []
+    for record in load_records():
+        pending = {
+            job: requirements_by_job[job]
+            for job in record["jobs"]
+            if job in requirements_by_job and job not in record["verdicts"]
+        }
+        if pending:
+            todo.append((record, pending))
+    if not todo:
+        return 0
+
+    logger.info(f"开始批量评估 {len(todo)} 位候选人（{LLM_BATCH_MODE}）")
+    if LLM_BATCH_MODE == "batch":
+        results = await llm_utils.evaluate_batch(client, [
+            (record["identity"], record["canvas_b64"], pending, record["overview_text"])
+            for record, pending in todo
+        ])
+    else:
+        semaphore = asyncio.Semaphore(LLM_BATCH_CONCURRENCY)
+
+        async def evaluate(record, pending):
+            async with semaphore:
+                try:
+                    return record["identity"], await llm_utils.is_qualified_multi(
+                        client, record["canvas_b64"], pending, record["overview_text"]
+                    )
+                except llm_utils.BudgetExhausted as e:
+                    # Left without a verdict, so the next run picks it up again
+                    logger.warning(f"{e}，跳过候选人评估")
+                    return record["identity"], {}
+        results = dict(await asyncio.gather(*(evaluate(r, p) for r, p in todo)))
+
+    for record, _ in todo:
+        for job, verdict in results.get(record["identity"], {}).items():
+            if verdict is not None:
+                record["verdicts"][job] = verdict.model_dump()
+        save_record(record)
+    return len(todo)
+
+
+def qualified_identities(job_title: str) -> set[str]:
+    """Identities judged qualified for job_title and not yet greeted for it."""
+    return {
+        record["identity"]
+        for record in load_records()
+        if record["verdicts"].get(job_title, {}).get("is_qualified")
+        and job_title not in record["greeted"]
+    }
+
+
+def mark_greeted(job_title: str, identity: str):
+    record = load_record(identity)
+    if record is not None and job_title not in record["greeted"]:
+        record["greeted"].append(job_title)
+        save_record(record)
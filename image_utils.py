@@ -0,0 +1,189 @@
+"""
+Resume image preprocessing before the canvas PNG is sent to the vision model.
+
+The c-resume canvas is a tall, mostly-white, full-resolution PNG.  This module
+trims the blank margins, scales the image down to a configurable image-token
+budget, optionally splits very tall resumes into page tiles, and re-encodes the
+result as JPEG/WebP.  Decoding runs in a process pool so it never blocks the
+asyncio event loop that also services the browser.
+"""
+import asyncio
+import base64
+import io
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dotenv import load_dotenv
+from log_utils import logger
+load_dotenv()
+
+ENABLE_IMAGE_PREPROCESS = os.getenv("DISABLE_IMAGE_PREPROCESS", "false").lower() != "true"
+IMAGE_FORMAT = os.getenv("IMAGE_FORMAT", "jpeg").lower()          # jpeg | webp | png
+IMAGE_QUALITY = int(os.getenv("IMAGE_QUALITY", "85"))
+# Vision encoders bill roughly one token per 28x28 patch (Qwen2-VL style), so the
+# token budget translates into a pixel budget for the whole resume.
+IMAGE_TOKEN_BUDGET = int(os.getenv("IMAGE_TOKEN_BUDGET", "4000"))
+IMAGE_PIXELS_PER_TOKEN = 28 * 28
+# Resumes taller than IMAGE_TILE_RATIO x their width are split into page tiles
+# (0 disables tiling).  Each tile keeps an A4-like aspect ratio.
+IMAGE_TILE_RATIO = float(os.getenv("IMAGE_TILE_RATIO", "0"))
+IMAGE_WORKERS = int(os.getenv("IMAGE_WORKERS", "2"))
+
+_TRIM_THRESHOLD = 8     # max per-channel distance from white still treated as background
+_TRIM_PADDING = 16      # px of margin kept around the trimmed content
+_PAGE_ASPECT = 1.414    # tile height / width
+
+# Part of the verdict cache key: a different preprocessing setup is a different input.
+PREPROCESS_SIGNATURE = (
+    f"{IMAGE_FORMAT}:{IMAGE_QUALITY}:{IMAGE_TOKEN_BUDGET}:{IMAGE_TILE_RATIO}"
+    if ENABLE_IMAGE_PREPROCESS else "raw"
+)
+
+_MIME = {"jpeg": "image/jpeg", "webp": "image/webp", "png": "image/png"}
+
+_pool = None
+stats = {"images": 0, "bytes_in": 0, "bytes_out": 0, "seconds": 0.0}
+
+
+def sniff_mime(image_b64: str) -> str:
+    """Guess the MIME type of a base64 image from its magic bytes (defaults to PNG)."""
+    if image_b64.startswith("/9j/"):
+        return "image/jpeg"
+    if image_b64.startswith("UklGR"):
+        return "image/webp"
+    return "image/png"
+
+
+def _trim_whitespace(img):
+    from PIL import ImageChops, Image
+    background = Image.new("RGB", img.size, (255, 255, 255))
+    diff = ImageChops.difference(img, background).convert("L")
+    bbox = diff.point(lambda p: 255 if p > _TRIM_THRESHOLD else 0).getbbox()
+    if not bbox:
+        return img
+    left, top, right, bottom = bbox
+    return img.crop((
+        max(left - _TRIM_PADDING, 0),
+        max(top - _TRIM_PADDING, 0),
+        min(right + _TRIM_PADDING, img.width),
+        min(bottom + _TRIM_PADDING, img.height),
+    ))
+
+
+def _encode(img, fmt: str, quality: int) -> bytes:
+    buf = io.BytesIO()
+    if fmt == "png":
+        img.save(buf, format="PNG", optimize=True)
+    elif fmt == "webp":
+        img.save(buf, format="WEBP", quality=quality, method=4)
+    else:
+        img.save(buf, format="JPEG", quality=quality, optimize=True)
+    return buf.getvalue()
+
+
+def _process(image_b64: str, fmt: str, quality: int, max_pixels: int, tile_ratio: float):
+    """Worker (runs in the process pool): returns ([(mime, b64), ...], bytes_in, bytes_out)."""
+    from PIL import Image
+    raw = base64.b64decode(image_b64)
+    img = Image.open(io.BytesIO(raw))
+    if img.mode in ("RGBA", "LA", "P"):
+        img = img.convert("RGBA")
+        flat = Image.new("RGB", img.size, (255, 255, 255))
+        flat.paste(img, mask=img.getchannel("A"))
+        img = flat
+    else:
+        img = img.convert("RGB")
+
+    img = _trim_whitespace(img)
+    pixels = img.width * img.height
+    if pixels > max_pixels:
+        scale = math.sqrt(max_pixels / pixels)
+        img = img.resize((max(int(img.width * scale), 1), max(int(img.height * scale), 1)), Image.LANCZOS)
+
+    if tile_ratio > 0 and img.height > img.width * tile_ratio:
+        page_h = int(img.width * _PAGE_ASPECT)
+        tiles = [img.crop((0, top, img.width, min(top + page_h, img.height)))
+                 for top in range(0, img.height, page_h)]
+    else:
+        tiles = [img]
+
+    mime = _MIME.get(fmt, "image/jpeg")
+    encoded = [_encode(tile, fmt, quality) for tile in tiles]
+    if fmt != "png" and sum(len(data) for data in encoded) > len(raw):
+        # Flat text-only canvases compress better losslessly than as JPEG/WebP.
+        mime, encoded = "image/png", [_encode(tile, "png", quality) for tile in tiles]
+    images = [(mime, base64.b64encode(data).decode("ascii")) for data in encoded]
+    return images, len(raw), sum(len(data) for data in encoded)
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=IMAGE_WORKERS)
+    return _pool
+
+
+async def prepare_resume_image(image_b64: str | None) -> list[tuple[str, str]]:
+    """Return the resume as a list of (mime, base64) images ready for the vision model.
+
+    Falls back to the original image if preprocessing is disabled or fails.
+    """
+    if not image_b64:
+        return []
+    if not ENABLE_IMAGE_PREPROCESS:
+        return [(sniff_mime(image_b64), image_b64)]
+
+    start = time.perf_counter()
+    try:
+        images, bytes_in, bytes_out = await asyncio.get_running_loop().run_in_executor(
+            _get_pool(), _process, image_b64, IMAGE_FORMAT, IMAGE_QUALITY,
+            IMAGE_TOKEN_BUDGET * IMAGE_PIXELS_PER_TOKEN, IMAGE_TILE_RATIO,
+        )
+    except Exception as e:
+        logger.warning(f"简历图片预处理失败，发送原图：{e}")
+        return [(sniff_mime(image_b64), image_b64)]
+    elapsed = time.perf_counter() - start
+
+    stats["images"] += 1
+    stats["bytes_in"] += bytes_in
+    stats["bytes_out"] += bytes_out
+    stats["seconds"] += elapsed
+    logger.info(
+        f"简历图片预处理：{bytes_in / 1024:.0f}KB → {bytes_out / 1024:.0f}KB"
+        f"（{len(images)} 张），耗时 {elapsed * 1000:.0f}ms"
+    )
+    return images
+
+
+def estimate_tokens(images: list[tuple[str, str]]) -> int:
+    """Approximate vision tokens for prepared (mime, base64) images, from their pixel size."""
+    from PIL import Image
+    total = 0
+    for _, image_b64 in images:
+        try:
+            with Image.open(io.BytesIO(base64.b64decode(image_b64))) as img:
+                total += img.width * img.height // IMAGE_PIXELS_PER_TOKEN
+        except Exception:
+            pass
+    return total
+
+
+def log_stats():
+    """Log cumulative preprocessing savings at exit."""
+    if not stats["images"]:
+        return
+    saved = 1 - stats["bytes_out"] / stats["bytes_in"] if stats["bytes_in"] else 0.0
+    logger.llm(
+        f"图片预处理：{stats['images']} 份简历，{stats['bytes_in'] / 1048576:.1f}MB → "
+        f"{stats['bytes_out'] / 1048576:.1f}MB（节省 {saved * 100:.0f}%），"
+        f"平均耗时 {stats['seconds'] / stats['images'] * 1000:.0f}ms"
+    )
+
+
+def shutdown():
+    """Stop the worker processes (safe to call when the pool was never started)."""
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
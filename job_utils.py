@@ -1,8 +1,8 @@
 from tqdm import tqdm
 import asyncio
-import driver_utils, llm_utils
+import driver_utils, llm_utils, harvest_utils, usage_utils, resume_utils
 import os, re
-from log_utils import logger
+from log_utils import logger, tqdm_position
 from dotenv import load_dotenv
 load_dotenv()
 
@@ -127,6 +127,21 @@ def check_if_contains_any_character(a_list, b_string):
   return False
 
 
+def pick_verdict(verdicts: dict):
+    """Choose which job to act on from an is_qualified_multi result.
+
+    Returns (job_title, interviewer) for the first qualified job, otherwise the
+    first job that got a verdict, or (first_job_title, None) if every verdict is missing.
+    """
+    for title, result in verdicts.items():
+        if result is not None and result.is_qualified:
+            return title, result
+    for title, result in verdicts.items():
+        if result is not None:
+            return title, result
+    return next(iter(verdicts)), None
+
+
 async def loop_greetings(tab, job_configs: list, client, job_stats: dict, total: int = 0) -> int:
     """Process unread candidates in 新招呼 for all configured job positions."""
     job_map = {
@@ -139,9 +154,10 @@ async def loop_greetings(tab, job_configs: list, client, job_stats: dict, total:
     processed = 0
     skipped = 0
     already_navigated = False
+    completion = None  # previous candidate's streaming evaluation, see llm_utils.is_qualified_early
 
     log_handler = logger.handlers[0]
-    with tqdm(desc="新招呼", unit="人", total=total or None) as pbar:
+    with tqdm(desc="新招呼", unit="人", total=total or None, position=tqdm_position.get()) as pbar:
         log_handler.set_tqdm(pbar)
         try:
             while idx <= MAX_SCAN:
@@ -168,7 +184,10 @@ async def loop_greetings(tab, job_configs: list, client, job_stats: dict, total:
                 chat_title = await driver_utils.get_current_chat_job_title(tab)
                 if not chat_title:
                     break
-                matched = next((t for t in job_map if chat_title.startswith(t)), matched)
+                # Several configured titles can prefix the same chat title (e.g. "销售经理"
+                # and "销售经理（北京）"); those candidates are judged against all of them at once.
+                candidates = [t for t in job_map if chat_title.startswith(t)]
+                matched = candidates[0] if candidates else matched
 
                 if matched is None:
                     logger.info(f"跳过（职位未配置，自动导航）：{chat_title!r}")
@@ -178,21 +197,42 @@ async def loop_greetings(tab, job_configs: list, client, job_stats: dict, total:
 
                 requirements = job_map[matched]
 
+                usage_utils.set_job(matched)
+                if completion is not None:
+                    await asyncio.gather(completion, return_exceptions=True)
+                await llm_utils.wait_for_backend(client)
                 try:
                     await driver_utils.open_online_resume_greeting(tab)
-                    canvas_b64, overview_text = await asyncio.wait_for(
+                    canvas_b64, overview_text, resume_text = await asyncio.wait_for(
                         driver_utils.get_online_resume_greeting(tab),
                         timeout=driver_utils.GREETING_RESUME_LOAD_TIMEOUT,
                     )
+                    overview_text = resume_utils.combine(resume_text, overview_text)
                 except (TimeoutError, Exception) as e:
                     logger.warning(f"在线简历加载失败，跳过：{e}")
                     idx += 1
                     pbar.update(1)
                     continue
 
-                result = llm_utils.is_qualified_result(
-                    client, canvas_b64, requirements['cv_requirements'], overview_text
-                )
+                try:
+                    if len(candidates) > 1:
+                        verdicts = await llm_utils.is_qualified_multi(
+                            client, canvas_b64, {t: job_map[t]['cv_requirements'] for t in candidates}, overview_text
+                        )
+                        matched, result = pick_verdict(verdicts)
+                    else:
+                        result, completion = await llm_utils.is_qualified_early(
+                            client, canvas_b64, requirements['cv_requirements'], overview_text
+                        )
+                except llm_utils.BudgetExhausted as e:
+                    # A job budget only skips that job's candidates; run/day budgets end the run
+                    if e.scope != 'job':
+                        raise
+                    logger.warning(f"{e}，跳过：{matched}")
+                    await driver_utils.close_online_resume_greeting(tab)
+                    idx += 1
+                    pbar.update(1)
+                    continue
                 await driver_utils.close_online_resume_greeting(tab)
 
                 if result is None:
@@ -210,7 +250,8 @@ async def loop_greetings(tab, job_configs: list, client, job_stats: dict, total:
                         # infinite loop if the platform stays on the same candidate (re-process same
                         # person indefinitely). Worst case without the flag: one candidate skipped
                         # if the platform ever does auto-navigate after a send — an acceptable loss.
-                        job_stats.setdefault(matched, {})['requested'] = job_stats.get(matched, {}).get('requested', 0) + 1
+                        stats = job_stats.setdefault(matched, {})
+                        stats['requested'] = stats.get('requested', 0) + 1
                     else:
                         reason = result.reason_category or '其他原因'
                         logger.info(f"不符合（{reason}），标记不合适：{matched}")
@@ -229,21 +270,100 @@ async def loop_greetings(tab, job_configs: list, client, job_stats: dict, total:
                 pbar.update(1)
                 # After action, this item leaves 新招呼; idx stays (next candidate fills slot)
         finally:
+            # Also on CAPTCHA / budget exits: the last verdict was acted on, let it be cached and logged
+            if completion is not None:
+                await asyncio.gather(completion, return_exceptions=True)
             log_handler.set_tqdm(None)
 
     logger.info(f"新招呼完成：处理 {processed} 人，跳过（职位未配置）{skipped} 人")
     return processed
 
 
+# 'serial' evaluates each candidate before moving on; 'pipeline' keeps up to
+# RECOMMEND_PIPELINE_DEPTH evaluations in flight while the browser keeps scanning,
+# and greets qualified candidates afterwards via the card's own greet button;
+# 'harvest' only captures resumes to disk (see harvest_utils) for bulk evaluation
+# and a later greeting pass.
+RECOMMEND_MODE = os.getenv('RECOMMEND_MODE', 'serial').lower()
+RECOMMEND_PIPELINE_DEPTH = max(int(os.getenv('RECOMMEND_PIPELINE_DEPTH', '3')), 1)
+
+
+def card_reject_reason(job_requirements, resume_text):
+    """Apply the card-level hard filters (salary, education, job status, keywords).
+
+    Returns the log message for the first failing filter, or None if the card passes.
+    """
+    resume_dict = parse_resume(resume_text)
+    if not (job_requirements['maximum_salary'] <= 0 or (resume_dict['salary_lower_bound'] is not None and job_requirements['maximum_salary'] > resume_dict['salary_lower_bound'] > 0)):
+        return '薪资不符合要求。'
+    if not resume_dict['education'] >= job_requirements['education']:
+        return '教育情况不符合要求。'
+    if not (job_requirements['off_the_job'] <= 0 or resume_dict['job_status'] == '离职-随时到岗'):
+        return '在职情况不符合要求。'
+    if not check_if_contains_any_character(job_requirements['cv_required_keywords'], resume_text):
+        return '关键词不符合要求。'
+    return None
+
+
+def _filter_card(card: dict, job_requirements) -> str | None:
+    """Run the viewed/age/card-text checks on one snapshot card (see driver_utils.snapshot_cards).
+
+    Returns the card text if the card passes, otherwise logs why it was skipped and returns None.
+    """
+    idx = card['idx']
+    if card['viewed']:
+        logger.info(f"#{idx} 已经查看过。")
+        return None
+
+    if not job_requirements['age_lower_bound'] <= card['age'] <= job_requirements['age_upper_bound']:
+        logger.info('#{} 年龄不符合要求。'.format(idx))
+        return None
+
+    resume_text = card['text']
+    reject = card_reject_reason(job_requirements, resume_text)
+    if reject:
+        logger.info('#{} {}'.format(idx, reject))
+        return None
+    return resume_text
+
+
+CARD_LOAD_RETRIES = 3  # scroll-to-bottom attempts before concluding the list has no more cards
+
+
+async def _card_at(tab, cards: list, idx: int) -> dict | None:
+    """Card #idx from the snapshot `cards`, refreshed in place once idx runs past it.
+
+    The recommend list only ever appends, so one snapshot serves every loaded card;
+    a new one is taken (scrolling to the bottom to load more if needed) only at its end.
+    Returns None when no more cards load.
+    """
+    if idx > len(cards):
+        cards[:] = await driver_utils.snapshot_cards(tab)
+        for _ in range(CARD_LOAD_RETRIES):
+            if idx <= len(cards):
+                break
+            await driver_utils.scroll_to_bottom(tab)
+            cards[:] = await driver_utils.snapshot_cards(tab)
+    if idx > len(cards):
+        logger.warning(f"#{idx} 加载失败，推荐列表没有更多候选人。")
+        return None
+    return cards[idx - 1]
+
+
 async def loop_recommend(tab, max_idx, job_requirements, client, job_stats, job_title):
+    if RECOMMEND_MODE == 'pipeline':
+        return await loop_recommend_pipelined(tab, max_idx, job_requirements, client, job_stats, job_title)
+    if RECOMMEND_MODE == 'harvest':
+        return await loop_recommend_harvest(tab, max_idx, job_requirements, job_stats, job_title)
+    usage_utils.set_job(job_title)
+
     idx = 0
     viewed = 0
     greeted = 0
+    completion = None  # previous candidate's streaming evaluation, see llm_utils.is_qualified_early
     def update_job_stats(job_title, viewed = 0, greeted = 0):
-        job_stats[job_title] = {
-            'viewed': viewed,
-            'greeted': greeted
-        }
+        # Update in place: the 新招呼 phase may be adding 'requested' to the same entry
+        job_stats.setdefault(job_title, {}).update(viewed=viewed, greeted=greeted)
     update_job_stats(job_title, viewed, greeted)
 
     # Create file for saving resume texts
@@ -252,94 +372,310 @@ async def loop_recommend(tab, max_idx, job_requirements, client, job_stats, job_
 
     # 获取日志处理器并设置当前tqdm实例
     log_handler = logger.handlers[0]
+    cards = []  # snapshot of the loaded recommend cards, see _card_at
 
     # Wrap the main loop with tqdm
-    with tqdm(total=max_idx, desc=f"Processing Resumes for {job_title}", unit="resume",
-              leave=True) as pbar:
-        # 将当前进度条实例传递给日志处理器
-        log_handler.set_tqdm(pbar)
+    try:
+        with tqdm(total=max_idx, desc=f"Processing Resumes for {job_title}", unit="resume",
+                  leave=True, position=tqdm_position.get()) as pbar:
+            # 将当前进度条实例传递给日志处理器
+            log_handler.set_tqdm(pbar)
 
-        while idx < max_idx:
-            try:
-                idx += 1
-                if await driver_utils.is_viewed(tab, idx):
-                    logger.info(f"#{idx} 已经查看过。")
+            while idx < max_idx:
+                try:
+                    idx += 1
+                    card = await _card_at(tab, cards, idx)
+                    if card is None:
+                        break
+                    card_text = _filter_card(card, job_requirements)
+                    if card_text is None:
+                        await driver_utils.scroll_down(tab)
+                        pbar.update(1)
+                        continue
+
+                    logger.info("#{} 简历符合要求。调用LLM进一步处理。".format(idx))
+                    if completion is not None:
+                        await asyncio.gather(completion, return_exceptions=True)
+                    await llm_utils.wait_for_backend(client)
+
+                    resume_image_base64, overview_text, resume_text = await asyncio.wait_for(
+                        driver_utils.get_resume(tab, idx),
+                        timeout=driver_utils.RESUME_LOAD_TIMEOUT,
+                    )
+                    overview_text = resume_utils.combine(resume_text, overview_text)
+                    # With LLM_STREAM=true this returns once is_qualified is known; the reason keeps streaming
+                    verdict, completion = await llm_utils.is_qualified_early(client, resume_image_base64, job_requirements['cv_requirements'], overview_text, card_text)
+                    is_qualified = verdict is not None and verdict.is_qualified
+                    viewed += 1
+                    update_job_stats(job_title, viewed, greeted)
+
+                    if is_qualified:
+                        logger.info(f"#{idx} 符合要求，打招呼。")
+                        try:
+                            await driver_utils.say_hi(tab)
+                        except driver_utils.DailyGreetingLimitReached:
+                            logger.warning(f"当前职位今日打招呼已达上限，停止处理：{job_title}")
+                            await driver_utils.close_resume(tab)
+                            break
+                        greeted += 1
+                        update_job_stats(job_title, viewed, greeted)
+                    else:
+                        logger.info(f"#{idx} 不符合要求。")
+                    await driver_utils.close_resume(tab)
                     await driver_utils.scroll_down(tab)
                     pbar.update(1)
                     continue
 
-                age = await driver_utils.get_age(tab, idx)
-                if job_requirements['age_lower_bound'] <= age <= job_requirements['age_upper_bound']:
-                    resume_text = await driver_utils.get_resume_card_text(tab, idx)
-
-                    resume_dict = parse_resume(resume_text)
-                    if job_requirements['maximum_salary'] <= 0 or (resume_dict['salary_lower_bound'] is not None and job_requirements['maximum_salary'] > resume_dict['salary_lower_bound'] > 0):
-                        # salary ok
-                        if resume_dict['education'] >= job_requirements['education']: # education ok
-                            if job_requirements['off_the_job'] <= 0 or resume_dict['job_status'] == '离职-随时到岗': # off_the_job ok:
-
-                                if check_if_contains_any_character(job_requirements['cv_required_keywords'], resume_text):
-                                    logger.info("#{} 简历符合要求。调用LLM进一步处理。".format(idx))
-
-                                    resume_image_base64, overview_text = await asyncio.wait_for(
-                                        driver_utils.get_resume(tab, idx),
-                                        timeout=driver_utils.RESUME_LOAD_TIMEOUT,
-                                    )
-                                    is_qualified = llm_utils.is_qualified(client, resume_image_base64, job_requirements['cv_requirements'], overview_text)
-                                    viewed += 1
-                                    update_job_stats(job_title, viewed, greeted)
-
-                                    if is_qualified:
-                                        logger.info(f"#{idx} 符合要求，打招呼。")
-                                        try:
-                                            await driver_utils.say_hi(tab)
-                                        except driver_utils.DailyGreetingLimitReached:
-                                            logger.warning(f"当前职位今日打招呼已达上限，停止处理：{job_title}")
-                                            await driver_utils.close_resume(tab)
-                                            break
-                                        greeted += 1
-                                        update_job_stats(job_title, viewed, greeted)
-                                    else:
-                                        logger.info(f"#{idx} 不符合要求。")
-                                    await driver_utils.close_resume(tab)
-                                    await driver_utils.scroll_down(tab)
-                                    pbar.update(1)
-                                    continue
-                                else:
-                                    logger.info('#{} 关键词不符合要求。'.format(idx))
-                                    await driver_utils.scroll_down(tab)
-                                    pbar.update(1)
-                                    continue
-                            else:
-                                logger.info('#{} 在职情况不符合要求。'.format(idx))
-                                await driver_utils.scroll_down(tab)
-                                pbar.update(1)
-                                continue
-                        else:
-                            logger.info('#{} 教育情况不符合要求。'.format(idx))
-                            await driver_utils.scroll_down(tab)
-                            pbar.update(1)
-                            continue
-                    else:
-                        logger.info('#{} 薪资不符合要求。'.format(idx))
+                except TimeoutError:
+                    logger.warning(f"#{idx} 简历加载超时 ({driver_utils.RESUME_LOAD_TIMEOUT}s)，终止处理。")
+                    raise
+                except llm_utils.BudgetExhausted as e:
+                    if e.scope != 'job':
+                        raise
+                    logger.warning(f"{e}，停止处理：{job_title}")
+                    await driver_utils.close_resume(tab)
+                    break
+                except Exception as e:
+                    logger.warning(f"An error occurred: {e}")
+                    logger.info("Try next one.")
+                    pbar.update(1)
+                    continue
+    finally:
+        # Also on timeout / CAPTCHA / budget exits: the last verdict was acted on, let it be cached and logged
+        if completion is not None:
+            await asyncio.gather(completion, return_exceptions=True)
+        log_handler.set_tqdm(None)
+    logger.info(f"简历查看数：{viewed}   打招呼人数：{greeted}")
+    return viewed, greeted
+
+
+async def loop_recommend_pipelined(tab, max_idx, job_requirements, client, job_stats, job_title):
+    """Recommend loop that overlaps LLM evaluation with browsing.
+
+    Each captured resume is handed to an evaluation task and the resume panel is
+    closed straight away, so the browser moves on to filter and open the next
+    cards while the model works.  At most RECOMMEND_PIPELINE_DEPTH evaluations
+    are in flight; when the window is full the loop waits for the oldest one.
+    Qualified candidates are greeted afterwards from the card's 打招呼 button,
+    which stays addressable by index because the list never reorders.
+    """
+    idx = 0
+    viewed = 0
+    greeted = 0
+    pending = {}  # card idx -> evaluation task
+    limit_reached = False
+    budget_error = None
+    usage_utils.set_job(job_title)
+
+    def update_job_stats():
+        job_stats.setdefault(job_title, {}).update(viewed=viewed, greeted=greeted)
+    update_job_stats()
+
+    async def act_on(done_idx, task):
+        """Greet one finished candidate. Returns False once the daily quota or LLM budget is hit."""
+        nonlocal greeted, budget_error
+        try:
+            qualified = task.result()
+        except llm_utils.BudgetExhausted as e:
+            logger.warning(f"{e}，停止处理：{job_title}")
+            budget_error = e
+            return False
+        if not qualified:
+            logger.info(f"#{done_idx} 不符合要求。")
+            return True
+        logger.info(f"#{done_idx} 符合要求，打招呼。")
+        try:
+            if await driver_utils.say_hi_on_card(tab, done_idx):
+                greeted += 1
+                update_job_stats()
+        except driver_utils.DailyGreetingLimitReached:
+            logger.warning(f"当前职位今日打招呼已达上限，停止处理：{job_title}")
+            return False
+        except Exception as e:
+            logger.warning(f"#{done_idx} 打招呼失败：{e}")
+        return True
+
+    async def settle(block: bool):
+        """Act on finished evaluations; if block, wait until at least one finishes."""
+        nonlocal limit_reached
+        if block and pending:
+            await asyncio.wait(pending.values(), return_when=asyncio.FIRST_COMPLETED)
+        for done_idx in sorted(i for i, t in pending.items() if t.done()):
+            task = pending.pop(done_idx)
+            if not await act_on(done_idx, task):
+                limit_reached = True
+                return
+
+    log_handler = logger.handlers[0]
+    cards = []
+    with tqdm(total=max_idx, desc=f"Processing Resumes for {job_title}", unit="resume",
+              leave=True, position=tqdm_position.get()) as pbar:
+        log_handler.set_tqdm(pbar)
+        try:
+            while idx < max_idx and not limit_reached:
+                try:
+                    idx += 1
+                    await settle(block=len(pending) >= RECOMMEND_PIPELINE_DEPTH)
+                    if limit_reached:
+                        break
+
+                    card = await _card_at(tab, cards, idx)
+                    if card is None:
+                        break
+                    card_text = _filter_card(card, job_requirements)
+                    if card_text is None:
                         await driver_utils.scroll_down(tab)
                         pbar.update(1)
                         continue
 
-                logger.info('#{} 年龄不符合要求。'.format(idx))
-                await driver_utils.scroll_down(tab)
-                pbar.update(1)
-                continue
-
-            except TimeoutError:
-                logger.warning(f"#{idx} 简历加载超时 ({driver_utils.RESUME_LOAD_TIMEOUT}s)，终止处理。")
-                raise
-            except Exception as e:
-                logger.warning(f"An error occurred: {e}")
-                logger.info("Try next one.")
-                pbar.update(1)
-                continue
+                    logger.info("#{} 简历符合要求。调用LLM进一步处理。".format(idx))
+                    await llm_utils.wait_for_backend(client)
+                    resume_image_base64, overview_text, resume_text = await asyncio.wait_for(
+                        driver_utils.get_resume(tab, idx),
+                        timeout=driver_utils.RESUME_LOAD_TIMEOUT,
+                    )
+                    overview_text = resume_utils.combine(resume_text, overview_text)
+                    pending[idx] = asyncio.create_task(llm_utils.is_qualified(
+                        client, resume_image_base64, job_requirements['cv_requirements'], overview_text, card_text
+                    ))
+                    viewed += 1
+                    update_job_stats()
+                    await driver_utils.close_resume(tab)
+                    await driver_utils.scroll_down(tab)
+                    pbar.update(1)
+
+                except TimeoutError:
+                    logger.warning(f"#{idx} 简历加载超时 ({driver_utils.RESUME_LOAD_TIMEOUT}s)，终止处理。")
+                    raise
+                except Exception as e:
+                    logger.warning(f"An error occurred: {e}")
+                    logger.info("Try next one.")
+                    pbar.update(1)
+                    continue
+
+            # Drain the evaluations still in flight once scanning is done
+            while pending and not limit_reached:
+                await settle(block=True)
+        finally:
+            for task in pending.values():
+                task.cancel()
+            log_handler.set_tqdm(None)
 
-    log_handler.set_tqdm(None)
     logger.info(f"简历查看数：{viewed}   打招呼人数：{greeted}")
+    if budget_error is not None and budget_error.scope != 'job':
+        raise budget_error
     return viewed, greeted
+
+
+async def loop_recommend_harvest(tab, max_idx, job_requirements, job_stats, job_title):
+    """Recommend loop that only captures filtered resumes to the harvest queue (no LLM calls)."""
+    idx = 0
+    harvested = 0
+    job_stats.setdefault(job_title, {}).update(viewed=0, greeted=0)
+
+    log_handler = logger.handlers[0]
+    cards = []
+    with tqdm(total=max_idx, desc=f"Harvesting Resumes for {job_title}", unit="resume",
+              leave=True, position=tqdm_position.get()) as pbar:
+        log_handler.set_tqdm(pbar)
+        try:
+            while idx < max_idx:
+                try:
+                    idx += 1
+                    card = await _card_at(tab, cards, idx)
+                    if card is None:
+                        break
+                    card_text = _filter_card(card, job_requirements)
+                    if card_text is None:
+                        await driver_utils.scroll_down(tab)
+                        pbar.update(1)
+                        continue
+
+                    identity = card['identity']
+                    if not identity:
+                        # Without a DOM id the greet pass could not find this card again
+                        logger.info(f"#{idx} 卡片没有候选人 ID，跳过。")
+                        await driver_utils.scroll_down(tab)
+                        pbar.update(1)
+                        continue
+                    if harvest_utils.is_harvested(job_title, identity):
+                        logger.info(f"#{idx} 已在候选队列中。")
+                        await driver_utils.scroll_down(tab)
+                        pbar.update(1)
+                        continue
+
+                    resume_image_base64, overview_text, resume_text = await asyncio.wait_for(
+                        driver_utils.get_resume(tab, idx),
+                        timeout=driver_utils.RESUME_LOAD_TIMEOUT,
+                    )
+                    overview_text = resume_utils.combine(resume_text, overview_text)
+                    harvest_utils.add_capture(job_title, identity, resume_image_base64, overview_text, card_text)
+                    harvested += 1
+                    job_stats[job_title]['viewed'] = harvested
+                    logger.info(f"#{idx} 简历已加入候选队列。")
+                    await driver_utils.close_resume(tab)
+                    await driver_utils.scroll_down(tab)
+                    pbar.update(1)
+
+                except TimeoutError:
+                    logger.warning(f"#{idx} 简历加载超时 ({driver_utils.RESUME_LOAD_TIMEOUT}s)，终止处理。")
+                    raise
+                except Exception as e:
+                    logger.warning(f"An error occurred: {e}")
+                    logger.info("Try next one.")
+                    pbar.update(1)
+                    continue
+        finally:
+            log_handler.set_tqdm(None)
+
+    logger.info(f"候选队列新增：{harvested}")
+    return harvested, 0
+
+
+async def evaluate_harvest(client, job_configs: list) -> int:
+    """Bulk-evaluate the harvest queue against the configured jobs' cv_requirements."""
+    requirements_by_job = {
+        cfg['job_title']: get_job_requirements(cfg.get('job_requirements', {}))['cv_requirements']
+        for cfg in job_configs
+    }
+    return await harvest_utils.evaluate_pending(client, requirements_by_job)
+
+
+async def greet_harvested(tab, job_configs: list, job_stats: dict):
+    """Second pass of harvest mode: find qualified candidates by identity and greet them.
+
+    For each job, the recommend list is scanned (loading more cards as needed, up to
+    the job's max_idx) and every card whose identity was judged qualified is greeted
+    via its own 打招呼 button.
+    """
+    for cfg in job_configs:
+        job_title = cfg['job_title']
+        wanted = harvest_utils.qualified_identities(job_title)
+        if not wanted:
+            continue
+        max_idx = cfg.get('max_idx', 120)
+        logger.info(f"开始为职位 {job_title} 向 {len(wanted)} 位合格候选人打招呼")
+        await driver_utils.close_popover(tab)
+        await driver_utils.select_job_position(tab, job_title)
+
+        stats = job_stats.setdefault(job_title, {})
+        seen = 0
+        try:
+            while wanted:
+                identities = [card['identity'] for card in await driver_utils.snapshot_cards(tab)]
+                for idx, identity in enumerate(identities[seen:], start=seen + 1):
+                    if identity not in wanted:
+                        continue
+                    if await driver_utils.say_hi_on_card(tab, idx):
+                        stats['greeted'] = stats.get('greeted', 0) + 1
+                        logger.info(f"#{idx} 已打招呼（批量评估合格）。")
+                    harvest_utils.mark_greeted(job_title, identity)
+                    wanted.discard(identity)
+                if len(identities) == seen or len(identities) >= max_idx:
+                    break
+                seen = len(identities)
+                await driver_utils.scroll_to_bottom(tab)
+        except driver_utils.DailyGreetingLimitReached:
+            logger.warning(f"当前职位今日打招呼已达上限，停止处理：{job_title}")
+        if wanted:
+            logger.info(f"职位 {job_title}：{len(wanted)} 位合格候选人未在推荐列表中找到")
@@ -1,16 +1,23 @@
 # from langchain.chat_models import ChatOpenAI
 # from langchain.prompts import PromptTemplate
 # from langchain.embeddings import OpenAIEmbeddings
+import asyncio
+import hashlib
 import json
 import re
+import sqlite3
 import time
+from collections import deque
 from datetime import date
+import httpx
 from pydantic import BaseModel
-from requests.exceptions import Timeout
 import os
 import openai
 from dotenv import load_dotenv
 from log_utils import logger
+import image_utils
+import usage_utils
+from usage_utils import BudgetExhausted
 load_dotenv()
 
 # LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
@@ -93,27 +100,80 @@ class interviewer(BaseModel):
     reason_category: str  # one of 9 preset values, or "" if qualified
 
 
-def _parse_content(content: str) -> interviewer:
-    """Parse raw text into interviewer when output_parsed is unavailable."""
+class job_verdict(BaseModel):
+    job_id: int  # 1-based index of the job block in the user message
+    reason: str
+    is_qualified: bool
+    reason_category: str
+
+
+class multi_interviewer(BaseModel):
+    verdicts: list[job_verdict]
+
+
+multi_job_message = """
+
+## Multiple Job Descriptions
+The user message may contain several numbered job descriptions (职位1, 职位2, ...) for the same candidate. Evaluate the candidate against each job independently, applying every rule above separately for each job. Output a JSON object with a `verdicts` array holding exactly one entry per job, in the same order. Each entry has `job_id` (the job's number) plus `reason`, `is_qualified` and `reason_category` produced exactly as specified above for that job alone.
+"""
+
+
+class stream_interviewer(BaseModel):
+    # Same fields as interviewer, verdict first so it can be acted on while `reason` streams
+    is_qualified: bool
+    reason_category: str
+    reason: str
+
+
+stream_message = """
+
+## Streaming Output Order
+Complete your evaluation before writing anything, then output `is_qualified` first, `reason_category` second and `reason` last. The first sentence of `reason` must still match `is_qualified` exactly.
+"""
+
+
+class screen_verdict(BaseModel):
+    reason: str
+    is_qualified: bool
+    reason_category: str
+    confidence: float  # 0-1, how certain the verdict is given only the text
+
+
+cascade_message = """
+
+## Text-Only Screening Stage
+You are the first, fast stage of a two-stage screen. You do NOT see the full resume, only the candidate's list-card text and experience overview. Apply the rules above to this text and also output `confidence` between 0 and 1 for how certain your verdict is given the limited information.
+- If a must-have condition cannot be verified from the text alone, do not reject for it; either judge it qualified or give a low confidence.
+- Give confidence of 0.9 or higher only to rejections backed by explicit evidence in the text (e.g. stated salary, degree, or clearly unrelated experience).
+"""
+
+
+parse_stats = {"calls": 0, "failures": 0}
+
+
+def _parse_content(content: str, model: type[BaseModel] = interviewer) -> BaseModel:
+    """Parse raw text into model (interviewer by default) when output_parsed is unavailable."""
+    parse_stats["calls"] += 1
     # Strategy 1: direct JSON parse
     try:
-        return interviewer(**json.loads(content))
+        return model(**json.loads(content))
     except Exception:
         pass
     # Strategy 2: JSON inside markdown code block
     m = re.search(r"```(?:json)?\s*(\{.*?})\s*```", content, re.DOTALL)
     if m:
         try:
-            return interviewer(**json.loads(m.group(1)))
+            return model(**json.loads(m.group(1)))
         except Exception:
             pass
     # Strategy 3: first JSON object in text
     m = re.search(r"\{.*}", content, re.DOTALL)
     if m:
         try:
-            return interviewer(**json.loads(m.group(0)))
+            return model(**json.loads(m.group(0)))
         except Exception:
             pass
+    parse_stats["failures"] += 1
     raise ValueError(f"Cannot parse LLM response: {content[:200]}")
 
 
@@ -122,91 +182,312 @@ RETRY_DELAYS = [10, 30]  # seconds to wait before 1st and 2nd retry
 
 _base_url = os.getenv("OPENAI_BASE_URL", "")
 _local_hosts = ("localhost", "127.0.0.1", "::1")
-_is_openai_cloud = (
-    not any(h in _base_url for h in _local_hosts)
-    and LLM_MODEL.lower().startswith("gpt")
-)
+
+
 _max_tokens_env = os.getenv("MAX_TOKENS")
 MAX_OUTPUT_TOKENS = int(_max_tokens_env) if _max_tokens_env else 1400  # for Responses API (cloud)
 MAX_TOKENS_CHAT = int(_max_tokens_env) if _max_tokens_env else 2800    # Chat Completions API (local)
+# Reasoning effort for the Responses API; only sent on the chat path when set explicitly
+_reasoning_effort_env = os.getenv("REASONING_EFFORT")
+REASONING_EFFORT = _reasoning_effort_env or "low"
+
 
+# Keep-alive pool shared by every request made through one client, so the TLS/TCP
+# handshake is paid once per backend instead of once per candidate.
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "8"))
+LLM_KEEPALIVE_EXPIRY = float(os.getenv("LLM_KEEPALIVE_EXPIRY", "120"))
 
-def _build_user_text(resume_requirement: str, overview_text: str) -> str:
-    text = f"职位要求:\n{resume_requirement}\n\n"
+
+def create_client(api_key: str | None, base_url: str | None = None, timeout: float = 60.0) -> openai.AsyncOpenAI:
+    """Build an AsyncOpenAI client backed by a pooled keep-alive HTTP client."""
+    http_client = openai.DefaultAsyncHttpxClient(
+        limits=httpx.Limits(
+            max_connections=LLM_MAX_CONNECTIONS,
+            max_keepalive_connections=LLM_MAX_CONNECTIONS,
+            keepalive_expiry=LLM_KEEPALIVE_EXPIRY,
+        ),
+    )
+    kwargs = {"api_key": api_key, "timeout": timeout, "http_client": http_client}
+    if base_url:
+        kwargs["base_url"] = base_url
+    return openai.AsyncOpenAI(**kwargs)
+
+
+# Prompt layout, ordered for prefix (KV) cache reuse on llama.cpp/MLX and OpenAI:
+#   system prompt -> job requirements -> resume image(s) -> candidate text + date.
+# The builders below return (job_text, candidate_text): job_text is byte-identical
+# for every candidate of a job, everything volatile goes into candidate_text.
+def _candidate_text(overview_text: str, card_text: str = "", overview_label: str = "，供参考") -> str:
+    text = ""
+    if card_text:
+        text += f"候选人卡片信息:\n{card_text}\n\n"
     if overview_text:
-        text += f"候选人经历概览（结构化工作、项目、教育经历摘要，供参考）:\n{overview_text}\n\n"
-    return text
+        text += f"候选人经历概览（结构化工作、项目、教育经历摘要{overview_label}）:\n{overview_text}\n\n"
+    return text + f"Today's date is {date.today().strftime('%Y-%m-%d')}."
+
+
+def _build_user_text(resume_requirement: str, overview_text: str) -> tuple[str, str]:
+    return f"职位要求:\n{resume_requirement}\n\n", _candidate_text(overview_text)
+
+
+def _build_multi_user_text(requirements: list[tuple[str, str]], overview_text: str) -> tuple[str, str]:
+    text = ""
+    for job_id, (job_title, requirement) in enumerate(requirements, start=1):
+        text += f"职位{job_id}（{job_title}）要求:\n{requirement}\n\n"
+    return text, _candidate_text(overview_text)
+
+
+def _build_screen_user_text(resume_requirement: str, overview_text: str, card_text: str) -> tuple[str, str]:
+    return f"职位要求:\n{resume_requirement}\n\n", _candidate_text(overview_text, card_text, overview_label="")
+
+
+def _local_schema(text_format: type[BaseModel]) -> dict:
+    """JSON schema for the local path, with minLength on every `reason` property."""
+    # xgrammar (omlx's local grammar-constrained decoder) honors minLength and enforces
+    # it at the token level, preventing the model from closing `reason` with zero content.
+    # OpenAI's strict structured outputs rejects minLength/default, so this override is
+    # local-path only; the cloud path in _call_responses_api uses the plain pydantic schema.
+    schema = text_format.model_json_schema()
+    for definition in [schema, *schema.get("$defs", {}).values()]:
+        reason = definition.get("properties", {}).get("reason")
+        if reason is not None:
+            reason["minLength"] = 20
+    return schema
+
+
+# Cached prompt tokens reported in `usage` (OpenAI, LM Studio, llama.cpp server).
+prompt_cache_stats = {"calls": 0, "prompt_tokens": 0, "cached_tokens": 0}
+
+
+_USAGE_FIELDS = {
+    # api: (input, input details, output, output details)
+    "chat": ("prompt_tokens", "prompt_tokens_details", "completion_tokens", "completion_tokens_details"),
+    "responses": ("input_tokens", "input_tokens_details", "output_tokens", "output_tokens_details"),
+}
+
+
+def _field(obj, name: str):
+    """Attribute or key lookup, so SDK objects and raw batch-output dicts both work."""
+    if obj is None:
+        return None
+    return obj.get(name) if isinstance(obj, dict) else getattr(obj, name, None)
 
 
-def _call_responses_api(client, resume_image_base64: str, resume_requirement: str, overview_text: str) -> interviewer:
+def _record_usage(response, api: str, images: list[tuple[str, str]] = ()):
+    """Account a response's usage block: prompt-cache stats plus usage_utils (tokens, cost, budgets)."""
+    usage = _field(response, "usage")
+    if usage is None:
+        return
+    input_field, input_details, output_field, output_details = _USAGE_FIELDS[api]
+    prompt_tokens = _field(usage, input_field) or 0
+    cached = _field(_field(usage, input_details), "cached_tokens") or 0
+    if not cached:
+        # llama.cpp server reports KV cache reuse as timings.cache_n instead
+        extra = response if isinstance(response, dict) else (getattr(response, "model_extra", None) or {})
+        cached = (extra.get("timings") or {}).get("cache_n", 0) or 0
+    prompt_cache_stats["calls"] += 1
+    prompt_cache_stats["prompt_tokens"] += prompt_tokens
+    prompt_cache_stats["cached_tokens"] += cached
+    usage_utils.record(
+        _field(response, "model") or LLM_MODEL,
+        prompt_tokens,
+        cached,
+        _field(usage, output_field) or 0,
+        _field(_field(usage, output_details), "reasoning_tokens") or 0,
+        image_utils.estimate_tokens(images) if images else 0,
+    )
+
+
+def _prompt_cache_key(instructions: str, user_text: str) -> str:
+    """Per-job cache routing key: candidates of the same job share one cached prefix."""
+    digest = hashlib.sha1(f"{instructions}\0{user_text}".encode("utf-8")).hexdigest()[:12]
+    return f"{PROMPT_CACHE_KEY}_{digest}"
+
+
+async def _call_responses_api(client, images: list[tuple[str, str]], user_text: str,
+                              text_format: type[BaseModel] = interviewer,
+                              instructions: str = system_message,
+                              model: str | None = None, max_tokens: int | None = None,
+                              candidate_text: str = "") -> BaseModel:
     """OpenAI cloud path: Responses API with prompt caching and reasoning."""
-    response = client.responses.parse(
-        model=LLM_MODEL,
-        prompt_cache_key=PROMPT_CACHE_KEY,
-        instructions=system_message,
+    response = await client.responses.parse(
+        **_responses_request(images, user_text, text_format, instructions, model, max_tokens, candidate_text),
+        timeout=60.0,
+    )
+    _record_usage(response, "responses", images)
+    if response.output_parsed is not None:
+        return response.output_parsed
+    return _parse_content(response.output_text, text_format)
+
+
+def _responses_request(images: list[tuple[str, str]], user_text: str,
+                       text_format: type[BaseModel] = interviewer,
+                       instructions: str = system_message,
+                       model: str | None = None, max_tokens: int | None = None,
+                       candidate_text: str = "") -> dict:
+    """Responses API request arguments, shared by the blocking and streaming calls."""
+    return dict(
+        model=model or LLM_MODEL,
+        prompt_cache_key=_prompt_cache_key(instructions, user_text),
+        instructions=instructions,
         input=[
             {
                 "type": "message",
                 "role": "user",
                 "content": [
-                    {"type": "input_text", "text": _build_user_text(resume_requirement, overview_text)},
-                    {"type": "input_image", "image_url": f"data:image/png;base64,{resume_image_base64}"}
+                    {"type": "input_text", "text": user_text},
+                    *({"type": "input_image", "image_url": f"data:{mime};base64,{b64}"} for mime, b64 in images),
+                    *([{"type": "input_text", "text": candidate_text}] if candidate_text else []),
                 ]
             }
         ],
-        reasoning={"effort": "low"},
-        max_output_tokens=MAX_OUTPUT_TOKENS,
-        text_format=interviewer,
-        timeout=60.0,
+        reasoning={"effort": REASONING_EFFORT},
+        max_output_tokens=max_tokens or MAX_OUTPUT_TOKENS,
+        text_format=text_format,
     )
-    if response.output_parsed is not None:
-        return response.output_parsed
-    return _parse_content(response.output_text)
 
 
-def _call_chat_api(client, resume_image_base64: str, resume_requirement: str, overview_text: str) -> interviewer:
-    """Local LM Studio path: Chat Completions API with json_schema output."""
-    today = date.today().strftime("%Y-%m-%d")
-    system_with_date = f"Today's date is {today}.\n\n{system_message}"
-    # xgrammar (omlx's local grammar-constrained decoder) honors minLength and enforces
-    # it at the token level, preventing the model from closing `reason` with zero content.
-    # OpenAI's strict structured outputs rejects minLength/default, so this override is
-    # local-path only; the cloud path in _call_responses_api uses the plain pydantic schema.
-    local_schema = interviewer.model_json_schema()
-    local_schema["properties"]["reason"]["minLength"] = 20
-    response = client.chat.completions.create(
-        model=LLM_MODEL,
+def _chat_request(images: list[tuple[str, str]], user_text: str,
+                  text_format: type[BaseModel] = interviewer,
+                  instructions: str = system_message,
+                  model: str | None = None, max_tokens: int | None = None,
+                  candidate_text: str = "") -> dict:
+    """Chat Completions request body, shared by _call_chat_api and evaluate_batch."""
+    return dict(
+        model=model or LLM_MODEL,
         messages=[
-            {"role": "system", "content": system_with_date},
+            {"role": "system", "content": instructions},
             {
                 "role": "user",
                 "content": [
-                    {"type": "text", "text": _build_user_text(resume_requirement, overview_text)},
-                    {"type": "image_url", "image_url": {"url": f"data:image/png;base64,{resume_image_base64}"}}
+                    {"type": "text", "text": user_text},
+                    *({"type": "image_url", "image_url": {"url": f"data:{mime};base64,{b64}"}} for mime, b64 in images),
+                    *([{"type": "text", "text": candidate_text}] if candidate_text else []),
                 ]
             }
         ],
         response_format={
             "type": "json_schema",
-            "json_schema": {"name": "interviewer", "schema": local_schema}
+            "json_schema": {"name": text_format.__name__, "schema": _local_schema(text_format)}
         },
-        max_tokens=MAX_TOKENS_CHAT,
+        max_tokens=max_tokens or MAX_TOKENS_CHAT,
+        **({"reasoning_effort": _reasoning_effort_env} if _reasoning_effort_env else {}),
+    )
+
+
+async def _call_chat_api(client, images: list[tuple[str, str]], user_text: str,
+                         text_format: type[BaseModel] = interviewer,
+                         instructions: str = system_message,
+                         model: str | None = None, max_tokens: int | None = None,
+                         candidate_text: str = "") -> BaseModel:
+    """Local LM Studio path: Chat Completions API with json_schema output."""
+    response = await client.chat.completions.create(
+        **_chat_request(images, user_text, text_format, instructions, model, max_tokens, candidate_text),
         timeout=120.0,
     )
+    _record_usage(response, "chat", images)
     msg = response.choices[0].message
     content = msg.content or ""
     if not content.strip():
         # LM Studio 0.4.7+: with json_schema format, the structured output
         # is placed in reasoning_content while content is left empty.
         content = (msg.model_extra or {}).get("reasoning_content", "") or ""
-    return _parse_content(content)
+    return _parse_content(content, text_format)
+
+
+# Streaming mode: the verdict is handed to the caller (on_verdict) as soon as
+# is_qualified and reason_category have closed in the stream, while `reason`
+# keeps streaming into the log.
+ENABLE_LLM_STREAM = os.getenv("LLM_STREAM", "false").lower() == "true"
+stream_stats = {"calls": 0, "early": 0, "verdict_seconds": 0.0, "total_seconds": 0.0}
+
+
+class _VerdictWatcher:
+    """Incrementally scans a streamed stream_interviewer object for its verdict fields."""
+
+    _QUALIFIED = re.compile(r'"is_qualified"\s*:\s*(true|false)')
+    _CATEGORY = re.compile(r'"reason_category"\s*:\s*"((?:[^"\\]|\\.)*)"')
+
+    def __init__(self, on_verdict):
+        self.on_verdict = on_verdict
+        self.content = ""
+        self.reasoning = ""  # LM Studio streams json_schema output as reasoning_content
+        self.start = time.perf_counter()
+        self.verdict_at = None
+
+    def feed(self, content: str = "", reasoning: str = ""):
+        self.content += content
+        self.reasoning += reasoning
+        if self.verdict_at is not None:
+            return
+        # reasoning_content is usually chain-of-thought that may draft (and revise) a verdict;
+        # only trust it early when it is the json_schema output itself
+        text = self.content
+        if not text and self.reasoning.lstrip().startswith("{"):
+            text = self.reasoning
+        qualified = self._QUALIFIED.search(text)
+        category = self._CATEGORY.search(text)
+        if qualified and category:
+            self.verdict_at = time.perf_counter()
+            self.on_verdict(qualified.group(1) == "true", json.loads(f'"{category.group(1)}"'))
+
+    def result(self) -> interviewer:
+        parsed = _parse_content(self.content if self.content.strip() else self.reasoning, stream_interviewer)
+        end = time.perf_counter()
+        stream_stats["calls"] += 1
+        stream_stats["total_seconds"] += end - self.start
+        if self.verdict_at is not None:
+            stream_stats["early"] += 1
+            stream_stats["verdict_seconds"] += self.verdict_at - self.start
+        else:
+            stream_stats["verdict_seconds"] += end - self.start
+            self.on_verdict(parsed.is_qualified, parsed.reason_category)
+        return interviewer(**parsed.model_dump())
+
+
+async def _stream_responses_api(client, images: list[tuple[str, str]], user_text: str, on_verdict,
+                                model: str | None = None, candidate_text: str = "") -> interviewer:
+    """Streaming variant of _call_responses_api for a single-job verdict."""
+    watcher = _VerdictWatcher(on_verdict)
+    async with client.responses.stream(
+        **_responses_request(images, user_text, stream_interviewer, system_message + stream_message,
+                             model, None, candidate_text),
+        timeout=60.0,
+    ) as stream:
+        async for event in stream:
+            if event.type == "response.output_text.delta":
+                watcher.feed(event.delta)
+        response = await stream.get_final_response()
+    _record_usage(response, "responses", images)
+    return watcher.result()
+
+
+async def _stream_chat_api(client, images: list[tuple[str, str]], user_text: str, on_verdict,
+                           model: str | None = None, candidate_text: str = "") -> interviewer:
+    """Streaming variant of _call_chat_api for a single-job verdict."""
+    watcher = _VerdictWatcher(on_verdict)
+    stream = await client.chat.completions.create(
+        **_chat_request(images, user_text, stream_interviewer, system_message + stream_message,
+                        model, None, candidate_text),
+        stream=True,
+        stream_options={"include_usage": True},
+        timeout=120.0,
+    )
+    async for chunk in stream:
+        if chunk.usage is not None:
+            _record_usage(chunk, "chat", images)
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta
+        watcher.feed(delta.content or "", (delta.model_extra or {}).get("reasoning_content") or "")
+    return watcher.result()
 
 
 def _is_retryable(exc: Exception) -> bool:
-    """Channel Error / server crash is worth retrying; bad requests are not."""
+    """Channel Error / server crash / rate limiting is worth retrying; bad requests are not."""
     if isinstance(exc, (openai.APIConnectionError, openai.APITimeoutError)):
         return True
-    if isinstance(exc, openai.InternalServerError):
+    if isinstance(exc, (openai.InternalServerError, openai.RateLimitError)):
         return True
     # LM Studio reports model-backend crashes as APIStatusError with "Channel Error"
     if isinstance(exc, openai.APIStatusError) and "channel error" in str(exc).lower():
@@ -214,40 +495,940 @@ def _is_retryable(exc: Exception) -> bool:
     return False
 
 
-def _call_llm(client, resume_image_base64: str, resume_requirement: str, overview_text: str) -> interviewer | None:
-    """Shared retry logic for both is_qualified and is_qualified_result."""
-    for attempt, delay in enumerate([0] + RETRY_DELAYS, start=1):
-        if delay:
-            logger.warning(f"Retrying LLM request (attempt {attempt}) after {delay}s...")
-            time.sleep(delay)
+def _parse_duration(value: str) -> float | None:
+    """Parse rate-limit header durations: '2', '1.5s', '250ms', '6m0s'."""
+    value = (value or "").strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = re.findall(r"([\d.]+)(ms|s|m|h)", value)
+    if not parts:
+        return None
+    scale = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+    return sum(float(n) * scale[unit] for n, unit in parts)
+
+
+def _retry_after_seconds(exc: Exception) -> float | None:
+    """Server-requested wait from retry-after / x-ratelimit-reset-* headers, if any."""
+    response = getattr(exc, "response", None)
+    if response is None:
+        return None
+    headers = response.headers
+    if headers.get("retry-after-ms"):
+        ms = _parse_duration(headers["retry-after-ms"])
+        return ms / 1000 if ms is not None else None
+    for name in ("retry-after", "x-ratelimit-reset-requests", "x-ratelimit-reset-tokens"):
+        if headers.get(name):
+            seconds = _parse_duration(headers[name])
+            if seconds is not None:
+                return seconds
+    return None
+
+
+# Shared pacing and circuit breaking per backend.
+LLM_RATE_PER_MINUTE = float(os.getenv("LLM_RATE_PER_MINUTE", "0"))  # 0 = no pacing
+LLM_RATE_BURST = int(os.getenv("LLM_RATE_BURST", "3"))
+LLM_BREAKER_THRESHOLD = int(os.getenv("LLM_BREAKER_THRESHOLD", "3"))
+LLM_BREAKER_COOLDOWN = float(os.getenv("LLM_BREAKER_COOLDOWN", "15"))
+LLM_BREAKER_MAX_COOLDOWN = float(os.getenv("LLM_BREAKER_MAX_COOLDOWN", "300"))
+LLM_MAX_OUTAGE_WAITS = int(os.getenv("LLM_MAX_OUTAGE_WAITS", "3"))
+
+
+class BackendLimiter:
+    """Token-bucket pacing plus a circuit breaker for one LLM backend.
+
+    closed    - requests flow, paced by the bucket and any server-requested delay.
+    open      - entered after `threshold` consecutive backend failures; callers
+                (and the scan loops, via wait_for_backend) block instead of
+                burning candidates on doomed retries.
+    half_open - after the cooldown a cheap probe (models.list) is sent; success
+                closes the circuit, failure reopens it with a doubled cooldown.
+    """
+
+    def __init__(self, name: str, rate_per_minute: float = LLM_RATE_PER_MINUTE, burst: int = LLM_RATE_BURST,
+                 threshold: int = LLM_BREAKER_THRESHOLD, cooldown: float = LLM_BREAKER_COOLDOWN,
+                 max_cooldown: float = LLM_BREAKER_MAX_COOLDOWN):
+        self.name = name
+        self.rate = rate_per_minute / 60
+        self.burst = max(burst, 1)
+        self.threshold = threshold
+        self.base_cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.state = "closed"
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._failures = 0
+        self._cooldown = cooldown
+        self._closed = asyncio.Event()
+        self._closed.set()
+        self._probe_task = None
+
+    def _set_state(self, state: str):
+        if state != self.state:
+            logger.warning(f"LLM 熔断器[{self.name}]：{self.state} → {state}")
+            self.state = state
+        if state == "closed":
+            self._closed.set()
+        else:
+            self._closed.clear()
+
+    async def wait_until_available(self):
+        await self._closed.wait()
+
+    async def acquire(self):
+        """Wait until the circuit is closed, any server-requested delay has passed, and a token is free."""
+        while True:
+            await self._closed.wait()
+            now = time.monotonic()
+            if now < self._blocked_until:
+                await asyncio.sleep(self._blocked_until - now)
+                continue
+            if self.rate <= 0:
+                return
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    def try_acquire(self) -> bool:
+        """Take a token only if acquire() would not have to wait."""
+        now = time.monotonic()
+        if self.state != "closed" or now < self._blocked_until:
+            return False
+        if self.rate <= 0:
+            return True
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        if self._tokens < 1:
+            return False
+        self._tokens -= 1
+        return True
+
+    def record_success(self):
+        self._failures = 0
+        self._cooldown = self.base_cooldown
+
+    def record_failure(self, client, exc: Exception) -> float | None:
+        """Account for a retryable failure. Returns the server-requested delay, if any."""
+        delay = _retry_after_seconds(exc)
+        if delay is not None:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + delay)
+            logger.warning(f"LLM 后端[{self.name}]要求等待 {delay:.1f}s")
+        if isinstance(exc, openai.RateLimitError):
+            # Throttled, not broken: honour the delay but don't trip the breaker.
+            return delay
+        self._failures += 1
+        if self.state == "closed" and self._failures >= self.threshold:
+            self._set_state("open")
+            self._probe_task = asyncio.ensure_future(self._probe_until_recovered(client))
+        return delay
+
+    async def _probe_until_recovered(self, client):
+        while True:
+            logger.warning(f"LLM 后端[{self.name}]不可用，{self._cooldown:.0f}s 后探测")
+            await asyncio.sleep(self._cooldown)
+            self._set_state("half_open")
+            try:
+                await client.models.list(timeout=10.0)
+            except Exception as e:
+                logger.warning(f"LLM 后端[{self.name}]探测失败：{e}")
+                self._cooldown = min(self._cooldown * 2, self.max_cooldown)
+                self._set_state("open")
+                continue
+            self.record_success()
+            self._set_state("closed")
+            return
+
+
+# Backend pool: several OpenAI-compatible endpoints (e.g. LM Studio boxes plus a
+# cloud fallback), each with its own model and API path.  LLM_ENDPOINTS holds a
+# JSON list (inline or a path to a .json file) of
+#   {"name", "base_url", "api_key", "model", "api": "chat" | "responses"};
+# without it the pool has a single endpoint built from OPENAI_BASE_URL/LLM_MODEL.
+LLM_ENDPOINTS = os.getenv("LLM_ENDPOINTS", "")
+LLM_HEALTH_INTERVAL = float(os.getenv("LLM_HEALTH_INTERVAL", "30"))
+# Hedging: when a request outlives its endpoint's p95 latency, send a duplicate to
+# another endpoint and keep whichever answers first.
+ENABLE_LLM_HEDGE = os.getenv("LLM_HEDGE", "false").lower() == "true"
+LLM_HEDGE_MIN_SAMPLES = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))
+
+
+class Endpoint:
+    """One LLM backend: client, model, API path, limiter and latency stats."""
+
+    LATENCY_WINDOW = 200
+
+    def __init__(self, name: str, client, model: str, api: str):
+        self.name = name
+        self.client = client
+        self.model = model
+        self.api = api
+        self.limiter = BackendLimiter(name)
+        self.healthy = True
+        self.outstanding = 0
+        self.calls = 0
+        self.failures = 0
+        self.hedges_won = 0
+        self.latencies = deque(maxlen=self.LATENCY_WINDOW)
+
+    def available(self) -> bool:
+        return self.healthy and self.limiter.state == "closed"
+
+    def percentile(self, q: float) -> float | None:
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(int(len(ordered) * q), len(ordered) - 1)]
+
+
+class BackendPool:
+    """Least-outstanding-requests balancing over Endpoints, with health checks and hedging."""
+
+    def __init__(self, endpoints: list[Endpoint]):
+        self.endpoints = endpoints
+        self._health_task = None
+        self._changed = asyncio.Event()
+        _pools.append(self)
+
+    @property
+    def primary(self) -> Endpoint:
+        return self.endpoints[0]
+
+    def pick(self, exclude=()) -> Endpoint | None:
+        candidates = [ep for ep in self.endpoints if ep.available() and ep not in exclude]
+        if not candidates:
+            return None
+        return min(candidates, key=lambda ep: (ep.outstanding, ep.percentile(0.5) or 0.0))
+
+    async def wait_until_available(self):
+        while not any(ep.available() for ep in self.endpoints):
+            # Endpoints failed by the health check have a closed circuit; only _changed wakes us for those.
+            waiters = [asyncio.ensure_future(ep.limiter.wait_until_available())
+                       for ep in self.endpoints if ep.limiter.state != "closed"]
+            waiters.append(asyncio.ensure_future(self._changed.wait()))
+            try:
+                await asyncio.wait(waiters, return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                for w in waiters:
+                    w.cancel()
+            self._changed.clear()
+
+    def ensure_health_checks(self):
+        if len(self.endpoints) > 1 and self._health_task is None and LLM_HEALTH_INTERVAL > 0:
+            self._health_task = asyncio.ensure_future(self._health_loop())
+
+    async def _health_loop(self):
+        while True:
+            await asyncio.sleep(LLM_HEALTH_INTERVAL)
+            for ep in self.endpoints:
+                if ep.limiter.state != "closed":
+                    continue  # the circuit breaker is already probing this one
+                try:
+                    await ep.client.models.list(timeout=5.0)
+                    healthy = True
+                except Exception as e:
+                    healthy = False
+                    logger.debug(f"LLM 后端[{ep.name}]健康检查失败：{e}")
+                if healthy != ep.healthy:
+                    logger.warning(f"LLM 后端[{ep.name}]：{'恢复' if healthy else '健康检查失败，暂停分配'}")
+                    ep.healthy = healthy
+                    self._changed.set()
+
+    async def _timed(self, ep: Endpoint, request):
+        ep.outstanding += 1
+        start = time.perf_counter()
         try:
-            if _is_openai_cloud:
-                result = _call_responses_api(client, resume_image_base64, resume_requirement, overview_text)
-            else:
-                result = _call_chat_api(client, resume_image_base64, resume_requirement, overview_text)
-            logger.llm(f"{result.is_qualified} - {result.reason}")
+            result = await request(ep)
+        except Exception as e:
+            ep.failures += 1
+            if _is_retryable(e):
+                ep.limiter.record_failure(ep.client, e)
+            raise
+        finally:
+            ep.outstanding -= 1
+        ep.calls += 1
+        ep.latencies.append(time.perf_counter() - start)
+        ep.limiter.record_success()
+        return result
+
+    async def run(self, ep: Endpoint, request, hedge: bool = ENABLE_LLM_HEDGE):
+        """Run request(ep); optionally hedge onto a second endpoint past ep's p95 latency."""
+        primary = asyncio.ensure_future(self._timed(ep, request))
+        p95 = ep.percentile(0.95) if hedge and len(ep.latencies) >= LLM_HEDGE_MIN_SAMPLES else None
+        if p95 is None:
+            return await primary
+        done, _ = await asyncio.wait({primary}, timeout=p95)
+        backup_ep = None if done else self.pick(exclude={ep})
+        # A hedge is a full request too: it goes through the backup's pacing, and is
+        # skipped rather than queued when that endpoint has no token to spare.
+        if backup_ep is None or not backup_ep.limiter.try_acquire():
+            return await primary
+
+        logger.info(f"LLM 请求超过 [{ep.name}] p95 {p95:.1f}s，对冲至 [{backup_ep.name}]")
+        backup = asyncio.ensure_future(self._timed(backup_ep, request))
+        pending = {primary, backup}
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is backup:
+                            backup_ep.hedges_won += 1
+                        return task.result()
+            return primary.result()  # both failed: surface the primary's error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def close(self):
+        if self._health_task is not None:
+            self._health_task.cancel()
+        for ep in self.endpoints:
+            await ep.client.close()
+
+
+_pools: list[BackendPool] = []
+_wrapped: dict[int, BackendPool] = {}
+
+
+def _endpoint_api(base_url: str | None, model: str) -> str:
+    """OpenAI cloud GPT models go through the Responses API; everything else uses Chat Completions."""
+    base_url = base_url or ""
+    cloud = not any(h in base_url for h in _local_hosts)
+    return "responses" if cloud and model.lower().startswith("gpt") else "chat"
+
+
+def create_pool(api_key: str | None, base_url: str | None = None, timeout: float = 60.0) -> BackendPool:
+    """Build the backend pool from LLM_ENDPOINTS, or a single endpoint from the given settings."""
+    if not LLM_ENDPOINTS:
+        client = create_client(api_key, base_url, timeout)
+        return BackendPool([Endpoint("default", client, LLM_MODEL, _endpoint_api(base_url, LLM_MODEL))])
+
+    if os.path.isfile(LLM_ENDPOINTS):
+        with open(LLM_ENDPOINTS, encoding="utf-8") as f:
+            specs = json.load(f)
+    else:
+        specs = json.loads(LLM_ENDPOINTS)
+    endpoints = []
+    for i, spec in enumerate(specs):
+        model = spec.get("model", LLM_MODEL)
+        ep_base_url = spec.get("base_url", base_url)
+        endpoints.append(Endpoint(
+            spec.get("name", f"endpoint{i + 1}"),
+            create_client(spec.get("api_key", api_key), ep_base_url, spec.get("timeout", timeout)),
+            model,
+            spec.get("api") or _endpoint_api(ep_base_url, model),
+        ))
+    logger.info("LLM 后端池：" + "，".join(f"{ep.name}({ep.model}/{ep.api})" for ep in endpoints))
+    return BackendPool(endpoints)
+
+
+def as_pool(client) -> BackendPool:
+    """Accept either a BackendPool or a bare AsyncOpenAI client (wrapped as a one-endpoint pool)."""
+    if isinstance(client, BackendPool):
+        return client
+    pool = _wrapped.get(id(client))
+    if pool is None:
+        pool = _wrapped[id(client)] = BackendPool([
+            Endpoint(str(getattr(client, "base_url", "default")), client, LLM_MODEL,
+                     _endpoint_api(_base_url, LLM_MODEL))
+        ])
+    return pool
+
+
+async def wait_for_backend(client):
+    """Block the scan loops while no backend is available, so no candidate is wasted."""
+    pool = as_pool(client)
+    if not any(ep.available() for ep in pool.endpoints):
+        logger.warning("LLM 后端不可用，暂停扫描直到恢复…")
+        await pool.wait_until_available()
+        logger.info("LLM 后端已恢复，继续扫描。")
+
+
+def _log_result(result: BaseModel, prefix: str = ""):
+    if isinstance(result, multi_interviewer):
+        for v in result.verdicts:
+            logger.llm(f"{prefix}[职位{v.job_id}] {v.is_qualified} - {v.reason}")
+    elif isinstance(result, screen_verdict):
+        logger.llm(f"{prefix}[文本初筛 {result.confidence:.2f}] {result.is_qualified} - {result.reason}")
+    else:
+        logger.llm(f"{prefix}{result.is_qualified} - {result.reason}")
+
+
+async def _call_llm(client, resume_image_base64: str | None, user_text: str,
+                    text_format: type[BaseModel] = interviewer,
+                    instructions: str = system_message,
+                    model: str | None = None, max_tokens: int | None = None,
+                    candidate_text: str = "", on_verdict=None, on_model=None) -> BaseModel | None:
+    """Shared retry logic for every evaluation entry point.
+
+    client may be a BackendPool or a bare AsyncOpenAI client.  model overrides the
+    endpoint's own model (used by the cascade's text-only stage).  user_text is the
+    per-job prompt prefix; candidate_text is appended after the resume image.
+    With LLM_STREAM=true, a single-job call given on_verdict(is_qualified,
+    reason_category) streams and calls it as soon as the verdict is known.
+    on_model(model) is told which model produced the returned result.
+    """
+    pool = as_pool(client)
+    pool.ensure_health_checks()
+    # Raises BudgetExhausted, or swaps in LLM_BUDGET_FALLBACK_MODEL, once a budget is used up
+    requested = model or pool.primary.model
+    if usage_utils.admit(requested) != requested:
+        model = usage_utils.LLM_BUDGET_FALLBACK_MODEL
+    images = await image_utils.prepare_resume_image(resume_image_base64)
+    stream = ENABLE_LLM_STREAM and on_verdict is not None and text_format is interviewer
+    handed_out = []  # the streamed verdict the caller has already acted on
+
+    def report_verdict(is_qualified: bool, reason_category: str):
+        handed_out.append(interviewer(reason="", is_qualified=is_qualified, reason_category=reason_category))
+        on_verdict(is_qualified, reason_category)
+
+    async def request(ep: Endpoint):
+        return model or ep.model, await _request(ep)
+
+    async def _request(ep: Endpoint):
+        if stream:
+            if ep.api == "responses":
+                return await _stream_responses_api(ep.client, images, user_text, report_verdict,
+                                                   model or ep.model, candidate_text)
+            return await _stream_chat_api(ep.client, images, user_text, report_verdict,
+                                          model or ep.model, candidate_text)
+        if ep.api == "responses":
+            return await _call_responses_api(ep.client, images, user_text, text_format, instructions,
+                                             model or ep.model, max_tokens, candidate_text)
+        return await _call_chat_api(ep.client, images, user_text, text_format, instructions,
+                                    model or ep.model, max_tokens, candidate_text)
+
+    attempt = 0
+    outage_waits = 0
+    while True:
+        ep = pool.pick()
+        if ep is None:
+            # An outage pauses the call instead of consuming its retries
+            attempt = 0
+            outage_waits += 1
+            if outage_waits > LLM_MAX_OUTAGE_WAITS:
+                logger.error("LLM backend still failing after recovery, giving up on this request")
+                return None
+            await pool.wait_until_available()
+            continue
+        await ep.limiter.acquire()
+        try:
+            # No hedging once streaming: a second stream could contradict the verdict already handed out
+            used, result = await pool.run(ep, request, hedge=ENABLE_LLM_HEDGE and not stream)
+            _log_result(result)
+            if on_model is not None:
+                on_model(used)
             return result
-        except Timeout:
-            logger.warning("LLM API request timed out")
-            return None
         except Exception as e:
-            if _is_retryable(e) and attempt <= len(RETRY_DELAYS):
-                logger.warning(f"LLM backend error (will retry): {e}")
+            if handed_out:
+                # The caller has acted on the streamed verdict; a retry could contradict it, so keep that one
+                logger.warning(f"LLM stream failed after the verdict, keeping it: {e}")
+                _log_result(handed_out[0])
+                if on_model is not None:
+                    on_model(model or ep.model)
+                return handed_out[0]
+            if not _is_retryable(e):
+                logger.error(f"Error in LLM API request: {e}")
+                return None
+            if pool.pick() is None:
+                logger.warning(f"LLM backend error, no backend available (will retry after recovery): {e}")
                 continue
-            logger.error(f"Error in LLM API request: {e}")
+            attempt += 1
+            if attempt > len(RETRY_DELAYS):
+                logger.error(f"Error in LLM API request: {e}")
+                return None
+            requested = _retry_after_seconds(e)
+            delay = requested if requested is not None else RETRY_DELAYS[attempt - 1]
+            logger.warning(f"LLM backend error (will retry): {e}")
+            logger.warning(f"Retrying LLM request (attempt {attempt + 1}) after {delay}s...")
+            await asyncio.sleep(delay)
+
+
+# Changing system_message changes the version, so verdicts produced by an older
+# prompt are never served from the cache.
+PROMPT_VERSION = hashlib.sha256(system_message.encode("utf-8")).hexdigest()[:12]
+STREAM_PROMPT_VERSION = hashlib.sha256(stream_message.encode("utf-8")).hexdigest()[:12]
+CASCADE_PROMPT_VERSION = hashlib.sha256(cascade_message.encode("utf-8")).hexdigest()[:12]
+
+# Two-stage cascade: a small text-only model (CASCADE_MODEL) judges the card and
+# overview text first; only uncertain or positive cases reach the vision model.
+CASCADE_MODEL = os.getenv("CASCADE_MODEL", "")
+CASCADE_CONFIDENCE = float(os.getenv("CASCADE_CONFIDENCE", "0.85"))
+CASCADE_MAX_TOKENS = int(os.getenv("CASCADE_MAX_TOKENS", "600"))
+cascade_stats = {"screened": 0, "resolved": 0, "escalated": 0, "screen_failed": 0,
+                 "screen_seconds": 0.0, "vision_seconds": 0.0}
+
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", "llm_cache.sqlite3")
+LLM_CACHE_TTL_DAYS = float(os.getenv("LLM_CACHE_TTL_DAYS", "30"))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "20000"))
+ENABLE_LLM_CACHE = os.getenv("DISABLE_LLM_CACHE", "false").lower() != "true"
+
+
+class VerdictCache:
+    """Persistent, content-addressed store of interviewer verdicts (SQLite).
+
+    Entries are keyed by a hash of everything that determines the model's answer,
+    including the model that actually produced it.  They expire after ttl_seconds,
+    and the least recently used ones are dropped once the table grows past
+    max_entries.  Concurrent lookups for the same key share one in-flight model
+    call instead of each sending the resume again.
+    """
+
+    EVICT_EVERY = 50  # run eviction every N inserts
+
+    def __init__(self, path: str, ttl_seconds: float, max_entries: int):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.collapsed = 0
+        self._db = None
+        self._inserts = 0
+        self._inflight: dict[str, asyncio.Task] = {}
+
+    @staticmethod
+    def make_key(*parts: str) -> str:
+        h = hashlib.sha256()
+        for part in parts:
+            h.update((part or "").encode("utf-8"))
+            h.update(b"\x00")
+        return h.hexdigest()
+
+    def _conn(self) -> sqlite3.Connection:
+        if self._db is None:
+            self._db = sqlite3.connect(self.path)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS verdicts ("
+                "key TEXT PRIMARY KEY, result TEXT NOT NULL, created REAL NOT NULL, last_used REAL NOT NULL)"
+            )
+            self._evict()
+        return self._db
+
+    def _evict(self):
+        db = self._db
+        db.execute("DELETE FROM verdicts WHERE created < ?", (time.time() - self.ttl_seconds,))
+        db.execute(
+            "DELETE FROM verdicts WHERE key IN ("
+            "SELECT key FROM verdicts ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
+        db.commit()
+
+    def get(self, key: str, model: type[BaseModel] = interviewer) -> BaseModel | None:
+        db = self._conn()
+        row = db.execute(
+            "SELECT result FROM verdicts WHERE key = ? AND created >= ?",
+            (key, time.time() - self.ttl_seconds),
+        ).fetchone()
+        if row is None:
             return None
-    return None
+        db.execute("UPDATE verdicts SET last_used = ? WHERE key = ?", (time.time(), key))
+        db.commit()
+        return model.model_validate_json(row[0])
 
+    def put(self, key: str, result: BaseModel):
+        db = self._conn()
+        now = time.time()
+        db.execute(
+            "INSERT OR REPLACE INTO verdicts (key, result, created, last_used) VALUES (?, ?, ?, ?)",
+            (key, result.model_dump_json(), now, now),
+        )
+        db.commit()
+        self._inserts += 1
+        if self._inserts % self.EVICT_EVERY == 0:
+            self._evict()
 
-def is_qualified(client, resume_image_base64, resume_requirement, overview_text: str = ""):
-    if not resume_requirement:
-        return False
-    result = _call_llm(client, resume_image_base64, resume_requirement, overview_text)
+    def lookup(self, key_parts: tuple, models: list[str], model: type[BaseModel] = interviewer):
+        """Return the verdict cached for key_parts by any of models; a failing read is a miss."""
+        try:
+            for m in models:
+                cached = self.get(self.make_key(*key_parts, m), model)
+                if cached is not None:
+                    return cached
+        except (sqlite3.Error, ValueError) as e:
+            logger.warning(f"LLM 缓存读取失败：{e}")
+        return None
+
+    def store(self, key_parts: tuple, llm_model: str, value: BaseModel):
+        """Store value under key_parts for llm_model; a failing write is only logged."""
+        try:
+            self.put(self.make_key(*key_parts, llm_model), value)
+        except sqlite3.Error as e:
+            logger.warning(f"LLM 缓存写入失败：{e}")
+
+    async def get_or_call(self, key_parts: tuple, models: list[str], call, model: type[BaseModel] = interviewer):
+        """Return a verdict cached for key_parts by any of models, or await call(on_model).
+
+        A non-None result is stored under the model call() reports through on_model.
+        """
+        cached = self.lookup(key_parts, models, model)
+        if cached is not None:
+            self.hits += 1
+            _log_result(cached, prefix="[缓存] ")
+            return cached
+
+        key = self.make_key(*key_parts)
+        task = self._inflight.get(key)
+        if task is not None:
+            self.collapsed += 1
+            return await asyncio.shield(task)
+
+        self.misses += 1
+        produced_by = []
+        task = asyncio.ensure_future(call(produced_by.append))
+        self._inflight[key] = task
+        try:
+            result = await asyncio.shield(task)
+        finally:
+            if task.done():
+                self._inflight.pop(key, None)
+            else:
+                task.add_done_callback(lambda _t: self._inflight.pop(key, None))
+        if result is not None and produced_by:
+            self.store(key_parts, produced_by[-1], result)
+        return result
+
+
+verdict_cache = VerdictCache(LLM_CACHE_PATH, LLM_CACHE_TTL_DAYS * 86400, LLM_CACHE_MAX_ENTRIES)
+
+
+# Key parts exclude the model: the cache appends the one that answered (see VerdictCache.get_or_call).
+def _single_key(resume_image_base64, overview_text: str, resume_requirement: str, streamed: bool = False) -> tuple:
+    # The streaming call uses its own verdict-first prompt (stream_message)
+    return ("single", resume_image_base64, overview_text, resume_requirement, PROMPT_VERSION,
+            STREAM_PROMPT_VERSION if streamed else "", image_utils.PREPROCESS_SIGNATURE)
+
+
+def _multi_key(resume_image_base64, overview_text: str, jobs: list[tuple[str, str]]) -> tuple:
+    return ("multi", resume_image_base64, overview_text, *(req for _, req in jobs), PROMPT_VERSION,
+            image_utils.PREPROCESS_SIGNATURE)
+
+
+def _notify_all(*callbacks):
+    """A single on_model callback that forwards to every callback given (None entries are skipped)."""
+    return lambda model: [cb(model) for cb in callbacks if cb is not None]
+
+
+async def _cached_call(client, key_parts: tuple, call, model: type[BaseModel] = interviewer,
+                       llm_model: str | None = None):
+    """Run call(on_model) behind the verdict cache (unless DISABLE_LLM_CACHE=true).
+
+    Lookups accept verdicts from llm_model, or from any of the pool's endpoint models.
+    """
+    if not ENABLE_LLM_CACHE:
+        return await call(None)
+    models = [llm_model] if llm_model else list(dict.fromkeys(ep.model for ep in as_pool(client).endpoints))
+    return await verdict_cache.get_or_call(key_parts, models, call, model)
+
+
+async def _screen(client, resume_requirement: str, overview_text: str, card_text: str,
+                  on_model=None) -> screen_verdict | None:
+    """Stage 1 of the cascade: text-only judgement by CASCADE_MODEL."""
+    user_text, candidate_text = _build_screen_user_text(resume_requirement, overview_text, card_text)
+    instructions = system_message + cascade_message
+    return await _cached_call(
+        client,
+        ("screen", overview_text, card_text, resume_requirement, PROMPT_VERSION, CASCADE_PROMPT_VERSION),
+        lambda cache_model: _call_llm(client, None, user_text, screen_verdict, instructions, CASCADE_MODEL,
+                                   CASCADE_MAX_TOKENS, candidate_text=candidate_text,
+                                   on_model=_notify_all(cache_model, on_model)),
+        screen_verdict,
+        CASCADE_MODEL,
+    )
+
+
+async def _evaluate(client, resume_image_base64: str, resume_requirement: str, overview_text: str,
+                    card_text: str = "", on_verdict=None, on_model=None) -> interviewer | None:
+    """Evaluate one resume: optional text-only screen first, then the cached vision call.
+
+    on_model(model) is called only when the verdict comes from a fresh model call, not the cache.
+    """
+    if CASCADE_MODEL and (overview_text or card_text):
+        start = time.perf_counter()
+        screened_by = []
+        screen = await _screen(client, resume_requirement, overview_text, card_text, screened_by.append)
+        cascade_stats["screen_seconds"] += time.perf_counter() - start
+        cascade_stats["screened"] += 1
+        if screen is None:
+            cascade_stats["screen_failed"] += 1
+        elif not screen.is_qualified and screen.confidence >= CASCADE_CONFIDENCE:
+            cascade_stats["resolved"] += 1
+            if screened_by and on_model is not None:
+                on_model(screened_by[-1])
+            return interviewer(
+                reason=screen.reason, is_qualified=False, reason_category=screen.reason_category
+            )
+        cascade_stats["escalated"] += 1
+        start = time.perf_counter()
+        result = await _evaluate_vision(client, resume_image_base64, resume_requirement, overview_text, on_verdict,
+                                        on_model)
+        cascade_stats["vision_seconds"] += time.perf_counter() - start
+        return result
+    return await _evaluate_vision(client, resume_image_base64, resume_requirement, overview_text, on_verdict, on_model)
+
+
+async def _evaluate_vision(client, resume_image_base64: str, resume_requirement: str, overview_text: str,
+                           on_verdict=None, on_model=None) -> interviewer | None:
+    """Full evaluation (image + text) by the pool's vision model behind the verdict cache."""
+    user_text, candidate_text = _build_user_text(resume_requirement, overview_text)
+    return await _cached_call(
+        client,
+        _single_key(resume_image_base64, overview_text, resume_requirement,
+                    streamed=ENABLE_LLM_STREAM and on_verdict is not None),
+        lambda cache_model: _call_llm(client, resume_image_base64, user_text, candidate_text=candidate_text,
+                                      on_verdict=on_verdict, on_model=_notify_all(cache_model, on_model)),
+    )
+
+
+def log_stats():
+    """Log LLM-side counters at exit (called next to main.log_final_stats)."""
+    if ENABLE_LLM_CACHE:
+        c = verdict_cache
+        total = c.hits + c.misses + c.collapsed
+        rate = (c.hits + c.collapsed) / total * 100 if total else 0.0
+        logger.llm(f"LLM 缓存：命中 {c.hits}，未命中 {c.misses}，合并请求 {c.collapsed}，命中率 {rate:.0f}%")
+    for pool in _pools:
+        for ep in pool.endpoints:
+            if not ep.calls and not ep.failures:
+                continue
+            p50, p95 = ep.percentile(0.5) or 0.0, ep.percentile(0.95) or 0.0
+            logger.llm(
+                f"LLM 后端[{ep.name}]：成功 {ep.calls}，失败 {ep.failures}，"
+                f"延迟 p50 {p50:.1f}s / p95 {p95:.1f}s，对冲胜出 {ep.hedges_won}"
+            )
+    if stream_stats["calls"]:
+        ss = stream_stats
+        logger.llm(
+            f"流式输出：{ss['calls']} 次调用，提前得出结论 {ss['early']} 次；"
+            f"平均出结论 {ss['verdict_seconds'] / ss['calls']:.1f}s / 完整输出 {ss['total_seconds'] / ss['calls']:.1f}s"
+        )
+    if prompt_cache_stats["calls"]:
+        pc = prompt_cache_stats
+        ratio = pc["cached_tokens"] / pc["prompt_tokens"] * 100 if pc["prompt_tokens"] else 0.0
+        logger.llm(
+            f"提示词前缀缓存：{pc['calls']} 次调用，输入 {pc['prompt_tokens']} tokens，"
+            f"缓存命中 {pc['cached_tokens']} tokens（{ratio:.0f}%）"
+        )
+    if cascade_stats["screened"]:
+        cs = cascade_stats
+        resolved_pct = cs["resolved"] / cs["screened"] * 100
+        avg_screen = cs["screen_seconds"] / cs["screened"]
+        avg_vision = cs["vision_seconds"] / cs["escalated"] if cs["escalated"] else 0.0
+        logger.llm(
+            f"级联筛选：文本初筛 {cs['screened']} 人，直接判定不符合 {cs['resolved']}（{resolved_pct:.0f}%），"
+            f"升级视觉评估 {cs['escalated']}（初筛失败 {cs['screen_failed']}）；"
+            f"平均耗时 初筛 {avg_screen:.1f}s / 视觉 {avg_vision:.1f}s，"
+            f"估计节省视觉调用 {cs['resolved'] * avg_vision:.0f}s"
+        )
+
+
+# Append every evaluated candidate to this JSONL file (input for bench.py); the
+# verdict is stored as `expected` and can be hand-corrected into a labelled set.
+SAVE_RESUME_CORPUS = os.getenv("SAVE_RESUME_CORPUS", "")
+
+
+def _save_corpus_record(resume_image_base64: str, resume_requirement: str, overview_text: str,
+                        card_text: str, result: interviewer, model: str):
+    record = {
+        "canvas_b64": resume_image_base64,
+        "overview_text": overview_text,
+        "card_text": card_text,
+        "cv_requirements": resume_requirement,
+        "expected": {"is_qualified": result.is_qualified, "reason_category": result.reason_category},
+        "model": model,
+        "saved_at": time.time(),
+    }
+    try:
+        with open(SAVE_RESUME_CORPUS, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    except OSError as e:
+        logger.warning(f"保存简历样本失败：{e}")
+
+
+async def is_qualified(client, resume_image_base64, resume_requirement, overview_text: str = "",
+                       card_text: str = ""):
+    result = await is_qualified_result(client, resume_image_base64, resume_requirement, overview_text, card_text)
     return result.is_qualified if result is not None else False
 
 
-def is_qualified_result(client, resume_image_base64, resume_requirement, overview_text: str = "") -> interviewer | None:
+async def is_qualified_result(client, resume_image_base64, resume_requirement, overview_text: str = "",
+                              card_text: str = "", on_verdict=None) -> interviewer | None:
     """Return the full interviewer object (includes reason_category). Returns None on failure."""
     if not resume_requirement:
         return None
-    return _call_llm(client, resume_image_base64, resume_requirement, overview_text)
+    # Only fresh model calls go to the corpus: a re-scan served from the cache would duplicate the line
+    answered_by = []
+    result = await _evaluate(client, resume_image_base64, resume_requirement, overview_text, card_text, on_verdict,
+                             answered_by.append)
+    if SAVE_RESUME_CORPUS and result is not None and answered_by:
+        _save_corpus_record(resume_image_base64, resume_requirement, overview_text, card_text, result,
+                            answered_by[-1])
+    return result
+
+
+async def is_qualified_early(client, resume_image_base64, resume_requirement, overview_text: str = "",
+                             card_text: str = "") -> tuple[interviewer | None, asyncio.Future]:
+    """Like is_qualified_result, but returns as soon as the verdict is known.
+
+    Returns (verdict, completion).  With LLM_STREAM=true the verdict arrives while
+    `reason` is still streaming (its reason is then empty); completion resolves to
+    the full interviewer once the response is finished, logged and cached, or to
+    the streamed verdict itself if the stream breaks after it.  Callers should
+    await completion before starting the next evaluation.
+    """
+    loop = asyncio.get_running_loop()
+    early = loop.create_future()
+
+    def on_verdict(is_qualified: bool, reason_category: str):
+        if not early.done():
+            early.set_result(interviewer(reason="", is_qualified=is_qualified, reason_category=reason_category))
+
+    completion = asyncio.ensure_future(is_qualified_result(
+        client, resume_image_base64, resume_requirement, overview_text, card_text, on_verdict
+    ))
+    await asyncio.wait({early, completion}, return_when=asyncio.FIRST_COMPLETED)
+    if early.done():
+        return early.result(), completion
+    return completion.result(), completion
+
+
+async def is_qualified_multi(client, resume_image_base64, requirements: dict[str, str],
+                             overview_text: str = "") -> dict[str, interviewer | None]:
+    """Evaluate one resume against several jobs ({job_title: cv_requirements}) in a single call.
+
+    The system prompt and resume image are sent once; the model returns one verdict
+    per job.  Returns {job_title: interviewer}, with None for jobs whose verdict is
+    missing or when the call fails.  A single job falls back to is_qualified_result.
+    """
+    jobs = [(title, req) for title, req in requirements.items() if req]
+    if not jobs:
+        return {title: None for title in requirements}
+    if len(jobs) == 1:
+        title, req = jobs[0]
+        return {t: None for t in requirements} | {
+            title: await is_qualified_result(client, resume_image_base64, req, overview_text)
+        }
+
+    user_text, candidate_text = _build_multi_user_text(jobs, overview_text)
+    instructions = system_message + multi_job_message
+    result = await _cached_call(
+        client,
+        _multi_key(resume_image_base64, overview_text, jobs),
+        lambda on_model: _call_llm(client, resume_image_base64, user_text, multi_interviewer, instructions,
+                                   candidate_text=candidate_text, on_model=on_model),
+        multi_interviewer,
+    )
+    return _verdicts_by_title(result, jobs, requirements)
+
+
+def _verdicts_by_title(result: BaseModel | None, jobs: list[tuple[str, str]],
+                       titles) -> dict[str, interviewer | None]:
+    """Map a single or multi-job result back to {job_title: interviewer | None}."""
+    verdicts = {title: None for title in titles}
+    if isinstance(result, interviewer):
+        verdicts[jobs[0][0]] = result
+    elif isinstance(result, multi_interviewer):
+        for v in result.verdicts:
+            if 1 <= v.job_id <= len(jobs):
+                verdicts[jobs[v.job_id - 1][0]] = interviewer(
+                    reason=v.reason, is_qualified=v.is_qualified, reason_category=v.reason_category
+                )
+    return verdicts
+
+
+LLM_BATCH_POLL_SECONDS = float(os.getenv("LLM_BATCH_POLL_SECONDS", "30"))
+_BATCH_DONE = ("completed", "failed", "expired", "cancelled")
+
+
+async def evaluate_batch(client, items: list) -> dict[str, dict[str, interviewer | None]]:
+    """Evaluate many resumes through one OpenAI Batch job on /v1/chat/completions.
+
+    items is a list of (custom_id, image_b64, {job_title: cv_requirements}, overview_text).
+    Candidates with several jobs get one multi-job request.  Verdicts already in the
+    cache are not resubmitted, and new ones are written back to it.  The LLM budgets
+    are checked once before submitting (a fallback model applies to the whole batch;
+    without one, nothing is submitted and the candidates stay unjudged).  Works with any
+    server implementing the Files and Batches endpoints (e.g. a local stand-in).
+    Returns {custom_id: {job_title: interviewer | None}}.
+    """
+    pool = as_pool(client)
+    models = list(dict.fromkeys(ep.model for ep in pool.endpoints))
+    results, plans, requests = {}, {}, []
+    for custom_id, image_b64, requirements, overview_text in items:
+        results[custom_id] = {title: None for title in requirements}
+        jobs = [(title, req) for title, req in requirements.items() if req]
+        if not jobs:
+            continue
+        if len(jobs) == 1:
+            key, fmt = _single_key(image_b64, overview_text, jobs[0][1]), interviewer
+            (user_text, candidate_text), instructions = _build_user_text(jobs[0][1], overview_text), system_message
+        else:
+            key, fmt = _multi_key(image_b64, overview_text, jobs), multi_interviewer
+            (user_text, candidate_text), instructions = (_build_multi_user_text(jobs, overview_text),
+                                                         system_message + multi_job_message)
+        if ENABLE_LLM_CACHE:
+            cached = verdict_cache.lookup(key, models, fmt)
+            if cached is not None:
+                verdict_cache.hits += 1
+                results[custom_id] = _verdicts_by_title(cached, jobs, requirements)
+                continue
+            verdict_cache.misses += 1
+        images = await image_utils.prepare_resume_image(image_b64)
+        plans[custom_id] = (jobs, fmt, requirements, key, images)
+        requests.append((custom_id, images, user_text, fmt, instructions, candidate_text))
+    if not requests:
+        return results
+
+    try:
+        batch_model = usage_utils.admit(pool.primary.model)
+    except BudgetExhausted as e:
+        logger.warning(f"{e}，跳过批量评估")
+        return results
+    lines = [json.dumps({
+        "custom_id": custom_id,
+        "method": "POST",
+        "url": "/v1/chat/completions",
+        "body": _chat_request(images, user_text, fmt, instructions, batch_model, candidate_text=candidate_text),
+    }, ensure_ascii=False) for custom_id, images, user_text, fmt, instructions, candidate_text in requests]
+
+    try:
+        client = pool.primary.client
+        input_file = await client.files.create(
+            file=("resume_batch.jsonl", "\n".join(lines).encode("utf-8")), purpose="batch"
+        )
+        batch = await client.batches.create(
+            input_file_id=input_file.id, endpoint="/v1/chat/completions", completion_window="24h"
+        )
+        logger.info(f"已提交批量评估 {batch.id}（{len(lines)} 条）")
+        while batch.status not in _BATCH_DONE:
+            await asyncio.sleep(LLM_BATCH_POLL_SECONDS)
+            batch = await client.batches.retrieve(batch.id)
+        if batch.status != "completed" or not batch.output_file_id:
+            logger.error(f"批量评估失败：{batch.id} 状态 {batch.status}")
+            return results
+        output = await client.files.content(batch.output_file_id)
+    except Exception as e:
+        logger.error(f"Error in LLM batch request: {e}")
+        return results
+
+    for line in output.text.splitlines():
+        try:
+            record = json.loads(line)
+            jobs, fmt, requirements, key, images = plans[record["custom_id"]]
+            _record_usage(record["response"]["body"], "chat", images)
+            msg = record["response"]["body"]["choices"][0]["message"]
+            parsed = _parse_content(msg.get("content") or msg.get("reasoning_content") or "", fmt)
+        except Exception as e:
+            logger.warning(f"批量评估结果解析失败：{e}")
+            continue
+        _log_result(parsed)
+        if ENABLE_LLM_CACHE:
+            verdict_cache.store(key, batch_model, parsed)
+        results[record["custom_id"]] = _verdicts_by_title(parsed, jobs, requirements)
+    return results
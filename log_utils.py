@@ -1,9 +1,10 @@
-import logging, os
+import contextvars, logging, os
 from tqdm import tqdm
 from dotenv import load_dotenv
 load_dotenv()
 
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+LOG_FILE = os.getenv("LOG_FILE", "boss_hire.log")  # orchestrator.py gives each worker its own
 
 logging.addLevelName(35, "LLM")
 def llm(self, message, *args, **kws):
@@ -23,20 +24,27 @@ class HttpSuccessFilter(logging.Filter):
             return False
         return True
 
+# tqdm row for the current task's progress bars; in multi-tab mode each tab's
+# task sets its own so the bars stack instead of overwriting each other.
+tqdm_position = contextvars.ContextVar("tqdm_position", default=None)
+
+
 class TqdmLoggingHandler(logging.Handler):
     def __init__(self, level=logging.NOTSET):
         super().__init__(level)
-        self._tqdm_instance = None
+        # Per task, like tqdm_position: each tab's loop sets and clears only its own bar
+        self._tqdm_instance = contextvars.ContextVar("tqdm_instance", default=None)
 
     def set_tqdm(self, tqdm_instance):
-        self._tqdm_instance = tqdm_instance
+        self._tqdm_instance.set(tqdm_instance)
 
     def emit(self, record):
         try:
             msg = self.format(record)
             # 如果有活跃的tqdm实例，使用其write方法
-            if self._tqdm_instance is not None:
-                self._tqdm_instance.write(msg)
+            tqdm_instance = self._tqdm_instance.get()
+            if tqdm_instance is not None:
+                tqdm_instance.write(msg)
             else:
                 tqdm.write(msg)
             self.flush()
@@ -70,7 +78,7 @@ tqdm_handler.setFormatter(console_formatter)
 logger.addHandler(tqdm_handler)
 
 # 添加FileHandler用于文件输出
-file_handler = logging.FileHandler('boss_hire.log', encoding='utf-8')
+file_handler = logging.FileHandler(LOG_FILE, encoding='utf-8')
 file_handler.setLevel(logging.WARNING)
 file_formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
 file_handler.setFormatter(file_formatter)
@@ -1,10 +1,9 @@
-import os, argparse, asyncio, glob, subprocess
+import os, argparse, asyncio, sys, time
 import commentjson as json
 from random import gauss
-from openai import OpenAI
 
-import zendriver as zd
-import driver_utils, llm_utils, job_utils, log_utils, wakelock_utils
+import driver_utils, llm_utils, job_utils, log_utils, wakelock_utils, image_utils, usage_utils, resume_utils
+import browser_utils
 
 # from packaging import version
 from dotenv import load_dotenv
@@ -18,11 +17,17 @@ OPENAI_BASE_URL = os.getenv('OPENAI_BASE_URL')
 ENABLE_GREETINGS_LOOP = os.getenv('DISABLE_GREETINGS_LOOP', 'false').lower() != 'true'
 ENABLE_RECOMMEND_LOOP = os.getenv('DISABLE_RECOMMEND_LOOP', 'false').lower() != 'true'
 
-# Initialize OpenAI client with timeout
-if OPENAI_BASE_URL:
-    client = OpenAI(api_key=OPENAI_API_KEY, base_url=OPENAI_BASE_URL, timeout=60.0)
-else:
-    client = OpenAI(api_key=OPENAI_API_KEY, timeout=60.0)
+# Exit codes understood by orchestrator.py (anything else non-zero counts as a crash)
+EXIT_CAPTCHA = 3
+EXIT_PROFILE_LOCKED = 4
+
+# Multi-tab mode: TABS > 1 services 新招呼 in the main tab while TABS - 1 extra
+# windows run the 推荐牛人 sweeps (see run_jobs_concurrent).
+TABS = max(int(os.getenv('TABS', '1')), 1)
+GREETINGS_POLL_INTERVAL = float(os.getenv('GREETINGS_POLL_INTERVAL', '300'))
+
+# Initialize the LLM backend pool (async clients with pooled keep-alive connections)
+client = llm_utils.create_pool(OPENAI_API_KEY, OPENAI_BASE_URL, timeout=60.0)
 
 
 # Global variable to store job statistics
@@ -30,6 +35,7 @@ job_stats = {}
 
 def log_final_stats():
     """Function to log final statistics when program exits"""
+    usage_utils.merge_into(job_stats)
     log_utils.logger.llm("职位处理统计：")
     for job_title, stats in job_stats.items():
         parts = []
@@ -39,106 +45,211 @@ def log_final_stats():
             parts.append(f"打招呼人数 {stats['greeted']}")
         if 'requested' in stats:
             parts.append(f"求简历人数 {stats['requested']}")
+        if 'llm_tokens' in stats:
+            parts.append(f"LLM {stats['llm_calls']} 次 / {stats['llm_tokens']} tokens / ${stats['llm_cost']:.4f}")
         log_utils.logger.llm(f"职位 {job_title}：{'，'.join(parts)}")
+    llm_utils.log_stats()
+    usage_utils.log_stats()
+    image_utils.log_stats()
+    resume_utils.log_stats()
+    driver_utils.log_stats()
 
 
-def get_params():
+def parse_args():
     parser = argparse.ArgumentParser(description='根据职位要求筛选简历')
     parser.add_argument('-c', dest='config')
-    args = parser.parse_args()
-    if args.config:
-        config = json.load(open(args.config))
-        # If not a list, convert to list for consistent processing
-        return [config] if not isinstance(config, list) else config
+    parser.add_argument('--profile', default=browser_utils.DEFAULT_PROFILE_DIR, help='Chrome 用户数据目录（每个账号一个）')
+    parser.add_argument('--stats-out', help='退出时将统计写入 JSON 文件')
+    return parser.parse_args()
+
+
+def get_params(config_path=None):
+    config = json.load(open(config_path or "params.json"))
+    # If not a list, convert to list for consistent processing
+    return [config] if not isinstance(config, list) else config
+
+
+def write_stats(path):
+    """Dump job_stats and the run's LLM usage for orchestrator.py to aggregate."""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'jobs': job_stats, 'llm': usage_utils.run_totals}, f, ensure_ascii=False, indent=2)
+
+
+async def process_greetings(tab, job_configs):
+    """One pass over the unread 新招呼 list (phase 1)."""
+    greeting_count = await driver_utils.goto_new_greetings(tab)
+    if greeting_count > 0:
+        await job_utils.loop_greetings(tab, job_configs, client, job_stats, total=greeting_count)
     else:
-        config = json.load(open("params.json"))
-        # If not a list, convert to list for consistent processing
-        return [config] if not isinstance(config, list) else config
-
-def clear_chrome_locks():
-    subprocess.run(["pkill", "-9", "-f", "chrome_user_data"], capture_output=True)
-    patterns = [
-        '/tmp/chrome_user_data/Singleton*',
-        '/tmp/chrome_user_data/Default/Lock',
-        '/tmp/chrome_user_data/Default/LOCK',
-    ]
-    for pattern in patterns:
-        for f in glob.glob(pattern):
-            try:
-                os.remove(f)
-            except FileNotFoundError:
-                pass
+        log_utils.logger.info("新招呼为空，跳过。")
+    await driver_utils.close_popover(tab)
+
+
+async def recommend_jobs(tab, jobs):
+    """Phase 2 (推荐牛人) for each job config taken from jobs.
 
-async def launch_browser(url):
-    clear_chrome_locks()
-    await asyncio.sleep(max(1 + gauss(0, 0.25), 0.3))
-    browser = await zd.start(
-        headless=False,
-        user_data_dir='/tmp/chrome_user_data',
-        browser_args=[
-            '--disable-dev-shm-usage',
-            '--disable-notifications',
-            '--window-size=1920,1080',
-        ],
-        browser_connection_timeout=1.0,
-        browser_connection_max_tries=15,
-    )
-    tab = await browser.get(url)
+    jobs may be an iterator shared by several tabs, which then split the jobs
+    between them as each one becomes free.
+    """
+    await driver_utils.goto_recommend(tab)
+    for params in jobs:
+        job_title = params['job_title']
+        max_idx = params.get('max_idx', 120)
+        log_utils.logger.info(f"开始处理职位：{job_title}")
+
+        # close popover
+        await driver_utils.close_popover(tab)
+
+        # Select specific job position
+        await driver_utils.select_job_position(tab, job_title)
+
+        # Get job requirements
+        job_requirements = job_utils.get_job_requirements(params['job_requirements'])
+
+        # Scan recommend loop for this specific job
+        viewed, greeted = await job_utils.loop_recommend(tab, max_idx, job_requirements, client, job_stats, job_title)
+
+        # 记录每个职位的统计信息（原地更新，保留新招呼阶段写入的 requested）
+        job_stats.setdefault(job_title, {}).update(viewed=viewed, greeted=greeted)
+
+
+async def run_jobs(tab, job_configs):
+    """Phase 1 (新招呼) and phase 2 (推荐牛人) on an already logged-in tab."""
+    # Phase 1: inbound greeting candidates (新招呼)
+    if ENABLE_GREETINGS_LOOP:
+        await process_greetings(tab, job_configs)
+    else:
+        log_utils.logger.info("新招呼处理已禁用（DISABLE_GREETINGS_LOOP=true）。")
+
+    # Phase 2: outbound recommendation screening (推荐牛人)
+    if not ENABLE_RECOMMEND_LOOP:
+        log_utils.logger.info("推荐牛人处理已禁用（DISABLE_RECOMMEND_LOOP=true）。")
+        return
+    await recommend_jobs(tab, job_configs)
+
+    # Harvest mode: bulk-evaluate the captured resumes, then greet by identity
+    if job_utils.RECOMMEND_MODE == 'harvest':
+        await job_utils.evaluate_harvest(client, job_configs)
+        await job_utils.greet_harvested(tab, job_configs, job_stats)
+
+
+async def open_worker_tab(browser, url):
+    """A new window for a concurrent phase, with the lean profile applied before it loads."""
+    worker = await browser.get('about:blank', new_window=True)
+    await browser_utils.apply(worker)
+    await driver_utils.navigate(worker, url)
     await asyncio.sleep(max(2 + gauss(0, 0.5), 0.6))
-    return browser, tab
+    return worker
 
 
-async def main():
-    # Get all job configurations
-    job_configs = get_params()
+async def run_jobs_concurrent(browser, tab, job_configs):
+    """Multi-tab mode (TABS > 1): the phases of run_jobs, overlapped.
 
-    # Launch browser once
-    browser, tab = await launch_browser(job_configs[0]['url'])
-    await driver_utils.log_in(tab)
-    await driver_utils.close_popover(tab)
+    tab keeps servicing 新招呼, re-polling every GREETINGS_POLL_INTERVAL seconds,
+    while up to TABS - 1 extra windows sweep 推荐牛人, each taking the next job
+    config when it finishes one.  Clicks, navigations and scrolls from all tabs
+    share one pacing budget (driver_utils.ACTION_MIN_INTERVAL).  The first tab to
+    fail (CAPTCHA, timeout, LLM budget) cancels the others and its exception is
+    re-raised.
+    """
+    driver_utils.enable_shared_pacing()
+    jobs = iter(job_configs)
+    sweeps_done = asyncio.Event()
 
+    async def greetings_worker():
+        log_utils.tqdm_position.set(0)
+        while True:
+            await process_greetings(tab, job_configs)
+            try:
+                await asyncio.wait_for(sweeps_done.wait(), GREETINGS_POLL_INTERVAL)
+                return
+            except TimeoutError:
+                pass
+
+    async def recommend_worker(n):
+        log_utils.tqdm_position.set(n)
+        worker = await open_worker_tab(browser, f'{driver_utils.BOSS_BASE_URL}/web/chat/index')
+        try:
+            await recommend_jobs(worker, jobs)
+        finally:
+            try:
+                await worker.close()
+            except Exception:
+                pass
+
+    n_sweepers = min(TABS - 1, len(job_configs)) if ENABLE_RECOMMEND_LOOP else 0
+    sweepers = [asyncio.create_task(recommend_worker(n)) for n in range(1, n_sweepers + 1)]
+    pending = set(sweepers)
+    if not sweepers:
+        sweeps_done.set()  # 新招呼 only: a single pass
+    if ENABLE_GREETINGS_LOOP:
+        pending.add(asyncio.create_task(greetings_worker()))
+    log_utils.logger.info(f"多标签页模式：新招呼 {'开启' if ENABLE_GREETINGS_LOOP else '关闭'}，"
+                          f"推荐牛人 {n_sweepers} 个标签页，共 {len(job_configs)} 个职位")
     try:
-        # Process each job configuration with WakeLock to prevent system sleep
-        with wakelock_utils.WakeLock():
-            # Phase 1: inbound greeting candidates (新招呼)
-            if ENABLE_GREETINGS_LOOP:
-                greeting_count = await driver_utils.goto_new_greetings(tab)
-                if greeting_count > 0:
-                    await job_utils.loop_greetings(tab, job_configs, client, job_stats, total=greeting_count)
-                else:
-                    log_utils.logger.info("新招呼为空，跳过。")
-                await driver_utils.close_popover(tab)
-            else:
-                log_utils.logger.info("新招呼处理已禁用（DISABLE_GREETINGS_LOOP=true）。")
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if not task.cancelled() and task.exception() is not None:
+                    raise task.exception()
+            if all(task.done() for task in sweepers):
+                sweeps_done.set()
+    finally:
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    if n_sweepers and job_utils.RECOMMEND_MODE == 'harvest':
+        await job_utils.evaluate_harvest(client, job_configs)
+        await driver_utils.goto_recommend(tab)
+        await job_utils.greet_harvested(tab, job_configs, job_stats)
 
-            # Phase 2: outbound recommendation screening (推荐牛人)
-            if not ENABLE_RECOMMEND_LOOP:
-                log_utils.logger.info("推荐牛人处理已禁用（DISABLE_RECOMMEND_LOOP=true）。")
-                return
-            await driver_utils.goto_recommend(tab)
-            for params in job_configs:
-                job_title = params['job_title']
-                max_idx = params.get('max_idx', 120)
-                log_utils.logger.info(f"开始处理职位：{job_title}")
 
-                # close popover
-                await driver_utils.close_popover(tab)
+async def main():
+    args = parse_args()
+    # Get all job configurations
+    job_configs = get_params(args.config)
 
-                # Select specific job position
-                await driver_utils.select_job_position(tab, job_title)
+    # One run per profile at a time, whether it launches Chrome or attaches to a daemon's
+    run_lock = browser_utils.lock_profile(args.profile, browser_utils.RUN_LOCK)
+    if run_lock is None:
+        log_utils.logger.error(f"浏览器配置目录 {args.profile} 已有另一个运行中的任务，退出。")
+        return EXIT_PROFILE_LOCKED
 
-                # Get job requirements
-                job_requirements = job_utils.get_job_requirements(params['job_requirements'])
+    # A daemon (daemon.py) already holds a logged-in browser on this profile: attach to it
+    endpoint = browser_utils.read_endpoint(args.profile)
+    profile_lock = None
+    if endpoint:
+        browser, tab = await browser_utils.attach(endpoint)
+        log_utils.logger.info(f"已连接常驻浏览器 {endpoint['host']}:{endpoint['port']}，跳过启动与登录。")
+    else:
+        profile_lock = browser_utils.lock_profile(args.profile)
+        if profile_lock is None:
+            log_utils.logger.error(f"浏览器配置目录 {args.profile} 正被另一个进程使用，退出。")
+            run_lock.close()
+            return EXIT_PROFILE_LOCKED
+        # Launch browser once
+        browser, tab = await browser_utils.launch_browser(job_configs[0]['url'], args.profile)
+    exit_code = 0
 
-                # Scan recommend loop for this specific job
-                viewed, greeted = await job_utils.loop_recommend(tab, max_idx, job_requirements, client, job_stats, job_title)
+    try:
+        if endpoint is None:
+            await driver_utils.log_in(tab)
+        elif not await driver_utils.is_logged_in(tab):
+            log_utils.logger.warning("常驻浏览器会话未登录，重新登录。")
+            await driver_utils.log_in(tab)
+        await driver_utils.close_popover(tab)
+        driver_utils.timing_stats['ready'] = time.monotonic()
+        await browser_utils.report_page_metrics(tab, '登录后', args.profile)
 
-                # 记录每个职位的统计信息
-                job_stats[job_title] = {
-                    'viewed': viewed,
-                    'greeted': greeted
-                }
+        # Process each job configuration with WakeLock to prevent system sleep
+        with wakelock_utils.WakeLock():
+            if TABS > 1:
+                await run_jobs_concurrent(browser, tab, job_configs)
+            else:
+                await run_jobs(tab, job_configs)
     except driver_utils.CaptchaRequired:
+        exit_code = EXIT_CAPTCHA
         log_utils.logger.error(
             "检测到滑块验证页面，程序已暂停。请在浏览器中完成验证，完成后按 Enter 键退出，重新运行程序即可继续。"
         )
@@ -148,12 +259,28 @@ async def main():
             pass
     except TimeoutError as e:
         log_utils.logger.warning(f"服务器无响应，终止处理：{e}")
+    except llm_utils.BudgetExhausted as e:
+        log_utils.logger.warning(f"LLM {e}，停止处理。")
     except (KeyboardInterrupt, asyncio.CancelledError):
         pass
     finally:
         log_final_stats()
-        await browser.stop()
+        if args.stats_out:
+            write_stats(args.stats_out)
+        try:
+            await browser_utils.report_page_metrics(tab, '退出前', args.profile)
+        except Exception:
+            pass
+        await client.close()
+        image_utils.shutdown()
+        if profile_lock is None:
+            await browser_utils.detach(browser)  # leave the daemon's browser running
+        else:
+            await browser.stop()
+            profile_lock.close()
+        run_lock.close()
+    return exit_code
 
 
 if __name__ == '__main__':
-    asyncio.run(main())
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,184 @@
+"""
+Drive several BOSS accounts from one host: one supervised main.py worker per account.
+
+Each account gets its own Chrome profile (locked by the worker, and only that
+profile's leftover Chrome is killed on start), its own job config, log file, LLM
+usage file, harvest queue (RECOMMEND_MODE=harvest) and resume corpus.  accounts.json:
+
+    [
+      {"name": "hr-a", "config": "params_a.json"},
+      {"name": "hr-b", "config": "params_b.json", "profile": "/data/boss/hr-b", "env": {"TABS": "2"}}
+    ]
+
+    python orchestrator.py accounts.json --stats-out runs/total.json
+
+Workers start --stagger seconds apart so logins do not coincide.  A worker that
+crashes is restarted up to --max-restarts times with a growing delay; one that
+stopped on a CAPTCHA (or found its profile in use) is not, as that needs a
+person.  When every worker is done, their job stats and LLM usage are summed per
+account and overall.
+"""
+import argparse, asyncio, json, os, signal, subprocess, sys
+from random import gauss
+
+os.environ.setdefault('LOG_FILE', 'orchestrator.log')
+from log_utils import logger
+
+MAIN = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'main.py')
+
+# Keep in sync with main.EXIT_CAPTCHA / main.EXIT_PROFILE_LOCKED
+EXIT_CAPTCHA = 3
+EXIT_PROFILE_LOCKED = 4
+STOP_TIMEOUT = 60  # seconds a worker gets to log its stats and close Chrome after SIGINT
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='在同一台机器上为多个账号并行运行 main.py')
+    parser.add_argument('accounts', help='账号列表 JSON 文件')
+    parser.add_argument('--workdir', default='runs', help='日志与统计文件目录')
+    parser.add_argument('--profile-root', default='/tmp/boss_profiles', help='未指定 profile 的账号的配置目录根')
+    parser.add_argument('--stagger', type=float, default=30.0, help='相邻账号启动间隔（秒）')
+    parser.add_argument('--max-restarts', type=int, default=3, help='每个账号崩溃后的最大重启次数')
+    parser.add_argument('--restart-delay', type=float, default=60.0, help='重启延迟（秒，按次数递增）')
+    parser.add_argument('--stats-out', help='将汇总统计写入 JSON 文件')
+    return parser.parse_args()
+
+
+def _add(into: dict, stats: dict):
+    """Sum the numeric fields of stats into `into`, key by key."""
+    for key, value in stats.items():
+        if isinstance(value, dict):
+            _add(into.setdefault(key, {}), value)
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            into[key] = into.get(key, 0) + value
+
+
+async def _stop(proc):
+    """Ask a worker to finish (SIGINT, as Ctrl-C would) and kill it if it does not."""
+    if proc.returncode is not None:
+        return
+    proc.send_signal(signal.SIGINT)
+    try:
+        await asyncio.wait_for(proc.wait(), STOP_TIMEOUT)
+    except TimeoutError:
+        proc.kill()
+        await proc.wait()
+
+
+async def supervise(account: dict, delay: float, args) -> dict:
+    """Run one account's worker until it finishes, restarting it after crashes."""
+    name = account['name']
+    profile = account.get('profile') or os.path.join(args.profile_root, name)
+    stats_path = os.path.join(args.workdir, f'{name}.stats.json')
+    # Files a worker rewrites or appends to are per account; the verdict cache (SQLite) is shared
+    own = dict(
+        LOG_FILE=os.path.join(args.workdir, f'{name}.log'),
+        LLM_USAGE_PATH=os.path.join(args.workdir, f'{name}.usage.json'),
+        HARVEST_DIR=os.path.join(args.workdir, name, 'harvest'),
+    )
+    if os.getenv('SAVE_RESUME_CORPUS'):
+        own['SAVE_RESUME_CORPUS'] = os.path.join(args.workdir, f'{name}.corpus.jsonl')
+    env = {**os.environ, **own, **{k: str(v) for k, v in account.get('env', {}).items()}}
+    cmd = [sys.executable, MAIN, '--profile', profile, '--stats-out', stats_path]
+    if account.get('config'):
+        cmd += ['-c', account['config']]
+    result = {'runs': 0, 'restarts': 0, 'exit': None, 'jobs': {}, 'llm': {}}
+
+    await asyncio.sleep(delay)
+    while True:
+        if os.path.exists(stats_path):
+            os.remove(stats_path)
+        with open(os.path.join(args.workdir, f'{name}.out'), 'ab') as out:
+            # Own session: a Ctrl-C in the terminal reaches only the orchestrator, which then
+            # stops each worker once, instead of every worker seeing the signal mid-shutdown
+            proc = await asyncio.create_subprocess_exec(
+                *cmd, stdin=subprocess.DEVNULL, stdout=out, stderr=subprocess.STDOUT, env=env,
+                start_new_session=True,
+            )
+            logger.info(f"[{name}] 已启动（pid {proc.pid}，配置目录 {profile}）")
+            try:
+                code = await proc.wait()
+            finally:
+                await asyncio.shield(_stop(proc))
+        result['runs'] += 1
+        result['exit'] = code
+        if os.path.exists(stats_path):
+            with open(stats_path, encoding='utf-8') as f:
+                run_stats = json.load(f)
+            _add(result['jobs'], run_stats.get('jobs', {}))
+            _add(result['llm'], run_stats.get('llm', {}))
+
+        if code == 0:
+            logger.info(f"[{name}] 已完成。")
+        elif code == EXIT_CAPTCHA:
+            logger.error(f"[{name}] 遇到滑块验证，已停止；请人工完成验证后重新运行该账号。")
+        elif code == EXIT_PROFILE_LOCKED:
+            logger.error(f"[{name}] 配置目录 {profile} 正被其他进程使用，未启动。")
+        elif result['restarts'] < args.max_restarts:
+            result['restarts'] += 1
+            wait = args.restart_delay * result['restarts']
+            logger.warning(f"[{name}] 异常退出（退出码 {code}），{wait:.0f}s 后第 {result['restarts']} 次重启。")
+            await asyncio.sleep(wait)
+            continue
+        else:
+            logger.error(f"[{name}] 异常退出（退出码 {code}），已达最大重启次数。")
+        return result
+
+
+def log_summary(results: dict) -> dict:
+    """Log per-account and overall job stats; returns the overall totals."""
+    totals = {'jobs': {}, 'llm': {}}
+    for name, result in results.items():
+        _add(totals['jobs'], result['jobs'])
+        _add(totals['llm'], result['llm'])
+        jobs = result['jobs']
+        logger.llm(
+            f"账号 {name}：运行 {result['runs']} 次（重启 {result['restarts']}，退出码 {result['exit']}），"
+            f"简历查看 {sum(j.get('viewed', 0) for j in jobs.values())}，"
+            f"打招呼 {sum(j.get('greeted', 0) for j in jobs.values())}，"
+            f"求简历 {sum(j.get('requested', 0) for j in jobs.values())}，"
+            f"LLM 费用 ${result['llm'].get('cost', 0):.4f}"
+        )
+    for job_title, stats in totals['jobs'].items():
+        logger.llm(f"职位 {job_title}（全部账号）：简历查看 {stats.get('viewed', 0)}，打招呼 {stats.get('greeted', 0)}，"
+                   f"求简历 {stats.get('requested', 0)}")
+    llm = totals['llm']
+    if llm.get('calls'):
+        logger.llm(f"LLM 用量（全部账号）：{llm['calls']} 次调用，"
+                   f"{llm.get('input', 0) + llm.get('output', 0)} tokens，费用 ${llm.get('cost', 0):.4f}")
+    return totals
+
+
+async def run(args):
+    with open(args.accounts, encoding='utf-8') as f:
+        accounts = json.load(f)
+    names = [a['name'] for a in accounts]
+    if len(set(names)) != len(names):
+        raise SystemExit('账号名称重复')
+    os.makedirs(args.workdir, exist_ok=True)
+
+    asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+    tasks = [
+        asyncio.create_task(supervise(account, max(i * args.stagger + gauss(0, args.stagger * 0.1), 0), args))
+        for i, account in enumerate(accounts)
+    ]
+    try:
+        done = await asyncio.gather(*tasks)
+    except asyncio.CancelledError:
+        logger.warning("收到停止信号，正在停止所有账号……")
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        return
+    results = dict(zip(names, done))
+    totals = log_summary(results)
+    if args.stats_out:
+        with open(args.stats_out, 'w', encoding='utf-8') as f:
+            json.dump({'accounts': results, **totals}, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    try:
+        asyncio.run(run(parse_args()))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,158 @@
+"""
+Resume capture settings and counters: canvas encoding and network text.
+
+The canvas screenshot is encoded inside the c-resume frame (CAPTURE_FORMAT,
+CAPTURE_QUALITY, CAPTURE_MAX_WIDTH, CAPTURE_DPR_SCALE) and fetched over CDP in
+chunks of CAPTURE_CHUNK_CHARS, so a tall resume never has to travel as one
+multi-megabyte full-resolution PNG string.
+
+Structured resume text comes from the c-resume frame's own data requests.
+
+The c-resume frame downloads the resume as JSON (XHR/fetch) and only then draws
+it onto canvas#resume.  With RESUME_CAPTURE=network, driver_utils records those
+response bodies through the CDP Network domain and this module turns them into
+plain text (expectations, work history, projects, education) for a text-only
+evaluation.  The field names are matched loosely because the payload layout is
+not documented; payloads that yield too little text (e.g. encrypted ones) are
+rejected and the caller falls back to the canvas screenshot.
+"""
+import json
+import os
+import re
+from dotenv import load_dotenv
+from log_utils import logger
+load_dotenv()
+
+RESUME_CAPTURE = os.getenv("RESUME_CAPTURE", "canvas").lower()   # canvas | network
+# Captured text shorter than this is treated as unusable (canvas fallback).
+RESUME_TEXT_MIN_CHARS = int(os.getenv("RESUME_TEXT_MIN_CHARS", "80"))
+
+stats = {"network": 0, "canvas": 0, "payloads": 0, "rejected": 0}
+
+CAPTURE_FORMAT = os.getenv("CAPTURE_FORMAT", "png").lower()      # png | jpeg | webp
+CAPTURE_QUALITY = float(os.getenv("CAPTURE_QUALITY", "0.85"))      # jpeg/webp only
+CAPTURE_MAX_WIDTH = int(os.getenv("CAPTURE_MAX_WIDTH", "0"))       # downscale wider canvases (0 = off)
+CAPTURE_DPR_SCALE = os.getenv("CAPTURE_DPR_SCALE", "false").lower() == "true"  # HiDPI canvas -> CSS pixels
+CAPTURE_CHUNK_CHARS = int(os.getenv("CAPTURE_CHUNK_CHARS", "1048576"))
+# Also time a full-resolution toDataURL('image/png') in the page (not transferred) to report savings.
+CAPTURE_MEASURE_BASELINE = os.getenv("CAPTURE_MEASURE_BASELINE", "false").lower() == "true"
+CAPTURE_MIME = {"png": "image/png", "jpeg": "image/jpeg", "jpg": "image/jpeg", "webp": "image/webp"}.get(
+    CAPTURE_FORMAT, "image/png")
+
+canvas_stats = {"captures": 0, "bytes": 0, "seconds": 0.0, "encode_ms": 0.0, "chunks": 0,
+                "baselines": 0, "baseline_bytes": 0, "baseline_ms": 0.0}
+
+# (section pattern on the list's key, heading); first match wins.
+_SECTIONS = [
+    (re.compile(r"expect", re.I), "求职期望"),
+    (re.compile(r"work.*(exp|list)|job.*exp|career", re.I), "工作经历"),
+    (re.compile(r"project", re.I), "项目经历"),
+    (re.compile(r"edu", re.I), "教育经历"),
+    (re.compile(r"cert|skill|language", re.I), "资格证书与技能"),
+]
+# Scalar fields worth keeping, in display order; everything else in a section
+# item is appended afterwards unless it looks like an id, URL or flag.
+_PREFERRED = [
+    "name", "geekname", "agedesc", "age", "gender", "workyeardesc", "workyears", "period", "company",
+    "companyname", "school", "major", "degreecategory", "degreename", "degree", "applystatusdesc",
+    "applystatus", "positionname", "position", "rolename", "industryname", "locationname", "city",
+    "salarydesc", "salary", "responsibility", "workcontent", "performance", "description", "projectdescription",
+]
+_SKIP = re.compile(r"(?i:id|url|token|icon|avatar|logo|type|flag|code)$|^(?i:encrypt)|^is[A-Z]")
+_ADVANTAGE = re.compile(r"advantage|userdesc|geekdesc|selfdesc|summary", re.I)
+
+
+def _scalars(item: dict) -> list[str]:
+    values = {k.lower(): v for k, v in item.items()
+              if isinstance(v, (str, int, float)) and not isinstance(v, bool) and str(v).strip()
+              and not _SKIP.search(k) and not _ADVANTAGE.search(k)}
+    start = values.pop("startdate", None) or values.pop("startdatedesc", None)
+    end = values.pop("enddate", None) or values.pop("enddatedesc", None)
+    if start or end:
+        values["period"] = f"{start or ''}-{end or '至今'}"
+    ordered = [values.pop(k) for k in _PREFERRED if k in values]
+    return [str(v).strip() for v in ordered + list(values.values())]
+
+
+def _collect(node, out: dict, advantage: list, base: list, depth: int = 0):
+    if depth > 8:
+        return
+    if isinstance(node, dict):
+        for key, value in node.items():
+            if isinstance(value, list) and value and all(isinstance(v, dict) for v in value):
+                heading = next((h for p, h in _SECTIONS if p.search(key)), None)
+                if heading:
+                    out.setdefault(heading, []).extend(" ".join(_scalars(v)) for v in value)
+                    continue
+            if isinstance(value, str) and _ADVANTAGE.search(key) and len(value) > 10:
+                advantage.append(value.strip())
+            elif isinstance(value, dict) and re.search(r"base.?info|geek.?info|user.?info", key, re.I):
+                base.append(" ".join(_scalars(value)))
+                _collect(value, out, advantage, base, depth + 1)
+            elif isinstance(value, (dict, list)):
+                _collect(value, out, advantage, base, depth + 1)
+    elif isinstance(node, list):
+        for value in node:
+            _collect(value, out, advantage, base, depth + 1)
+
+
+def payload_to_text(payload) -> str:
+    """Render one resume JSON payload (dict or JSON string) as plain text; '' if unusable."""
+    if isinstance(payload, str):
+        try:
+            payload = json.loads(payload)
+        except ValueError:
+            return ""
+    sections, advantage, base = {}, [], []
+    _collect(payload, sections, advantage, base)
+    lines = []
+    if base:
+        lines.append("基本信息：" + "；".join(b for b in base if b))
+    if advantage:
+        lines.append("个人优势：" + "\n".join(dict.fromkeys(advantage)))
+    for _, heading in _SECTIONS:
+        items = [i for i in sections.get(heading, []) if i]
+        if items:
+            lines.append(f"{heading}：")
+            lines.extend(f"- {i}" for i in items)
+    text = "\n".join(lines)
+    return text if len(text) >= RESUME_TEXT_MIN_CHARS else ""
+
+
+def best_text(payloads: list) -> str:
+    """The richest text among the payloads one c-resume frame downloaded."""
+    return max((payload_to_text(p) for p in payloads), key=len, default="")
+
+
+def combine(resume_text: str, overview_text: str) -> str:
+    """Merge captured resume text with the 经历概览 sidebar for the text-only evaluation."""
+    if not resume_text:
+        return overview_text
+    if not overview_text:
+        return f"在线简历:\n{resume_text}"
+    return f"在线简历:\n{resume_text}\n\n经历概览:\n{overview_text}"
+
+
+def log_stats():
+    """Log canvas capture cost and, in network mode, how many resumes skipped the canvas."""
+    cs = canvas_stats
+    if cs["captures"]:
+        n = cs["captures"]
+        line = (f"简历截图（{CAPTURE_MIME}）：{n} 份，平均 {cs['bytes'] / n / 1024:.0f}KB，"
+                f"耗时 {cs['seconds'] / n * 1000:.0f}ms（页面内编码 {cs['encode_ms'] / n:.0f}ms，{cs['chunks']} 个分块）")
+        if cs["baselines"]:
+            b = cs["baselines"]
+            transfer = cs["seconds"] - cs["encode_ms"] / 1000
+            rate = cs["bytes"] / transfer if transfer > 0 else 0.0
+            baseline_seconds = cs["baseline_ms"] / 1000 + (cs["baseline_bytes"] / rate if rate else 0.0)
+            line += (f"；全尺寸 PNG 基线 平均 {cs['baseline_bytes'] / b / 1024:.0f}KB，"
+                     f"估计每份节省 {(cs['baseline_bytes'] - cs['bytes']) / b / 1024:.0f}KB / "
+                     f"{(baseline_seconds - cs['seconds']) / b * 1000:.0f}ms")
+        logger.llm(line)
+    if RESUME_CAPTURE != "network" or not (stats["network"] or stats["canvas"]):
+        return
+    total = stats["network"] + stats["canvas"]
+    logger.llm(
+        f"简历采集：网络数据 {stats['network']} 份（{stats['network'] / total * 100:.0f}%，纯文本评估），"
+        f"回退截图 {stats['canvas']} 份；捕获响应 {stats['payloads']} 个，无法解析 {stats['rejected']} 份"
+    )
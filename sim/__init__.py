@@ -0,0 +1,12 @@
+"""
+Local fixtures for offline end-to-end benchmarks (see bench_e2e.py).
+
+boss_site - a small HTTP server reproducing the recruiter-site DOM that
+            driver_utils targets (login, 新招呼 list, recommendFrame, c-resume
+            canvas, reason dialog, quota dialog, CAPTCHA redirect).
+mock_llm  - an OpenAI-compatible server (chat completions, streaming, files,
+            batches) with configurable latency.
+
+Both run in-process (make_server, then serve_forever on a thread) or standalone
+(python -m sim.boss_site / python -m sim.mock_llm).
+"""
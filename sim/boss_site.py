@@ -0,0 +1,592 @@
+"""
+Simulated recruiter site for offline benchmarks.
+
+Serves just enough of the real site for driver_utils / job_utils to run end to
+end: the QR login page, the chat page with the 新招呼 list, conversation panel,
+在线简历 dialog and 不合适 reason list, the recommendFrame with an infinitely
+scrolling #recommend-list, c-resume frames that fetch the resume as JSON and
+draw it onto canvas#resume, the daily-quota dialog and the CAPTCHA redirect.  Candidates are
+generated deterministically from a seed; server-side counters (GET /api/stats)
+record what the client actually did.
+
+    python -m sim.boss_site --port 8800 --jobs 礼品福利销售经理 --greetings 10
+"""
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, quote, urlparse
+
+REASONS = ["薪资不符", "学历不符", "年龄不符", "期望不符", "距离太远",
+           "过往经历不符", "简历不真实", "已找到工作", "其他原因"]
+_SURNAMES = "王李张刘陈杨黄赵吴周徐孙马朱胡郭何高林罗"
+_GIVEN = ["伟", "芳", "娜", "敏", "静", "磊", "洋", "勇", "艳", "杰", "娟", "涛", "明", "超", "霞", "平"]
+_EDUCATION = ["高中", "大专", "本科", "本科", "硕士"]
+_STATUS = ["离职-随时到岗", "离职-随时到岗", "在职-月内到岗", "在职-考虑机会"]
+_CITIES = ["北京", "上海", "广州", "深圳", "杭州"]
+_FILLER = ["客户开发", "渠道拓展", "大客户维护", "方案销售", "团队管理", "电话销售"]
+
+
+def make_candidate(seed: int, job: dict, index: int) -> dict:
+    """Deterministic candidate #index for job ({'title', 'keywords'})."""
+    rng = random.Random(f"{seed}:{job['title']}:{index}")
+    gid = hashlib.sha1(f"{seed}:{job['title']}:{index}".encode()).hexdigest()[:12]
+    name = rng.choice(_SURNAMES) + rng.choice(_GIVEN) + rng.choice(["", rng.choice(_GIVEN)])
+    age = rng.randint(21, 45)
+    years = min(max(age - 22, 0), rng.randint(0, 15))
+    education = rng.choice(_EDUCATION)
+    low = rng.choice([3, 4, 5, 6, 8, 10])
+    salary = "面议" if rng.random() < 0.1 else f"{low}-{low + rng.choice([2, 3, 5])}K"
+    status = rng.choice(_STATUS)
+    city = rng.choice(_CITIES)
+    skills = rng.sample(_FILLER, 2)
+    if job.get("keywords") and rng.random() < 0.6:
+        skills += rng.sample(job["keywords"], min(2, len(job["keywords"])))
+    work = []
+    year = 2025
+    for _ in range(rng.randint(1, 3)):
+        span = rng.randint(1, 4)
+        work.append({
+            "startDate": f"{year - span}.{rng.randint(1, 12):02d}",
+            "endDate": f"{year}.{rng.randint(1, 12):02d}",
+            "company": f"{rng.choice(['华', '盛', '宏', '瑞'])}{rng.choice(['信', '达', '通', '源'])}贸易有限公司",
+            "positionName": "销售经理",
+            "responsibility": f"负责{'、'.join(skills)}",
+        })
+        year -= span
+    experience = [f"{w['startDate']}-{w['endDate']} {w['company']} {w['positionName']} {w['responsibility']}"
+                  for w in work]
+    school = f"{rng.choice(_CITIES)}{rng.choice(['商学院', '理工大学', '职业技术学院'])}"
+    return {
+        "id": gid,
+        "job": job["title"],
+        "name": name,
+        "age": age,
+        "years": years,
+        "education": education,
+        "salary": salary,
+        "status": status,
+        "city": city,
+        "skills": skills,
+        "work": work,
+        "experience": experience,
+        "school": school,
+        "overview": "工作经历\n" + "\n".join(experience) + f"\n教育经历\n{school} {education}",
+    }
+
+
+def resume_payload(c: dict) -> dict:
+    """The JSON the c-resume frame downloads before drawing the canvas."""
+    return {"code": 0, "message": "Success", "zpData": {
+        "geekBaseInfo": {
+            "encryptGeekId": c["id"],
+            "name": c["name"],
+            "ageDesc": f"{c['age']}岁",
+            "workYearDesc": f"{c['years']}年",
+            "degreeCategory": c["education"],
+            "applyStatusDesc": c["status"],
+            "userDescription": f"熟悉{'、'.join(c['skills'])}，沟通能力强。",
+        },
+        "geekExpectList": [{"positionName": c["job"], "locationName": c["city"], "salaryDesc": c["salary"]}],
+        "geekWorkExpList": c["work"],
+        "geekEduExpList": [{"school": c["school"], "degreeName": c["education"]}],
+    }}
+
+
+class SiteState:
+    """Candidates plus counters of what the client did (thread-safe)."""
+
+    def __init__(self, jobs: list[dict], seed: int = 0, candidates_per_job: int = 300, greetings: int = 10,
+                 resume_delay: float = 0.5, greet_limit: int = 0, captcha_after: int = 0, popover: bool = True):
+        self.jobs = jobs
+        self.seed = seed
+        self.candidates_per_job = candidates_per_job
+        self.resume_delay = resume_delay
+        self.greet_limit = greet_limit
+        self.captcha_after = captcha_after
+        self.popover = popover
+        self.lock = threading.Lock()
+        self.candidates = {}
+        for job in jobs:
+            for i in range(candidates_per_job):
+                c = make_candidate(seed, job, i)
+                self.candidates[c["id"]] = c
+        self.greetings = [make_candidate(seed + 1, jobs[i % len(jobs)], i) for i in range(greetings)]
+        for c in self.greetings:
+            self.candidates[c["id"]] = c
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.viewed = set()
+            self.greeted = set()
+            self.pending_greetings = [c["id"] for c in self.greetings]
+            self.stats = {"resume_opens": 0, "greets": 0, "greet_limit_hits": 0, "unsuitable": 0,
+                          "requests": 0, "captchas": 0, "started": time.time()}
+
+    def recommend(self, job_index: int, offset: int, limit: int) -> list[dict]:
+        job = self.jobs[job_index % len(self.jobs)]
+        end = min(offset + limit, self.candidates_per_job)
+        cards = []
+        for i in range(offset, end):
+            c = make_candidate(self.seed, job, i)
+            cards.append(dict(c, viewed=c["id"] in self.viewed, greeted=c["id"] in self.greeted))
+        return cards
+
+    def open_resume(self, gid: str) -> bool:
+        """Count a resume open; False once the CAPTCHA threshold is exceeded."""
+        with self.lock:
+            self.stats["resume_opens"] += 1
+            self.viewed.add(gid)
+            if self.captcha_after and self.stats["resume_opens"] > self.captcha_after:
+                self.stats["captchas"] += 1
+                return False
+            return True
+
+    def greet(self, gid: str) -> bool:
+        with self.lock:
+            if self.greet_limit and len(self.greeted) >= self.greet_limit:
+                self.stats["greet_limit_hits"] += 1
+                return False
+            self.greeted.add(gid)
+            self.stats["greets"] += 1
+            return True
+
+    def finish_greeting(self, gid: str, kind: str):
+        with self.lock:
+            if gid in self.pending_greetings:
+                self.pending_greetings.remove(gid)
+                self.stats[kind] += 1
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            return dict(self.stats, viewed=len(self.viewed), pending_greetings=len(self.pending_greetings),
+                        elapsed=time.time() - self.stats["started"])
+
+
+_STYLE = """<style>
+body { font-family: sans-serif; margin: 0; }
+.top-nav { height: 56px; display: flex; gap: 24px; align-items: center; padding: 0 24px; background: #f4f4f4; }
+.nav-item { cursor: pointer; }
+.user-list { width: 360px; float: left; }
+.geek-item-wrap { padding: 12px; border-bottom: 1px solid #eee; cursor: pointer; }
+.badge-count { color: #fff; background: #f33; border-radius: 8px; padding: 0 6px; margin-left: 8px; }
+.conversation-box { margin-left: 380px; padding: 12px; }
+.reason-item, .operate-btn, button { display: inline-block; margin: 4px; padding: 6px 10px; cursor: pointer; }
+.boss-chat-editor-input { border: 1px solid #ccc; min-height: 60px; margin: 8px 0; }
+.resume-common-dialog { position: fixed; left: 200px; top: 60px; width: 900px; height: 900px; background: #fff;
+                        border: 1px solid #999; z-index: 10; overflow: auto; }
+.resume-common-dialog iframe { width: 820px; height: 1450px; border: 0; }
+.close-btn { display: inline-block; cursor: pointer; padding: 6px 12px; }
+.dialog-wrap { position: fixed; left: 700px; top: 300px; padding: 24px; background: #fff; border: 1px solid #999; z-index: 20; }
+.iboss-close { position: fixed; right: 40px; bottom: 40px; padding: 8px; cursor: pointer; background: #ddd; }
+</style>"""
+
+_HOME = """<!DOCTYPE html><html><head><meta charset="utf-8"><title>BOSS 模拟站点</title></head>
+<body><a href="/web/user/?intent=1">登录</a></body></html>"""
+
+_LOGIN = """<!DOCTYPE html><html><head><meta charset="utf-8"><title>登录</title>""" + _STYLE + """</head>
+<body><div id="wrap"><div>
+  <div class="login-header">登录</div>
+  <div class="login-body"><div class="login-tip">扫码登录</div>
+    <div class="login-qr"><div class="qr-code" onclick="login()" style="width:200px;height:200px;background:#ccc">二维码</div></div>
+  </div>
+</div></div>
+<script>
+function login() {
+  document.cookie = 'sim_login=1; path=/';
+  setTimeout(function() { location.href = '/web/chat/index'; }, 300);
+}
+</script></body></html>"""
+
+_CHAT = """<!DOCTYPE html><html><head><meta charset="utf-8"><title>沟通</title>""" + _STYLE + """</head>
+<body>
+<div class="top-nav">
+  <a class="nav-item" href="/web/chat/index">沟通</a>
+  <a class="nav-item" onclick="openRecommend()">推荐牛人</a>
+</div>
+<div id="chat-view">
+  <div class="chat-tabs">
+    <span class="content" onclick="showList()">新招呼<em class="num">(__COUNT__)</em></span>
+    <span class="chat-filter" onclick="showList()">未读</span>
+  </div>
+  <div class="user-list" id="user-list"></div>
+  <div class="conversation-box" style="display:none">
+    <div class="conversation-header">
+      <span class="position-name"></span>
+      <button class="btn-resume" onclick="openResume()">在线简历</button>
+      <span class="operate-btn" onclick="openReasons()">不合适</span>
+    </div>
+    <div class="reason-list" style="display:none">__REASONS__</div>
+    <div class="reason-confirm" style="display:none"><span class="confirm-btn" onclick="confirmReason()">确定</span></div>
+    <div class="messages"></div>
+    <div class="boss-chat-editor-input" contenteditable="true"></div>
+    <button class="btn-send" onclick="sendMessage()">发送</button>
+  </div>
+</div>
+<div id="recommend-view" style="display:none"></div>
+__POPOVER__
+<script>
+var GREETINGS = __GREETINGS__;
+var current = null, chosenReason = null;
+
+function post(path, data) {
+  return fetch(path, {method: 'POST', headers: {'Content-Type': 'application/json'}, body: JSON.stringify(data)})
+    .then(function(r) { return r.json(); });
+}
+function renderList() {
+  var list = document.getElementById('user-list');
+  list.innerHTML = '';
+  GREETINGS.forEach(function(g) {
+    var el = document.createElement('div');
+    el.className = 'geek-item-wrap';
+    el.setAttribute('data-id', g.id);
+    el.innerHTML = '<span class="geek-name">' + g.name + '</span> <span class="source-job">' + g.job + '</span>' +
+                   '<span class="badge-count">' + (g.unread ? '1' : '') + '</span>';
+    el.onclick = function() { openChat(g.id); };
+    list.appendChild(el);
+  });
+}
+function showList() { document.getElementById('user-list').style.display = 'block'; }
+function openChat(id) {
+  var g = GREETINGS.find(function(x) { return x.id === id; });
+  if (!g) return;
+  g.unread = false;
+  current = g;
+  renderList();
+  var box = document.querySelector('.conversation-box');
+  box.style.display = 'none';
+  // the panel renders asynchronously, like the real site
+  setTimeout(function() {
+    box.style.display = 'block';
+    document.querySelector('.position-name').innerText = g.job;
+  }, 200);
+}
+function openResume() {
+  if (!current) return;
+  var d = document.createElement('div');
+  d.className = 'resume-common-dialog';
+  d.innerHTML = '<span class="close-btn" onclick="closeResume()">关闭</span>' +
+                '<div class="resume-summary"></div>' +
+                '<iframe src="/web/frame/c-resume/?id=' + current.id + '"></iframe>';
+  d.querySelector('.resume-summary').innerText = current.overview;
+  document.body.appendChild(d);
+}
+function closeResume() {
+  document.querySelectorAll('.resume-common-dialog').forEach(function(d) { d.remove(); });
+}
+function openReasons() { document.querySelector('.reason-list').style.display = 'block'; }
+function chooseReason(el) {
+  chosenReason = el.innerText.trim();
+  document.querySelector('.reason-confirm').style.display = 'block';
+}
+function finish(kind) {
+  var idx = GREETINGS.indexOf(current);
+  GREETINGS.splice(idx, 1);
+  document.querySelector('.reason-list').style.display = 'none';
+  document.querySelector('.reason-confirm').style.display = 'none';
+  document.querySelector('.conversation-box').style.display = 'none';
+  renderList();
+  return idx;
+}
+function confirmReason() {
+  if (!current) return;
+  post('/api/event', {type: 'unsuitable', id: current.id, reason: chosenReason});
+  var idx = finish('unsuitable');
+  current = null;
+  // the platform opens the next candidate on its own
+  if (GREETINGS[idx]) openChat(GREETINGS[idx].id);
+}
+function sendMessage() {
+  var ed = document.querySelector('.boss-chat-editor-input');
+  if (!current || !ed.innerText.trim()) return;
+  post('/api/event', {type: 'request', id: current.id, text: ed.innerText});
+  ed.innerText = '';
+  finish('request');
+  current = null;
+}
+function openRecommend() {
+  document.getElementById('chat-view').style.display = 'none';
+  var view = document.getElementById('recommend-view');
+  view.style.display = 'block';
+  view.innerHTML = '<iframe name="recommendFrame" src="/web/frame/recommend/" style="width:1880px;height:1000px;border:0"></iframe>';
+}
+function showLimitDialog() {
+  var d = document.createElement('div');
+  d.className = 'dialog-wrap active';
+  d.innerHTML = '<div class="dialog-title">今日沟通数已达上限</div><span class="boss-popup__close" onclick="this.parentNode.remove()">关闭</span>';
+  document.body.appendChild(d);
+}
+renderList();
+</script></body></html>"""
+
+_RECOMMEND = """<!DOCTYPE html><html><head><meta charset="utf-8">""" + _STYLE + """<style>
+#recommend-list li { list-style: none; height: 110px; border-bottom: 1px solid #eee; display: flex; }
+.card-inner { width: 1400px; cursor: pointer; display: flex; gap: 16px; }
+.card-inner.has-viewed { color: #999; }
+.resume-panel { position: fixed; left: 300px; top: 20px; width: 1000px; height: 940px; background: #fff;
+                border: 1px solid #999; overflow: auto; z-index: 5; }
+.resume-panel iframe { width: 820px; height: 1450px; border: 0; }
+.greet-tip { position: fixed; left: 700px; top: 400px; background: #fff; border: 1px solid #999; padding: 20px; z-index: 9; }
+.job-list { position: absolute; background: #fff; border: 1px solid #ccc; z-index: 8; padding: 0; }
+.job-item { list-style: none; padding: 8px 16px; cursor: pointer; }
+</style></head>
+<body>
+<div class="job-selecter">
+  <div class="ui-dropmenu-label" onclick="toggleJobs()">__JOB__</div>
+  <ul class="job-list" style="display:none">__JOB_ITEMS__</ul>
+  <span class="mode-item curr"><svg width="16" height="16"><use href="#mode1"></use></svg></span>
+</div>
+<div id="recommend-list"><div><ul id="cards"></ul></div></div>
+<div class="resume-panel" style="display:none">
+  <span class="close-btn" onclick="closeResume()">关闭</span>
+  <div class="resume-summary"></div>
+  <div class="resume-frames"></div>
+  <button class="btn-sure-v2 btn-greet" onclick="greetCurrent()">打招呼</button>
+</div>
+<div class="greet-tip" style="display:none">已向牛人发送招呼 <button onclick="this.parentNode.style.display='none'">知道了</button></div>
+<script>
+var JOB = __JOB_INDEX__, PAGE = 15, loaded = 0, loading = false, done = false, cards = [], current = null;
+
+function post(path, data) {
+  return fetch(path, {method: 'POST', headers: {'Content-Type': 'application/json'}, body: JSON.stringify(data)})
+    .then(function(r) { return r.json(); });
+}
+function toggleJobs() {
+  var l = document.querySelector('.job-list');
+  l.style.display = l.style.display === 'none' ? 'block' : 'none';
+}
+function selectJob(i) { location.href = '/web/frame/recommend/?job=' + i; }
+function cardHtml(c, i) {
+  return '<div class="card-wrap">' +
+    '<div class="card-inner' + (c.viewed ? ' has-viewed' : '') + '" onclick="openCard(' + i + ')">' +
+    '<div class="avatar"><span>' + c.name.charAt(0) + '</span></div> ' +
+    '<div class="info"> <div class="name-line"><span class="salary">' + c.salary + '</span> <span class="name">' + c.name + '</span> </div> ' +
+    '<div class="base-info"><div>' + c.age + '岁 ' + c.years + '年 ' + c.education + ' ' + c.status + '</div></div> </div> ' +
+    '<div class="expect"> 期望：' + c.city + ' ' + c.job + ' </div> ' +
+    '<div class="advantage"> 优势：' + c.skills.join('、') + ' </div>' +
+    '</div> ' +
+    '<button class="' + (c.greeted ? 'btn-continue' : 'btn-greet') + '" onclick="greetCard(' + i + ')">' +
+    (c.greeted ? '继续沟通' : '打招呼') + '</button></div>';
+}
+function loadMore() {
+  if (loading || done) return;
+  loading = true;
+  fetch('/api/recommend?job=' + JOB + '&offset=' + loaded + '&limit=' + PAGE)
+    .then(function(r) { return r.json(); })
+    .then(function(batch) {
+      var ul = document.getElementById('cards');
+      batch.forEach(function(c) {
+        var li = document.createElement('li');
+        li.setAttribute('data-geekid', c.id);
+        li.innerHTML = cardHtml(c, cards.length);
+        cards.push(c);
+        ul.appendChild(li);
+      });
+      loaded += batch.length;
+      done = batch.length < PAGE;
+      loading = false;
+    });
+}
+window.addEventListener('scroll', function() {
+  if (window.innerHeight + window.scrollY >= document.body.scrollHeight - 600) loadMore();
+});
+function openCard(i) {
+  var c = cards[i];
+  current = i;
+  var inner = document.querySelectorAll('#cards > li')[i].querySelector('.card-inner');
+  inner.classList.add('has-viewed');
+  var panel = document.querySelector('.resume-panel');
+  panel.querySelector('.resume-summary').innerText = c.overview;
+  var frame = document.createElement('iframe');
+  frame.src = '/web/frame/c-resume/?id=' + c.id;
+  panel.querySelector('.resume-frames').appendChild(frame);
+  panel.style.display = 'block';
+}
+function closeResume() {
+  var panel = document.querySelector('.resume-panel');
+  panel.style.display = 'none';
+  panel.querySelector('.resume-frames').innerHTML = '';
+  current = null;
+}
+function greet(i, button) {
+  post('/api/greet', {id: cards[i].id}).then(function(res) {
+    if (!res.ok) { window.parent.showLimitDialog(); return; }
+    cards[i].greeted = true;
+    var li = document.querySelectorAll('#cards > li')[i];
+    var b = li.querySelector('.btn-greet');
+    if (b) { b.className = 'btn-continue'; b.innerText = '继续沟通'; }
+    document.querySelector('.greet-tip').style.display = 'block';
+  });
+}
+function greetCurrent() { if (current !== null) greet(current); }
+function greetCard(i) { if (!cards[i].greeted) greet(i); }
+loadMore();
+</script></body></html>"""
+
+_RESUME = """<!DOCTYPE html><html><head><meta charset="utf-8"></head>
+<body style="margin:0">
+<script>
+function draw(lines) {
+  var c = document.createElement('canvas');
+  c.id = 'resume';
+  c.width = 800;
+  c.height = 1400;
+  var ctx = c.getContext('2d');
+  ctx.fillStyle = '#fff';
+  ctx.fillRect(0, 0, c.width, c.height);
+  ctx.fillStyle = '#222';
+  ctx.font = '22px sans-serif';
+  lines.forEach(function(line, i) { ctx.fillText(line, 40, 60 + i * 36); });
+  document.body.appendChild(c);
+}
+fetch('/wapi/zpitem/web/boss/geek/info?id=__ID__').then(function(r) { return r.json(); }).then(function(d) {
+  var g = d.zpData, b = g.geekBaseInfo, e = g.geekExpectList[0];
+  var lines = [b.name, b.ageDesc + ' · ' + b.workYearDesc + '经验 · ' + b.degreeCategory + ' · ' + b.applyStatusDesc,
+               '期望职位：' + e.positionName + '  期望城市：' + e.locationName + '  期望薪资：' + e.salaryDesc,
+               '', '个人优势', b.userDescription, '', '工作经历'];
+  g.geekWorkExpList.forEach(function(w) {
+    lines.push(w.startDate + '-' + w.endDate + ' ' + w.company + ' ' + w.positionName + ' ' + w.responsibility);
+  });
+  lines.push('', '教育经历');
+  g.geekEduExpList.forEach(function(x) { lines.push(x.school + '  ' + x.degreeName); });
+  setTimeout(function() { draw(lines); }, __DELAY__);
+});
+</script></body></html>"""
+
+_VERIFY = """<!DOCTYPE html><html><head><meta charset="utf-8"><title>安全验证</title></head>
+<body><div class="verify-box">安全验证：请完成验证后继续</div></body></html>"""
+
+
+def make_handler(state: SiteState):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def _send(self, body, content_type="text/html; charset=utf-8", status=200, headers=()):
+            data = body.encode("utf-8") if isinstance(body, str) else body
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(data)))
+            for name, value in headers:
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _json(self, obj, status=200):
+            self._send(json.dumps(obj, ensure_ascii=False), "application/json; charset=utf-8", status)
+
+        def _redirect(self, location):
+            self._send("", status=302, headers=[("Location", location)])
+
+        def _logged_in(self) -> bool:
+            return "sim_login=1" in (self.headers.get("Cookie") or "")
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            query = {k: v[0] for k, v in parse_qs(url.query).items()}
+            path = url.path.rstrip("/") or "/"
+            if path == "/":
+                return self._send(_HOME)
+            if path == "/web/user":
+                return self._redirect("/web/chat/index") if self._logged_in() else self._send(_LOGIN)
+            if path == "/web/chat/index":
+                if not self._logged_in():
+                    return self._redirect("/web/user/?intent=1")
+                with state.lock:
+                    greetings = [dict(state.candidates[g], unread=True) for g in state.pending_greetings]
+                page = (_CHAT.replace("__COUNT__", str(len(greetings)))
+                        .replace("__REASONS__", "".join(
+                            f'<span class="reason-item" onclick="chooseReason(this)">{r}</span>' for r in REASONS))
+                        .replace("__POPOVER__", '<div class="iboss-close" onclick="this.remove()">×</div>'
+                                 if state.popover else "")
+                        .replace("__GREETINGS__", json.dumps(greetings, ensure_ascii=False)))
+                return self._send(page)
+            if path == "/web/frame/recommend":
+                job_index = int(query.get("job", 0)) % len(state.jobs)
+                items = "".join(f'<li class="job-item" onclick="selectJob({i})">{job["title"]} _ 北京</li>'
+                                for i, job in enumerate(state.jobs))
+                page = (_RECOMMEND.replace("__JOB_ITEMS__", items)
+                        .replace("__JOB_INDEX__", str(job_index))
+                        .replace("__JOB__", state.jobs[job_index]["title"]))
+                return self._send(page)
+            if path == "/web/frame/c-resume":
+                candidate = state.candidates.get(query.get("id", ""))
+                if candidate is None:
+                    return self._send("not found", status=404)
+                if not state.open_resume(candidate["id"]):
+                    return self._redirect("/web/passport/zp/verify.html?callbackUrl=" + quote(self.path))
+                # resume_delay is split between the data request and drawing the canvas
+                page = (_RESUME.replace("__ID__", candidate["id"])
+                        .replace("__DELAY__", str(int(state.resume_delay * 500))))
+                return self._send(page)
+            if path == "/wapi/zpitem/web/boss/geek/info":
+                candidate = state.candidates.get(query.get("id", ""))
+                if candidate is None:
+                    return self._json({"code": 404, "message": "not found"})
+                time.sleep(state.resume_delay / 2)
+                return self._json(resume_payload(candidate))
+            if path == "/web/passport/zp/verify.html":
+                return self._send(_VERIFY)
+            if path == "/api/recommend":
+                cards = state.recommend(int(query.get("job", 0)), int(query.get("offset", 0)),
+                                        int(query.get("limit", 15)))
+                return self._json(cards)
+            if path == "/api/stats":
+                return self._json(state.snapshot())
+            self._send("not found", status=404)
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            payload = json.loads(self.rfile.read(length) or b"{}")
+            path = urlparse(self.path).path
+            if path == "/api/greet":
+                return self._json({"ok": state.greet(payload.get("id", ""))})
+            if path == "/api/event":
+                kind = {"unsuitable": "unsuitable", "request": "requests"}.get(payload.get("type"))
+                if kind:
+                    state.finish_greeting(payload.get("id", ""), kind)
+                return self._json({"ok": True})
+            if path == "/api/reset":
+                state.reset()
+                return self._json({"ok": True})
+            self._send("not found", status=404)
+
+    return Handler
+
+
+def make_server(state: SiteState, host: str = "127.0.0.1", port: int = 8800) -> ThreadingHTTPServer:
+    return ThreadingHTTPServer((host, port), make_handler(state))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="本地模拟招聘网站")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8800)
+    parser.add_argument("--jobs", nargs="+", default=["礼品福利销售经理"], help="职位名称")
+    parser.add_argument("--keywords", nargs="*", default=["礼品", "福利", "节日", "工会"])
+    parser.add_argument("--candidates", type=int, default=300, help="每个职位的推荐人数")
+    parser.add_argument("--greetings", type=int, default=10, help="新招呼未读人数")
+    parser.add_argument("--resume-delay", type=float, default=0.5, help="简历 canvas 渲染延迟（秒）")
+    parser.add_argument("--greet-limit", type=int, default=0, help="每日打招呼上限（0 为不限）")
+    parser.add_argument("--captcha-after", type=int, default=0, help="打开 N 份简历后跳转验证页（0 为不跳转）")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    state = SiteState(
+        [{"title": t, "keywords": args.keywords} for t in args.jobs], args.seed, args.candidates,
+        args.greetings, args.resume_delay, args.greet_limit, args.captcha_after,
+    )
+    server = make_server(state, args.host, args.port)
+    print(f"模拟站点：http://{args.host}:{args.port}/  （BOSS_BASE_URL）")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,296 @@
+"""
+OpenAI-compatible mock LLM server for offline benchmarks.
+
+Implements what llm_utils uses on the local (Chat Completions) path:
+GET /v1/models, POST /v1/chat/completions (blocking and SSE streaming, with
+json_schema response_format), and the Files / Batches endpoints used by
+llm_utils.evaluate_batch.  Each request costs `latency` seconds of simulated
+prefill plus len(output) / chars_per_second of decoding; verdicts are a stable
+hash of the prompt, qualified with probability `qualified_rate`.
+
+    python -m sim.mock_llm --port 8900 --latency 2.0 --chars-per-second 40
+"""
+import argparse
+import email.parser
+import email.policy
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+from sim.boss_site import REASONS
+
+
+class MockLLM:
+    """Latency model, verdict generator and batch/file store (thread-safe)."""
+
+    def __init__(self, latency: float = 1.0, jitter: float = 0.2, chars_per_second: float = 200.0,
+                 qualified_rate: float = 0.3, max_concurrency: int = 0, batch_delay: float = 2.0):
+        self.latency = latency
+        self.jitter = jitter
+        self.chars_per_second = chars_per_second
+        self.qualified_rate = qualified_rate
+        self.batch_delay = batch_delay
+        # A local box serves a fixed number of sequences; extra requests queue
+        self.slots = threading.BoundedSemaphore(max_concurrency) if max_concurrency > 0 else None
+        self.lock = threading.Lock()
+        self.files = {}
+        self.batches = {}
+        self.stats = {"requests": 0, "streamed": 0, "batch_requests": 0, "busy_seconds": 0.0}
+
+    def prefill_seconds(self) -> float:
+        return max(self.latency + random.gauss(0, self.jitter), 0.0)
+
+    def decode_seconds(self, text: str) -> float:
+        return len(text) / self.chars_per_second if self.chars_per_second > 0 else 0.0
+
+    def _verdict(self, seed: str, job_id: int | None = None) -> dict:
+        digest = int(hashlib.sha1(f"{seed}:{job_id}".encode()).hexdigest(), 16)
+        qualified = (digest % 1000) / 1000 < self.qualified_rate
+        category = "" if qualified else REASONS[digest % len(REASONS)]
+        name = "候选人"
+        if qualified:
+            reason = f"{name}符合该职位，相关销售经历与职位要求匹配，期望薪资在职位预算范围内。"
+        else:
+            reason = f"{name}不符合该职位，因为{category}：与职位的硬性要求不一致。"
+        return {"is_qualified": qualified, "reason_category": category, "reason": reason}
+
+    def completion_text(self, body: dict) -> str:
+        """JSON output matching the request's json_schema (field order follows the schema)."""
+        messages = body.get("messages", [])
+        prompt = json.dumps(messages, ensure_ascii=False)
+        # Exclude the volatile date/image parts so verdicts are stable across runs
+        seed = hashlib.sha1(re.sub(r"data:[^\"]+|Today's date is [0-9-]+", "", prompt).encode()).hexdigest()
+        schema = ((body.get("response_format") or {}).get("json_schema") or {}).get("schema") or {}
+        properties = schema.get("properties") or {"reason": {}, "is_qualified": {}, "reason_category": {}}
+        if "verdicts" in properties:
+            jobs = len(re.findall(r"职位\d+（", prompt)) or 1
+            verdicts = [dict(job_id=i, **self._verdict(seed, i)) for i in range(1, jobs + 1)]
+            return json.dumps({"verdicts": verdicts}, ensure_ascii=False)
+        verdict = self._verdict(seed)
+        out = {}
+        for name in properties:
+            if name == "confidence":
+                out[name] = 0.95 if not verdict["is_qualified"] else 0.5
+            else:
+                out[name] = verdict.get(name, "")
+        return json.dumps(out, ensure_ascii=False)
+
+    def completion(self, body: dict, text: str, model: str | None = None) -> dict:
+        prompt_tokens = len(json.dumps(body.get("messages", []), ensure_ascii=False)) // 4
+        return {
+            "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model or body.get("model", "mock"),
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": text}}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": len(text) // 2,
+                      "total_tokens": prompt_tokens + len(text) // 2,
+                      "prompt_tokens_details": {"cached_tokens": 0}},
+        }
+
+    def acquire(self):
+        if self.slots is not None:
+            self.slots.acquire()
+
+    def release(self):
+        if self.slots is not None:
+            self.slots.release()
+
+    def run_batch(self, batch_id: str):
+        """Process a batch in the background: every line gets a completion after batch_delay."""
+        time.sleep(self.batch_delay)
+        with self.lock:
+            batch = self.batches[batch_id]
+            lines = self.files[batch["input_file_id"]]["content"].decode("utf-8").splitlines()
+        out = []
+        for line in lines:
+            if not line.strip():
+                continue
+            request = json.loads(line)
+            body = request["body"]
+            out.append(json.dumps({
+                "id": f"batch_req_{uuid.uuid4().hex[:12]}",
+                "custom_id": request["custom_id"],
+                "response": {"status_code": 200, "body": self.completion(body, self.completion_text(body))},
+                "error": None,
+            }, ensure_ascii=False))
+        file_id = self.add_file("batch_output.jsonl", "\n".join(out).encode("utf-8"), "batch_output")
+        with self.lock:
+            self.stats["batch_requests"] += len(out)
+            batch.update(status="completed", output_file_id=file_id, completed_at=int(time.time()),
+                         request_counts={"total": len(out), "completed": len(out), "failed": 0})
+
+    def add_file(self, filename: str, content: bytes, purpose: str) -> str:
+        file_id = f"file-{uuid.uuid4().hex[:16]}"
+        with self.lock:
+            self.files[file_id] = {"filename": filename, "content": content, "purpose": purpose,
+                                   "created_at": int(time.time())}
+        return file_id
+
+    def file_object(self, file_id: str) -> dict:
+        f = self.files[file_id]
+        return {"id": file_id, "object": "file", "bytes": len(f["content"]), "created_at": f["created_at"],
+                "filename": f["filename"], "purpose": f["purpose"], "status": "processed"}
+
+
+def make_handler(llm: MockLLM):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive, like a real server
+
+        def log_message(self, *args):
+            pass
+
+        def _json(self, obj, status=200):
+            data = json.dumps(obj, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _body(self) -> bytes:
+            return self.rfile.read(int(self.headers.get("Content-Length") or 0))
+
+        def do_GET(self):
+            path = urlparse(self.path).path
+            if path == "/v1/models":
+                return self._json({"object": "list", "data": [{"id": "mock", "object": "model", "owned_by": "sim"}]})
+            m = re.fullmatch(r"/v1/batches/([\w-]+)", path)
+            if m and m.group(1) in llm.batches:
+                return self._json(llm.batches[m.group(1)])
+            m = re.fullmatch(r"/v1/files/([\w-]+)/content", path)
+            if m and m.group(1) in llm.files:
+                data = llm.files[m.group(1)]["content"]
+                self.send_response(200)
+                self.send_header("Content-Type", "application/jsonl")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+                return
+            m = re.fullmatch(r"/v1/files/([\w-]+)", path)
+            if m and m.group(1) in llm.files:
+                return self._json(llm.file_object(m.group(1)))
+            if path == "/api/stats":
+                return self._json(llm.stats)
+            self._json({"error": {"message": f"unknown path {path}"}}, 404)
+
+        def do_POST(self):
+            path = urlparse(self.path).path
+            if path == "/v1/chat/completions":
+                return self._chat(json.loads(self._body()))
+            if path == "/v1/files":
+                return self._upload()
+            if path == "/v1/batches":
+                request = json.loads(self._body())
+                batch_id = f"batch_{uuid.uuid4().hex[:16]}"
+                batch = {"id": batch_id, "object": "batch", "endpoint": request.get("endpoint"),
+                         "input_file_id": request["input_file_id"], "completion_window": "24h",
+                         "status": "in_progress", "created_at": int(time.time()), "output_file_id": None,
+                         "error_file_id": None, "errors": None}
+                with llm.lock:
+                    llm.batches[batch_id] = batch
+                threading.Thread(target=llm.run_batch, args=(batch_id,), daemon=True).start()
+                return self._json(batch)
+            self._json({"error": {"message": f"unknown path {path}"}}, 404)
+
+        def _upload(self):
+            content_type = self.headers.get("Content-Type", "")
+            raw = self._body()
+            message = email.parser.BytesParser(policy=email.policy.HTTP).parsebytes(
+                f"Content-Type: {content_type}\r\n\r\n".encode() + raw
+            )
+            fields, filename, content = {}, "upload.jsonl", b""
+            for part in message.iter_parts():
+                name = part.get_param("name", header="content-disposition")
+                if part.get_filename():
+                    filename, content = part.get_filename(), part.get_payload(decode=True)
+                else:
+                    fields[name] = part.get_content().strip()
+            file_id = llm.add_file(filename, content, fields.get("purpose", "batch"))
+            self._json(llm.file_object(file_id))
+
+        def _chat(self, body: dict):
+            text = llm.completion_text(body)
+            llm.acquire()
+            start = time.perf_counter()
+            try:
+                time.sleep(llm.prefill_seconds())
+                if body.get("stream"):
+                    self._stream(body, text)
+                else:
+                    time.sleep(llm.decode_seconds(text))
+                    self._json(llm.completion(body, text))
+            finally:
+                llm.release()
+                with llm.lock:
+                    llm.stats["requests"] += 1
+                    llm.stats["streamed"] += 1 if body.get("stream") else 0
+                    llm.stats["busy_seconds"] += time.perf_counter() - start
+
+        def _stream(self, body: dict, text: str):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Cache-Control", "no-cache")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            full = llm.completion(body, text)
+            chunk_id, step = full["id"], 8
+
+            def event(delta, finish=None, usage=None):
+                chunk = {"id": chunk_id, "object": "chat.completion.chunk", "created": full["created"],
+                         "model": full["model"],
+                         "choices": [] if usage else [{"index": 0, "delta": delta, "finish_reason": finish}]}
+                if usage:
+                    chunk["usage"] = usage
+                self.wfile.write(f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n".encode("utf-8"))
+                self.wfile.flush()
+
+            event({"role": "assistant", "content": ""})
+            for i in range(0, len(text), step):
+                time.sleep(llm.decode_seconds(text[i:i + step]))
+                event({"content": text[i:i + step]})
+            event({}, finish="stop")
+            if (body.get("stream_options") or {}).get("include_usage"):
+                event(None, usage=full["usage"])
+            self.wfile.write(b"data: [DONE]\n\n")
+            self.wfile.flush()
+            self.close_connection = True
+
+    return Handler
+
+
+def make_server(llm: MockLLM, host: str = "127.0.0.1", port: int = 8900) -> ThreadingHTTPServer:
+    return ThreadingHTTPServer((host, port), make_handler(llm))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OpenAI 兼容的模拟 LLM 服务")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--latency", type=float, default=1.0, help="每次请求的预填充延迟（秒）")
+    parser.add_argument("--jitter", type=float, default=0.2)
+    parser.add_argument("--chars-per-second", type=float, default=200.0, help="输出速度")
+    parser.add_argument("--qualified-rate", type=float, default=0.3)
+    parser.add_argument("--max-concurrency", type=int, default=0, help="并发槽位（0 为不限）")
+    parser.add_argument("--batch-delay", type=float, default=2.0)
+    args = parser.parse_args()
+
+    llm = MockLLM(args.latency, args.jitter, args.chars_per_second, args.qualified_rate,
+                  args.max_concurrency, args.batch_delay)
+    server = make_server(llm, args.host, args.port)
+    print(f"模拟 LLM：http://{args.host}:{args.port}/v1  （OPENAI_BASE_URL）")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
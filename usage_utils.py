@@ -0,0 +1,210 @@
+"""
+LLM token and cost accounting with per-job / per-run / per-day budgets.
+
+Every LLM response's usage block is recorded here (input, cached, output,
+reasoning and estimated image tokens) and attributed to the job currently being
+processed (set_job, a context variable so concurrent tasks keep their own job).
+Before each request llm_utils calls admit(), which enforces the configured
+budgets: once one is exhausted the request is either downgraded to
+LLM_BUDGET_FALLBACK_MODEL or refused with BudgetExhausted.
+"""
+import atexit
+import contextvars
+import json
+import os
+import time
+from datetime import date
+from dotenv import load_dotenv
+from log_utils import logger
+load_dotenv()
+
+# USD per 1M tokens: [input, cached input, output].  Override or extend with
+# LLM_PRICES='{"model": [input, cached, output], ...}'.  Unknown models cost 0.
+PRICES = {
+    "gpt-5-mini": [0.25, 0.025, 2.00],
+    "gpt-5-nano": [0.05, 0.005, 0.40],
+    "gpt-4o-mini": [0.15, 0.075, 0.60],
+}
+PRICES.update(json.loads(os.getenv("LLM_PRICES", "{}")))
+
+# Budgets, 0 = unlimited.  Tokens are input + output tokens.
+BUDGETS = {
+    ("job", "tokens"): int(os.getenv("LLM_BUDGET_TOKENS_PER_JOB", "0")),
+    ("run", "tokens"): int(os.getenv("LLM_BUDGET_TOKENS_PER_RUN", "0")),
+    ("day", "tokens"): int(os.getenv("LLM_BUDGET_TOKENS_PER_DAY", "0")),
+    ("job", "cost"): float(os.getenv("LLM_BUDGET_COST_PER_JOB", "0")),
+    ("run", "cost"): float(os.getenv("LLM_BUDGET_COST_PER_RUN", "0")),
+    ("day", "cost"): float(os.getenv("LLM_BUDGET_COST_PER_DAY", "0")),
+}
+# Cheaper model to switch to once a budget is exhausted (empty = stop instead)
+LLM_BUDGET_FALLBACK_MODEL = os.getenv("LLM_BUDGET_FALLBACK_MODEL", "")
+# Daily totals survive restarts here, rewritten at most every LLM_USAGE_SAVE_INTERVAL seconds and at exit
+LLM_USAGE_PATH = os.getenv("LLM_USAGE_PATH", "llm_usage.json")
+LLM_USAGE_SAVE_INTERVAL = float(os.getenv("LLM_USAGE_SAVE_INTERVAL", "30"))
+
+_FIELDS = ("calls", "input", "cached", "output", "reasoning", "image", "cost")
+
+
+class BudgetExhausted(Exception):
+    """Raised by admit() when a budget is used up and no fallback model is configured."""
+
+    def __init__(self, scope: str, kind: str, used: float, limit: float):
+        self.scope = scope  # "job" | "run" | "day"
+        super().__init__(f"{scope} {kind} 预算已用尽：{used:.4g} / {limit:.4g}")
+
+
+_current_job = contextvars.ContextVar("llm_job", default="")
+run_totals = dict.fromkeys(_FIELDS, 0)
+job_totals: dict[str, dict] = {}
+_downgraded = set()
+
+
+def set_job(job_title: str):
+    """Attribute the LLM usage of the current task (and tasks it starts) to job_title."""
+    _current_job.set(job_title)
+
+
+def _new_totals() -> dict:
+    return dict.fromkeys(_FIELDS, 0)
+
+
+def _load_day() -> dict:
+    try:
+        with open(LLM_USAGE_PATH, encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        data = {}
+    return data if data.get("date") == date.today().isoformat() else {"date": date.today().isoformat()}
+
+
+_day = _load_day()
+_day.setdefault("totals", _new_totals())
+
+
+def _day_totals() -> dict:
+    today = date.today().isoformat()
+    if _day["date"] != today:
+        _day.update(date=today, totals=_new_totals())
+    return _day["totals"]
+
+
+_last_save = 0.0
+_unsaved = False
+
+
+def _save_day():
+    global _last_save, _unsaved
+    _last_save, _unsaved = time.monotonic(), False
+    tmp = LLM_USAGE_PATH + ".tmp"
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(_day, f)
+        os.replace(tmp, LLM_USAGE_PATH)
+    except OSError as e:
+        logger.debug(f"无法保存 LLM 用量：{e}")
+
+
+def _save_day_soon():
+    global _unsaved
+    if time.monotonic() - _last_save >= LLM_USAGE_SAVE_INTERVAL:
+        _save_day()
+    else:
+        _unsaved = True
+
+
+def flush():
+    """Write out day totals not saved yet (registered to run at exit)."""
+    if _unsaved:
+        _save_day()
+
+
+atexit.register(flush)
+
+
+def cost_of(model: str, input_tokens: int, cached_tokens: int, output_tokens: int) -> float:
+    price = PRICES.get(model)
+    if price is None:
+        # Dated snapshots ("gpt-5-mini-2025-08-07") price like their base model
+        price = next((p for name, p in PRICES.items() if model.startswith(name)), None)
+    if price is None:
+        return 0.0
+    uncached = max(input_tokens - cached_tokens, 0)
+    return (uncached * price[0] + cached_tokens * price[1] + output_tokens * price[2]) / 1_000_000
+
+
+def record(model: str, input_tokens: int, cached_tokens: int = 0, output_tokens: int = 0,
+           reasoning_tokens: int = 0, image_tokens: int = 0, job_title: str | None = None):
+    """Account one LLM response against the current job, the run and the day."""
+    job_title = _current_job.get() if job_title is None else job_title
+    delta = {
+        "calls": 1,
+        "input": input_tokens,
+        "cached": cached_tokens,
+        "output": output_tokens,
+        "reasoning": reasoning_tokens,
+        "image": image_tokens,
+        "cost": cost_of(model, input_tokens, cached_tokens, output_tokens),
+    }
+    for totals in (run_totals, job_totals.setdefault(job_title, _new_totals()), _day_totals()):
+        for key, value in delta.items():
+            totals[key] += value
+    _save_day_soon()
+
+
+def _used(totals: dict, kind: str) -> float:
+    return totals["input"] + totals["output"] if kind == "tokens" else totals["cost"]
+
+
+def _exhausted():
+    """First exhausted (scope, kind, used, limit) for the current job, or None."""
+    scopes = {
+        "job": job_totals.get(_current_job.get(), _new_totals()),
+        "run": run_totals,
+        "day": _day_totals(),
+    }
+    for (scope, kind), limit in BUDGETS.items():
+        if limit and _used(scopes[scope], kind) >= limit:
+            return scope, kind, _used(scopes[scope], kind), limit
+    return None
+
+
+def admit(model: str) -> str:
+    """Return the model to use for the next request, or raise BudgetExhausted."""
+    exhausted = _exhausted()
+    if exhausted is None:
+        return model
+    scope, kind, used, limit = exhausted
+    if not LLM_BUDGET_FALLBACK_MODEL or model == LLM_BUDGET_FALLBACK_MODEL:
+        raise BudgetExhausted(scope, kind, used, limit)
+    if (scope, _current_job.get()) not in _downgraded:
+        _downgraded.add((scope, _current_job.get()))
+        logger.warning(f"LLM {scope} {kind} 预算已用尽（{used:.4g} / {limit:.4g}），改用 {LLM_BUDGET_FALLBACK_MODEL}")
+    return LLM_BUDGET_FALLBACK_MODEL
+
+
+def merge_into(job_stats: dict):
+    """Add per-job token and cost totals to job_stats (updating keys, not replacing entries)."""
+    for job_title, totals in job_totals.items():
+        if job_title:
+            job_stats.setdefault(job_title, {}).update(
+                llm_calls=totals["calls"],
+                llm_tokens=totals["input"] + totals["output"],
+                llm_cost=totals["cost"],
+            )
+
+
+def _describe(totals: dict) -> str:
+    return (
+        f"{totals['calls']} 次调用，输入 {totals['input']}（缓存 {totals['cached']}，图片约 {totals['image']}）"
+        f"，输出 {totals['output']}（推理 {totals['reasoning']}）tokens，费用 ${totals['cost']:.4f}"
+    )
+
+
+def log_stats():
+    """Log run and day totals at exit."""
+    if not run_totals["calls"]:
+        return
+    logger.llm(f"LLM 用量（本次运行）：{_describe(run_totals)}")
+    if "" in job_totals:
+        logger.llm(f"LLM 用量（未归属职位）：{_describe(job_totals[''])}")
+    logger.llm(f"LLM 用量（今日累计）：{_describe(_day_totals())}")